@@ -0,0 +1,42 @@
+import sys
+import os
+import asyncio 
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import db_helper
+from core.workers import unverified_user_purger
+
+
+async def purge_unverified_users(
+    days: int | None = None,
+    dry_run: bool = False,
+) -> int:
+    """ Delete (or only count) never verified users older than N days """
+    
+    try:
+        if dry_run:
+            count = await unverified_user_purger.count(older_than_days=days)
+            print(f"Unverified users to delete: {count}")
+            return count
+
+        deleted = await unverified_user_purger.purge(older_than_days=days)
+        stats = unverified_user_purger.stats()
+        print(
+            f"Deleted unverified users: {deleted} "
+            f"({stats['rows_per_second']} rows/s)"
+        )
+        return deleted
+    finally:
+        await db_helper.dispose()
+    
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(purge_unverified_users(days=args.days, dry_run=args.dry_run))
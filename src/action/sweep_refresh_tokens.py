@@ -0,0 +1,24 @@
+import sys
+import os
+import asyncio 
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import db_helper
+from core.workers import refresh_token_sweeper
+
+
+async def sweep_refresh_tokens() -> int:
+    """ Delete expired and revoked refresh tokens once """
+    
+    try:
+        deleted = await refresh_token_sweeper.sweep()
+        print(f"Deleted refresh tokens: {deleted}")
+        return deleted
+    finally:
+        await db_helper.dispose()
+    
+
+
+if __name__ == "__main__":
+    asyncio.run(sweep_refresh_tokens())
\ No newline at end of file
@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, Query
-from typing import Annotated
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Literal
 
 from core.config import settings
+from core.cache import post_cache
+from core.database import db_helper
+from core.oauth.github import github_client
+from core.workers import (
+    refresh_token_sweeper,
+    outbox_dispatcher,
+    campaign_runner,
+    unverified_user_purger,
+    account_deletion_worker,
+)
 from core.database.models import User
+from core.database.schemas.campaign import CampaignCreate, CampaignResponse
+from core.database.schemas.user import AccountDeletionResponse
+from utilities.streaming import ndjson_chunks, csv_chunks
 from core.services import (
     AdminService,
     PostLikeCommentService,
     SubscriptionService,
+    CampaignService,
 )
+from core.services.admin import USER_LISTING_FIELDS
 from core.dependency.admin import get_current_superuser
+from exceptions import error
 
 from core.dependency.services import (
     get_admin_service,
+    get_read_admin_service,
+    get_stream_admin_service,
     get_post_like_comment_service,
     get_subscription_service,
+    get_campaign_service,
 )
 
 router = APIRouter(prefix=settings.api.admin, tags=["Admin"])
@@ -29,12 +49,32 @@ async def statistics(
     ],
     admin_service: Annotated[
         AdminService,
-        Depends(get_admin_service),
+        Depends(get_read_admin_service),
     ],
 ):
     return await admin_service.get_user_stats()
 
 
+UserListingFormat = Literal["json", "ndjson", "csv"]
+
+
+def _user_listing_stream(
+    chunks,
+    fmt: UserListingFormat,
+    filename: str,
+) -> StreamingResponse:
+    if fmt == "csv":
+        return StreamingResponse(
+            csv_chunks(chunks, USER_LISTING_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+        )
+    return StreamingResponse(
+        ndjson_chunks(chunks),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/statistic/users/new/{days}")
 async def statistic_of_new_users(
     days: int,
@@ -44,10 +84,23 @@ async def statistic_of_new_users(
     ],
     admin_service: Annotated[
         AdminService,
-        Depends(get_admin_service),
+        Depends(get_stream_admin_service),
     ],
+    fmt: UserListingFormat = Query("json", alias="format"),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
 ):
-    return await admin_service.get_new_users(days=days)
+    """
+    json: one page (after_id / next_after_id),
+    ndjson / csv: all users streamed
+    """
+    if fmt != "json":
+        return _user_listing_stream(
+            admin_service.stream_new_users(days=days), fmt, "new_users"
+        )
+    return await admin_service.get_new_users(
+        days=days, after_id=after_id, limit=limit
+    )
 
 
 @router.get("/statistic/users/all/unverified/{days}")
@@ -59,10 +112,25 @@ async def unverified_statistic(
     ],
     admin_service: Annotated[
         AdminService,
-        Depends(get_admin_service),
+        Depends(get_stream_admin_service),
     ],
+    fmt: UserListingFormat = Query("json", alias="format"),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
 ):
-    return await admin_service.get_unverified_old_users(days=days)
+    """
+    json: one page (after_id / next_after_id),
+    ndjson / csv: all users streamed
+    """
+    if fmt != "json":
+        return _user_listing_stream(
+            admin_service.stream_unverified_old_users(days=days),
+            fmt,
+            "unverified_users",
+        )
+    return await admin_service.get_unverified_old_users(
+        days=days, after_id=after_id, limit=limit
+    )
 
 
 @router.get("/statistic/users/all/good")
@@ -73,10 +141,116 @@ async def all_good_users(
     ],
     admin_service: Annotated[
         AdminService,
-        Depends(get_admin_service),
+        Depends(get_stream_admin_service),
+    ],
+    fmt: UserListingFormat = Query("json", alias="format"),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    json: one page (after_id / next_after_id),
+    ndjson / csv: all users streamed
+    """
+    if fmt != "json":
+        return _user_listing_stream(
+            admin_service.stream_all_active_and_verified_users(),
+            fmt,
+            "active_verified_users",
+        )
+    return await admin_service.get_all_active_and_verified_users(
+        after_id=after_id, limit=limit
+    )
+
+
+@router.get("/statistic/cache/posts")
+async def post_cache_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Hit/miss/eviction counters of the post cache
+    """
+    return post_cache.stats()
+
+
+@router.get("/statistic/db/pool")
+async def db_pool_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Connection pool saturation and acquire wait times
+    """
+    return db_helper.pool_stats()
+
+
+@router.get("/statistic/jobs/refresh-tokens")
+async def refresh_token_sweeper_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Expired/revoked refresh token cleanup metrics
+    """
+    return refresh_token_sweeper.stats()
+
+
+@router.get("/statistic/jobs/unverified-purge")
+async def unverified_purge_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Stale unverified accounts purge metrics
+    """
+    return unverified_user_purger.stats()
+
+
+@router.get("/statistic/jobs/account-deletion")
+async def account_deletion_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
     ],
 ):
-    return await admin_service.get_all_active_and_verified_users()
+    """
+    Account deletion worker metrics
+    """
+    return account_deletion_worker.stats()
+
+
+@router.get("/statistic/http/github")
+async def github_client_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Requests, retries and failures of the shared GitHub HTTP client
+    """
+    return github_client.stats()
+
+
+@router.get("/statistic/jobs/mail-outbox")
+async def mail_outbox_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Email outbox delivery and SMTP pool metrics
+    """
+    return outbox_dispatcher.stats()
 
 
 @router.get("/info/{user_id}")
@@ -88,12 +262,114 @@ async def full_info_about_user(
     ],
     service: Annotated[
         AdminService,
-        Depends(get_admin_service),
+        Depends(get_read_admin_service),
     ],
 ):
     return await service.info(user_id=user_id)
 
 
+# ------------------------- Email campaigns -----------------------------
+
+
+@router.post(
+    "/campaigns",
+    response_model=CampaignResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_campaign(
+    data: CampaignCreate,
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    service: Annotated[
+        CampaignService,
+        Depends(get_campaign_service),
+    ],
+):
+    """
+    Send an email to all active and verified users
+    """
+    return await service.create_campaign(admin_id=current_user.id, data=data)
+
+
+@router.get("/campaigns", response_model=list[CampaignResponse])
+async def get_campaigns(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    service: Annotated[
+        CampaignService,
+        Depends(get_campaign_service),
+    ],
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return await service.get_campaigns(skip=skip, limit=limit)
+
+
+@router.get("/campaigns/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(
+    campaign_id: int,
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    service: Annotated[
+        CampaignService,
+        Depends(get_campaign_service),
+    ],
+):
+    """
+    Campaign progress
+    """
+    return await service.get_campaign(campaign_id=campaign_id)
+
+
+@router.post("/campaigns/{campaign_id}/pause", response_model=CampaignResponse)
+async def pause_campaign(
+    campaign_id: int,
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    service: Annotated[
+        CampaignService,
+        Depends(get_campaign_service),
+    ],
+):
+    return await service.pause_campaign(campaign_id=campaign_id)
+
+
+@router.post("/campaigns/{campaign_id}/resume", response_model=CampaignResponse)
+async def resume_campaign(
+    campaign_id: int,
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    service: Annotated[
+        CampaignService,
+        Depends(get_campaign_service),
+    ],
+):
+    return await service.resume_campaign(campaign_id=campaign_id)
+
+
+@router.get("/statistic/jobs/campaigns")
+async def campaign_runner_statistic(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+):
+    """
+    Campaigns running in this process and SMTP pool metrics
+    """
+    return campaign_runner.stats()
+
+
 # ------------------------- Action --------------------------------------
 
 
@@ -127,7 +403,11 @@ async def reactivate_user(
     return await admin_service.reactivate_user(user_id=user_id)
 
 
-@router.delete("/delete/user/{user_id}")
+@router.delete(
+    "/delete/user/{user_id}",
+    response_model=AccountDeletionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def delete_user(
     user_id: int,
     current_user: Annotated[
@@ -139,7 +419,53 @@ async def delete_user(
         Depends(get_admin_service),
     ],
 ):
-    return await admin_service.delete_user(user_id=user_id)
+    """
+    Deactivates the user now, deletes the account in background:
+    see /deletions/{job_id}
+    """
+    return await admin_service.delete_user(
+        user_id=user_id,
+        requested_by_id=current_user.id,
+    )
+
+
+@router.get("/deletions", response_model=list[AccountDeletionResponse])
+async def get_account_deletions(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    admin_service: Annotated[
+        AdminService,
+        Depends(get_admin_service),
+    ],
+    job_status: Literal["pending", "running", "completed", "failed", "cancelled"] | None = Query(
+        None, alias="status"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return await admin_service.get_account_deletions(
+        status=job_status, skip=skip, limit=limit
+    )
+
+
+@router.get("/deletions/{job_id}", response_model=AccountDeletionResponse)
+async def get_account_deletion(
+    job_id: int,
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    admin_service: Annotated[
+        AdminService,
+        Depends(get_admin_service),
+    ],
+):
+    """
+    Account deletion progress
+    """
+    return await admin_service.get_account_deletion(job_id=job_id)
 
 
 @router.delete("/delete/post/{post_id}")
@@ -172,6 +498,31 @@ async def delete_comment(
     return await service.delete_comment(user_id=user.id, comment_id=comment_id)
 
 
+@router.delete("/purge/unverified", status_code=status.HTTP_202_ACCEPTED)
+async def purge_unverified_users(
+    current_user: Annotated[
+        User,
+        Depends(get_current_superuser),
+    ],
+    days: int = Query(settings.unverified_purge.older_than_days, ge=1),
+    dry_run: bool = Query(True),
+):
+    """
+    Delete never verified accounts older than N days in batches.
+    Dry run (default) only counts them, otherwise the purge runs
+    in background: see /statistic/jobs/unverified-purge
+    """
+    if dry_run:
+        return {
+            "dry_run": True,
+            "users": await unverified_user_purger.count(older_than_days=days),
+        }
+
+    if not unverified_user_purger.purge_in_background(older_than_days=days):
+        raise error.NotAllowed("Purge is already running")
+    return {"dry_run": False, "started": True}
+
+
 # --------------------------------------------------------------------------
 @router.get("/users/{user_id}/followers")
 async def get_user_followers(
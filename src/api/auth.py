@@ -164,23 +164,19 @@ async def refresh(
     Issues new access and refresh tokens using a valid refresh token
     """
     
-    # found olf refresh token in DB and validate it 
-    token = await user_service.validate_refresh_token(request.refresh_token)
-    
-    token.is_revoked = True
-    await user_service.session.commit()
+    # revoke old refresh token and create new one (one transaction)
+    user_id, refresh_token = await user_service.rotate_refresh_token(
+        request.refresh_token
+    )
     
     # create new access token
     access_token = create_jwt_token(
         {
-            "sub": token.user_id,
+            "sub": user_id,
             "type": "access_token",
         }
     )
     
-    # create new refresh token 
-    refresh_token = await user_service.create_refresh_token(token.user_id)
-    
     return {
         "message": "Update access ando refresh tokens 🥳",
         "access_token": access_token,
@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends, Query
 from typing import Annotated
 from core.config import settings
 from core.dependency.services import (
-    get_post_like_comment_service,
-    get_user_service,
+    get_read_post_like_comment_service,
+    get_read_user_service,
     get_recommendation_service,
 )
 from core.dependency.user import get_current_user
@@ -25,7 +25,7 @@ async def tranding_posts(
     days: int,
     service: Annotated[
         PostLikeCommentService,
-        Depends(get_post_like_comment_service),
+        Depends(get_read_post_like_comment_service),
     ],
 ):
     return await service.get_tranding_posts_by_likes_count(
@@ -39,7 +39,7 @@ async def tranding_users(
     limit: int,
     service: Annotated[
         UserService,
-        Depends(get_user_service),
+        Depends(get_read_user_service),
     ],
 ):
     return await service.get_tranding_users(limit=limit)
@@ -49,7 +49,7 @@ async def tranding_users(
 async def popular_tags(
     service: Annotated[
         PostLikeCommentService,
-        Depends(get_post_like_comment_service),
+        Depends(get_read_post_like_comment_service),
     ],
 ):
     return await service.get_tranding_tag()
@@ -57,8 +57,8 @@ async def popular_tags(
 
 @router.get("/stats-app")
 async def site_stats(
-    service: Annotated[PostLikeCommentService, Depends(get_post_like_comment_service)],
-    service_user: Annotated[UserService, Depends(get_user_service)],
+    service: Annotated[PostLikeCommentService, Depends(get_read_post_like_comment_service)],
+    service_user: Annotated[UserService, Depends(get_read_user_service)],
 ):
     """
     Common stats about app
@@ -81,7 +81,7 @@ async def all_posts(
     limit: int,
     service: Annotated[
         PostLikeCommentService,
-        Depends(get_post_like_comment_service),
+        Depends(get_read_post_like_comment_service),
     ],
 ):
     return await service.get_all_posts(limit=limit)
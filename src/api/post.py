@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends
-from typing import Annotated
+from fastapi import APIRouter, Depends, Query
+from typing import Annotated, Literal
 from core.database.models import User
 from core.dependency.user import get_current_user
 from core.config import settings
-from core.database.schemas.post import PostResponse, PostCreate, PostUpdate
-from core.dependency.services import get_post_like_comment_service
+from core.database.schemas.post import (
+    PostResponse,
+    PostCreate,
+    PostUpdate,
+    PostSearchPage,
+)
+from core.dependency.services import (
+    get_post_like_comment_service,
+    get_read_post_like_comment_service,
+    get_search_service,
+)
 from core.services.PLC import PostLikeCommentService
+from core.services.search import SearchService
 
 router = APIRouter(
     prefix=settings.api.post,
@@ -26,7 +36,7 @@ async def create_post(
         user_id=user.id,
         title=post_data.title,
         content=post_data.content,
-        tag=post_data.tag,
+        tags=post_data.tags,
     )
 
     return post
@@ -61,6 +71,45 @@ async def get_post(
     return await service.get_post_by_id(post_id=post_id)
 
 
+@router.get("/search", response_model=PostSearchPage)
+async def search_posts(
+    user: Annotated[
+        User,
+        Depends(get_current_user),
+    ],
+    service: Annotated[
+        SearchService,
+        Depends(get_search_service),
+    ],
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+):
+    """
+    Full-text search of published posts by title and content
+    """
+    return await service.search_posts(query=q, limit=limit, cursor=cursor)
+
+
+@router.get("/tags/autocomplete")
+async def autocomplete_tags(
+    user: Annotated[
+        User,
+        Depends(get_current_user),
+    ],
+    service: Annotated[
+        PostLikeCommentService,
+        Depends(get_read_post_like_comment_service),
+    ],
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Tags starting with prefix, most used first
+    """
+    return await service.autocomplete_tags(prefix=prefix, limit=limit)
+
+
 @router.get("/tag/{tag}")
 async def get_posts_by_tag(
     tag: str,
@@ -73,7 +122,33 @@ async def get_posts_by_tag(
         Depends(get_post_like_comment_service),
     ],
 ):
-    return await service.get_posts_by_tag(tag=tag)
+    return await service.get_posts_by_tag(tags=[tag])
+
+
+@router.get("/tags")
+async def get_posts_by_tags(
+    user: Annotated[
+        User,
+        Depends(get_current_user),
+    ],
+    service: Annotated[
+        PostLikeCommentService,
+        Depends(get_post_like_comment_service),
+    ],
+    tag: list[str] = Query(..., min_length=1, max_length=10),
+    match: Literal["any", "all"] = "any",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Posts with any (or all) of the tags: ?tag=python&tag=asyncio&match=all
+    """
+    return await service.get_posts_by_tag(
+        tags=tag,
+        match=match,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.patch("/{post_id}")
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Request
-from core.jinja.jinja_templates import templates
+from fastapi import APIRouter
+from fastapi.responses import HTMLResponse
+from core.jinja.jinja_templates import render_static
 
 router = APIRouter(
     prefix="/reset-proccess"
@@ -10,14 +11,8 @@ router = APIRouter(
     include_in_schema=False,
     name="reset-proccess"
 )
-def verify_email_page(
-    request: Request,
+async def verify_email_page(
     token: str,
 ):
-    return templates.TemplateResponse(
-        "bridge/reset_proccess.html",
-        {
-            "request": request,
-            "token": token,
-        }
-    )
\ No newline at end of file
+    # the page is static, the token is read from the URL by its script
+    return HTMLResponse(render_static("bridge/reset_proccess.html"))
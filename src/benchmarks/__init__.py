@@ -0,0 +1,6 @@
+"""
+Benchmarks, run from src/ (database ones need TEST_DATABASE_URL,
+see tests/conftest.py; its schema is dropped and created):
+
+    poetry run python -m benchmarks.<name>
+"""
@@ -0,0 +1,91 @@
+"""
+Deleting a user with --likes likes and as many comments on another
+user's posts (TEST_DATABASE_URL): one DELETE with ON DELETE CASCADE
+(a single transaction, post counters left stale) vs the account
+deletion worker for several batch sizes (counters decremented),
+with the time per chunk transaction, i.e. how long the rows of
+the other user's posts stay locked at a time.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import event, text
+
+from benchmarks.common import fresh_schema, report, timed
+from core.workers import AccountDeletionWorker, account_deletion
+
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+logging.getLogger("core.workers.account_deletion").setLevel(logging.WARNING)
+
+READER_ID = 2
+
+SEED = (
+    "INSERT INTO users (id, email, username, hashed_password,"
+    " is_active, is_verified, is_superuser) VALUES"
+    " (1, 'author@example.com', 'author', 'x', true, true, false),"
+    " (2, 'reader@example.com', 'reader', 'x', false, true, false)",
+    "INSERT INTO posts (user_id, title, content, is_published,"
+    " like_count, comment_count)"
+    " SELECT 1, 'Post ' || n, '', true, 1, 1"
+    " FROM generate_series(1, :likes) n",
+    "INSERT INTO likes (user_id, post_id) SELECT 2, id FROM posts",
+    "INSERT INTO comments (user_id, post_id, content, like_count)"
+    " SELECT 2, id, 'Comment', 0 FROM posts",
+    "INSERT INTO account_deletions (user_id, status, stage, rows_deleted)"
+    " VALUES (2, 'pending', 'likes', 0)",
+    "ANALYZE",
+)
+
+
+async def seed(likes: int):
+    engine = await fresh_schema()
+    async with engine.begin() as conn:
+        for stmt in SEED:
+            await conn.execute(text(stmt), {"likes": likes})
+    return engine
+
+
+async def run(likes: int, batch_sizes: list[int]) -> None:
+    engine = await seed(likes)
+    try:
+        with timed("one DELETE with ON DELETE CASCADE", 1):
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("DELETE FROM users WHERE id = :id"), {"id": READER_ID}
+                )
+    finally:
+        await engine.dispose()
+
+    commits = []
+    event.listen(
+        account_deletion.db_helper.engine.sync_engine,
+        "commit",
+        lambda conn: commits.append(1),
+    )
+    for batch_size in batch_sizes:
+        engine = await seed(likes)
+        commits.clear()
+        try:
+            worker = AccountDeletionWorker(batch_size=batch_size, pause=0)
+            start = time.perf_counter()
+            await worker.run_pending()
+            elapsed = time.perf_counter() - start
+            report(f"worker batch_size={batch_size}", elapsed, 1)
+            report("  per transaction", elapsed, len(commits))
+            assert worker.stats()["jobs_completed"] == 1
+        finally:
+            await account_deletion.db_helper.dispose()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--likes", type=int, default=50_000)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[100, 1000, 10_000]
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.likes, args.batch_sizes))
@@ -0,0 +1,91 @@
+"""
+Listing --users active and verified users, as the admin listings do:
+the whole list as ORM objects (as before), keyset JSON pages and the
+ndjson stream through a server-side cursor. Each is run twice, timed
+and then with the Python memory peak traced. Needs TEST_DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import logging
+import tracemalloc
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import fresh_schema, timed
+from core.database.models import User
+from core.services.admin import AdminService
+from utilities.streaming import ndjson_chunks
+
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+
+
+async def orm_list(session) -> int:
+    result = await session.execute(
+        select(User).where(User.is_verified == True, User.is_active == True)
+    )
+    users = {user.id: user for user in result.scalars().all()}
+    return len(users)
+
+
+async def keyset_pages(session) -> int:
+    service = AdminService(session)
+    listed, after_id = 0, 0
+    while after_id is not None:
+        page = await service.get_all_active_and_verified_users(
+            after_id=after_id, limit=1000
+        )
+        listed += len(page["users"])
+        after_id = page["next_after_id"]
+    return listed
+
+
+async def ndjson_stream(session) -> int:
+    service = AdminService(session)
+    body = ndjson_chunks(service.stream_all_active_and_verified_users())
+    return sum([part.count("\n") async for part in body])
+
+
+async def run(users: int) -> None:
+    engine = await fresh_schema()
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    """
+                    INSERT INTO users (email, username, hashed_password,
+                                       is_active, is_verified, is_superuser)
+                    SELECT 'user' || n || '@example.com', 'user' || n,
+                           repeat('x', 60), true, true, false
+                    FROM generate_series(1, :users) AS n
+                    """
+                ),
+                {"users": users},
+            )
+
+        for name, listing in (
+            ("ORM objects, whole list", orm_list),
+            ("keyset JSON pages of 1000", keyset_pages),
+            ("ndjson stream", ndjson_stream),
+        ):
+            async with sessions() as session:
+                with timed(name, users):
+                    assert await listing(session) == users
+
+            async with sessions() as session:
+                tracemalloc.start()
+                await listing(session)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"memory peak: {peak / 2**20:.1f} MiB")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.users))
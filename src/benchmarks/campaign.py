@@ -0,0 +1,91 @@
+"""
+A whole campaign (read chunk, render, send, checkpoint) to --users
+verified users over a local SMTP stand-in, unpaced, for several
+chunk sizes; with the Python memory peak of the run, which depends
+on the chunk size and not on the number of recipients.
+Needs TEST_DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import logging
+import tracemalloc
+
+from sqlalchemy import text
+
+from benchmarks.common import fresh_schema, timed
+from core.config import settings
+from core.database.models import EmailCampaign
+from core.mailing import SMTPPool
+from core.workers import CampaignRunner, campaign
+from tests.fake_smtp import FakeSMTP
+
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+logging.getLogger("core.workers.campaign").setLevel(logging.WARNING)
+
+
+async def new_campaign(engine, users: int) -> int:
+    async with engine.begin() as conn:
+        return await conn.scalar(
+            EmailCampaign.__table__.insert()
+            .values(
+                subject="News",
+                message="Hello",
+                status="running",
+                total_recipients=users,
+                sent_count=0,
+                failed_count=0,
+                last_user_id=0,
+            )
+            .returning(EmailCampaign.id)
+        )
+
+
+async def run(users: int, chunk_sizes: list[int]) -> None:
+    engine = await fresh_schema()
+    server = FakeSMTP(record=False)
+    await server.start()
+    campaign.smtp_pool = SMTPPool(
+        host="127.0.0.1", port=server.port, size=settings.mail.pool_size
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    """
+                    INSERT INTO users (email, username, hashed_password,
+                                       is_active, is_verified, is_superuser)
+                    SELECT 'user' || n || '@example.com', 'user' || n, 'hashed',
+                           true, true, false
+                    FROM generate_series(1, :users) AS n
+                    """
+                ),
+                {"users": users},
+            )
+
+        for chunk_size in chunk_sizes:
+            runner = CampaignRunner(chunk_size=chunk_size, rate_per_second=1e9)
+            campaign_id = await new_campaign(engine, users)
+            with timed(f"campaign chunk_size={chunk_size}", users):
+                await runner._run(campaign_id)
+
+            # again, tracing allocations is too slow to time
+            campaign_id = await new_campaign(engine, users)
+            tracemalloc.start()
+            await runner._run(campaign_id)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"memory peak: {peak / 2**20:.1f} MiB")
+    finally:
+        await campaign.smtp_pool.close()
+        await campaign.db_helper.dispose()
+        await server.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.chunk_sizes))
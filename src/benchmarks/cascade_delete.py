@@ -0,0 +1,82 @@
+"""
+Deleting a user with --likes likes (TEST_DATABASE_URL):
+children loaded and deleted one by one, as the ORM cascade
+did before passive_deletes, vs one DELETE with ON DELETE CASCADE.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import fresh_schema, timed
+from core.database.models import Like, User
+
+READER_ID = 2
+
+
+async def seed(likes: int):
+    """
+    Author's posts, all liked by the reader
+    """
+    engine = await fresh_schema()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, hashed_password,"
+                " is_active, is_verified, is_superuser) VALUES"
+                " (1, 'author@example.com', 'author', 'x', true, true, false),"
+                " (2, 'reader@example.com', 'reader', 'x', true, true, false)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO posts (user_id, title, content, is_published,"
+                " like_count, comment_count)"
+                " SELECT 1, 'Post ' || n, '', true, 1, 0"
+                " FROM generate_series(1, :likes) n"
+            ),
+            {"likes": likes},
+        )
+        await conn.execute(
+            text("INSERT INTO likes (user_id, post_id) SELECT 2, id FROM posts")
+        )
+        await conn.execute(text("ANALYZE"))
+    return engine
+
+
+async def orm_cascade(sessions) -> None:
+    async with sessions() as session:
+        likes = await session.scalars(select(Like).where(Like.user_id == READER_ID))
+        for like in likes:
+            await session.delete(like)
+        await session.flush()
+        await session.execute(delete(User).where(User.id == READER_ID))
+        await session.commit()
+
+
+async def db_cascade(sessions) -> None:
+    async with sessions() as session:
+        await session.execute(delete(User).where(User.id == READER_ID))
+        await session.commit()
+
+
+async def run(likes: int) -> None:
+    for name, delete_user in (
+        ("children loaded and deleted by the ORM", orm_cascade),
+        ("ON DELETE CASCADE", db_cascade),
+    ):
+        engine = await seed(likes)
+        try:
+            with timed(name, 1):
+                await delete_user(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--likes", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.likes))
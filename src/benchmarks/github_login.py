@@ -0,0 +1,93 @@
+"""
+OAuth login (token exchange, /user, /user/emails) against a local
+GitHub stand-in answering each API call after --delay ms:
+a new aiohttp session per login vs the shared GithubClient,
+/user and /user/emails one after the other vs together, and the
+whole authenticate() (user and profile upsert) with TEST_DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import TEST_DATABASE_URL, fresh_schema, timed
+from core.config import settings
+from core.oauth.github import GithubClient
+from core.services.oauth import OauthService
+from tests.fake_github import FakeGithub
+
+
+async def login(client: GithubClient) -> dict:
+    service = OauthService(session=None, http=client)
+    access_token = await service.get_access_token("octocat")
+    return await service.get_user_info(access_token)
+
+
+async def login_sequential(client: GithubClient) -> dict:
+    """
+    /user, then /user/emails (the email is hidden)
+    """
+    service = OauthService(session=None, http=client)
+    access_token = await service.get_access_token("octocat")
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _, user_data = await client.get(settings.oauth.github_user_url, headers=headers)
+    _, emails = await client.get(settings.oauth.github_email_url, headers=headers)
+    user_data["email"] = next(email["email"] for email in emails if email["primary"])
+    return user_data
+
+
+async def authenticate(logins: int, client: GithubClient) -> None:
+    engine = await fresh_schema()
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        with timed("authenticate (first login, then existing user)", logins):
+            for _ in range(logins):
+                async with sessions() as session:
+                    await OauthService(session=session, http=client).authenticate(
+                        "octocat"
+                    )
+    finally:
+        await engine.dispose()
+
+
+async def run(logins: int, delay: float) -> None:
+    server = FakeGithub(delay=delay)
+    await server.start()
+    settings.oauth.github_url = f"{server.base_url}/login/oauth/access_token"
+    settings.oauth.github_user_url = f"{server.base_url}/user"
+    settings.oauth.github_email_url = f"{server.base_url}/user/emails"
+    try:
+        with timed("session per login", logins):
+            for _ in range(logins):
+                client = GithubClient()
+                await login(client)
+                await client.close()
+        fresh_connections = len(server.connections)
+
+        server.connections.clear()
+        client = GithubClient()
+        with timed("shared GithubClient, /user then /user/emails", logins):
+            for _ in range(logins):
+                await login_sequential(client)
+        with timed("shared GithubClient, /user and /user/emails", logins):
+            for _ in range(logins):
+                await login(client)
+        print(
+            f"connections: {fresh_connections} per-login, "
+            f"{len(server.connections)} shared"
+        )
+
+        if TEST_DATABASE_URL:
+            await authenticate(logins, client)
+        await client.close()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=20, help="ms per API call")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.delay / 1000))
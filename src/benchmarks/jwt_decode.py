@@ -0,0 +1,56 @@
+"""
+Access token verification (no database):
+jwt.decode with the settings looked up per call (as before
+TokenCodec), the codec verifying every token, and the codec
+seeing the same tokens again (verified-token cache).
+"""
+
+import argparse
+
+import jwt
+
+from benchmarks.common import timed
+from core.config import settings
+from utilities.jwt_token import TokenCodec
+
+
+def run(decodes: int, users: int) -> None:
+    codec = TokenCodec(
+        algorithm=settings.access.algorithm,
+        secret_key=settings.access.secret_key,
+        expire_minutes=settings.access.expire_at,
+        cache_size=users,
+    )
+    tokens = [
+        codec.encode({"sub": n, "type": "access_token"}) for n in range(users)
+    ]
+
+    with timed("jwt.decode per call", decodes):
+        for n in range(decodes):
+            jwt.decode(
+                tokens[n % users],
+                settings.access.secret_key,
+                algorithms=[settings.access.algorithm],
+            )
+
+    uncached = TokenCodec(
+        algorithm=settings.access.algorithm,
+        secret_key=settings.access.secret_key,
+        expire_minutes=settings.access.expire_at,
+        cache_size=0,
+    )
+    with timed("TokenCodec, no cache", decodes):
+        for n in range(decodes):
+            uncached.decode(tokens[n % users])
+
+    with timed(f"TokenCodec, {users} users' tokens cached", decodes):
+        for n in range(decodes):
+            codec.decode(tokens[n % users])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--decodes", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.decodes, args.users)
@@ -0,0 +1,88 @@
+"""
+Sending mail to a local SMTP stand-in answering every command
+after --delay ms: a new connection per message (aiosmtplib.send,
+as before the pool) vs the pooled sessions of SMTPPool, and
+draining the email outbox with TEST_DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import logging
+
+import aiosmtplib
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import TEST_DATABASE_URL, fresh_schema, timed
+from core.mailing import SMTPPool, build_message, enqueue_email
+from core.workers import mail_outbox
+from tests.fake_smtp import FakeSMTP
+
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+logging.getLogger("core.workers.mail_outbox").setLevel(logging.WARNING)
+
+
+def message(n: int):
+    return build_message(
+        recipient=f"user{n}@example.com",
+        subject="Subject",
+        plain_content="plain",
+        html_content="<p>html</p>",
+    )
+
+
+async def drain_outbox(messages: int, pool: SMTPPool) -> None:
+    engine = await fresh_schema()
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    mail_outbox.smtp_pool = pool
+    try:
+        async with sessions() as session:
+            for n in range(messages):
+                enqueue_email(
+                    session=session,
+                    recipient=f"user{n}@example.com",
+                    subject="Subject",
+                    plain_content="plain",
+                )
+            await session.commit()
+
+        with timed("outbox drain (claim, send, mark sent)", messages):
+            await mail_outbox.OutboxDispatcher().drain()
+    finally:
+        await mail_outbox.db_helper.dispose()
+        await engine.dispose()
+
+
+async def run(messages: int, delay: float, pool_size: int) -> None:
+    server = FakeSMTP(delay=delay)
+    await server.start()
+    try:
+        with timed("connection per message", messages):
+            for n in range(messages):
+                await aiosmtplib.send(
+                    message(n), hostname="127.0.0.1", port=server.port
+                )
+        print(f"connections: {server.connections}")
+
+        for size in (1, pool_size):
+            server.connections = 0
+            pool = SMTPPool(host="127.0.0.1", port=server.port, size=size)
+            with timed(f"SMTPPool size={size}", messages):
+                await asyncio.gather(*(pool.send(message(n)) for n in range(messages)))
+            await pool.close()
+            print(f"connections: {server.connections}")
+
+        if TEST_DATABASE_URL:
+            pool = SMTPPool(host="127.0.0.1", port=server.port, size=pool_size)
+            await drain_outbox(messages, pool)
+            await pool.close()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=5, help="ms per SMTP reply")
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.delay / 1000, args.pool_size))
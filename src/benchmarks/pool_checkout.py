@@ -0,0 +1,51 @@
+"""
+Database part of an authenticated request (TEST_DATABASE_URL):
+user lookup and endpoint query on one checkout, or on two
+(get_current_user gives the connection back in between),
+with and without pool_pre_ping.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import fresh_schema, timed
+from core.database.models import User
+
+
+async def request(sessions, user_id: int, release: bool) -> None:
+    async with sessions() as session:
+        await session.get(User, user_id)
+        if release:
+            await session.commit()
+        await session.scalar(select(User.username).where(User.id == user_id))
+
+
+async def run(requests: int) -> None:
+    for pre_ping in (False, True):
+        engine = await fresh_schema(pool_pre_ping=pre_ping)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as session:
+                user = User(
+                    email="user@example.com", username="user", hashed_password="x"
+                )
+                session.add(user)
+                await session.commit()
+
+            for release in (False, True):
+                checkouts = "two checkouts" if release else "one checkout"
+                with timed(f"pre_ping={pre_ping}, {checkouts}", requests):
+                    for _ in range(requests):
+                        await request(sessions, user.id, release)
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,79 @@
+"""
+Authenticated requests at pool saturation (TEST_DATABASE_URL):
+--concurrency requests at once on a --pool-size pool, each
+looks the user up, does --work ms of other work (templates,
+external calls) and runs one more query. The connection is
+held for the whole request or given back after the lookup
+(what get_current_user does).
+"""
+
+import argparse
+import asyncio
+import logging
+
+from benchmarks.common import database_url, fresh_schema, timed
+from core.database.db_helper import DatabaseHelper
+from core.database.models import User
+from core.services.user import UserService
+
+
+# pool dispose/recreate messages
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+
+
+async def request(helper: DatabaseHelper, user_id: int, work: float, release: bool):
+    async for session in helper.session_getter():
+        await UserService(session).get_user_by_id(user_id=user_id)
+        if release:
+            await session.commit()
+        await asyncio.sleep(work)
+        await UserService(session).get_user_by_id(user_id=user_id)
+
+
+async def run(requests: int, concurrency: int, pool_size: int, work: float) -> None:
+    engine = await fresh_schema()
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            User.__table__.insert()
+            .values(email="user@example.com", username="user", hashed_password="x")
+            .returning(User.id)
+        )
+        user_id = result.scalar_one()
+    await engine.dispose()
+
+    for release in (False, True):
+        helper = DatabaseHelper(
+            url=database_url(),
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=60,
+            # waiting is the point here, don't log every request
+            pool_wait_warn_ms=float("inf"),
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with semaphore:
+                await request(helper, user_id, work, release)
+
+        name = "released after lookup" if release else "held for the request"
+        try:
+            with timed(f"connection {name}", requests):
+                await asyncio.gather(*(limited() for _ in range(requests)))
+            stats = helper.engine.pool.stats()
+            print(
+                f"    pool wait: avg {stats['avg_wait_ms']} ms, "
+                f"max {stats['max_wait_ms']} ms"
+            )
+        finally:
+            await helper.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--work", type=float, default=100, help="ms per request")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.pool_size, args.work / 1000))
@@ -0,0 +1,118 @@
+"""
+Full-text post search on --posts seeded posts (TEST_DATABASE_URL):
+first and second page of SearchService.search_posts for a common
+word, a rare word and a phrase. Posts are made of random words
+from a small vocabulary, so common words match many posts.
+Every match is ranked: the time grows with the number of matches,
+a word found in most posts (a stop word, with the 'simple'
+configuration) costs seconds on a million posts.
+Then --likes like counter UPDATEs spread over 1000 posts (popular
+posts get the likes; run in a server-side loop, no round trips),
+which must not pay for the search vector.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import fresh_schema, report, timed
+from core.database.models.post import SEARCH_CONFIG
+from core.services.search import SearchService
+
+# words word1..word5000, word n is used ~1/n as often as word1
+VOCABULARY_SIZE = 5000
+
+QUERIES = {
+    "common word": "word1",
+    "rare word": "word4999",
+    "phrase": '"word2 word3"',
+}
+
+
+async def seed(engine, posts: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, hashed_password,"
+                " is_active, is_verified, is_superuser)"
+                " VALUES (1, 'user@example.com', 'user', 'x', true, true, false)"
+            )
+        )
+        # floor(size ^ random()) favours the first words;
+        # "n > 0" makes the word lists differ from post to post
+        word = "'word' || floor(power(CAST(:size AS float8), random()))::int"
+        await conn.execute(
+            text(
+                "INSERT INTO posts (user_id, title, content, is_published,"
+                " like_count, comment_count)"
+                " SELECT 1,"
+                f"  (SELECT string_agg({word}, ' ')"
+                "   FROM generate_series(1, 5) WHERE n > 0),"
+                f"  (SELECT string_agg({word}, ' ')"
+                "   FROM generate_series(1, 60) WHERE n > 0),"
+                "  true, 0, 0"
+                " FROM generate_series(1, :posts) n"
+            ),
+            {"size": VOCABULARY_SIZE, "posts": posts},
+        )
+        await conn.execute(text("ANALYZE posts"))
+
+
+async def run(posts: int, repeat: int, likes: int) -> None:
+    engine = await fresh_schema()
+    try:
+        start = time.perf_counter()
+        await seed(engine, posts)
+        print(f"seeded {posts} posts in {time.perf_counter() - start:.1f} s")
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        for name, query in QUERIES.items():
+            async with sessions() as session:
+                matches = await session.scalar(
+                    text(
+                        "SELECT count(*) FROM posts WHERE search_vector @@"
+                        " websearch_to_tsquery(:config, :query)"
+                    ),
+                    {"config": SEARCH_CONFIG, "query": query},
+                )
+                print(f"{name}: {matches} matching posts")
+                service = SearchService(session)
+                first = second = 0.0
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    page = await service.search_posts(query=query)
+                    first += time.perf_counter() - start
+
+                    if page["next_cursor"] is None:
+                        continue
+                    start = time.perf_counter()
+                    await service.search_posts(query=query, cursor=page["next_cursor"])
+                    second += time.perf_counter() - start
+            report(f"{name}, first page", first, repeat)
+            if second:
+                report(f"{name}, second page", second, repeat)
+
+        with timed("like counter UPDATE", likes):
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        f"DO $$ BEGIN FOR i IN 1..{likes} LOOP"
+                        " UPDATE posts SET like_count = like_count + 1"
+                        f" WHERE id = {posts} - i % 1000;"
+                        " END LOOP; END $$"
+                    )
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--likes", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.repeat, args.likes))
@@ -0,0 +1,68 @@
+"""
+Per-query overhead of the hot service statements:
+a select() built per call vs the module-level template
+(Python only: building the statement and its cache key),
+then executed against TEST_DATABASE_URL with the asyncpg
+prepared statement cache off and on.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import TEST_DATABASE_URL, fresh_schema, timed
+from core.database.models import User
+from core.services.user import _USER_BY_ID
+
+
+def build_per_call(queries: int) -> None:
+    for n in range(queries):
+        select(User).where(User.id == n)._generate_cache_key()
+
+
+def template(queries: int) -> None:
+    for _ in range(queries):
+        _USER_BY_ID._generate_cache_key()
+
+
+async def execute(queries: int) -> None:
+    for cache_size in (0, 500):
+        engine = await fresh_schema(
+            connect_args={"prepared_statement_cache_size": cache_size}
+        )
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as session:
+                user = User(
+                    email="user@example.com", username="user", hashed_password="x"
+                )
+                session.add(user)
+                await session.commit()
+
+                label = f"statement cache {cache_size}"
+                with timed(f"select() per call, {label}", queries):
+                    for _ in range(queries):
+                        await session.execute(select(User).where(User.id == user.id))
+                with timed(f"template, {label}", queries):
+                    for _ in range(queries):
+                        await session.execute(_USER_BY_ID, {"user_id": user.id})
+        finally:
+            await engine.dispose()
+
+
+def run(queries: int) -> None:
+    with timed("select() per call (build + cache key)", queries):
+        build_per_call(queries)
+    with timed("template (cache key)", queries):
+        template(queries)
+    if TEST_DATABASE_URL:
+        asyncio.run(execute(queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.queries)
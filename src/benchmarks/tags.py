@@ -0,0 +1,150 @@
+"""
+Tag queries on --posts seeded posts with 3 tags each out of
+--tags tags, popular tags used more (TEST_DATABASE_URL):
+get_posts_by_tag for any/all of two tags, recommendations
+for a user who liked --likes posts, tag autocomplete and trending
+tags read from the tags.post_count counters against counting
+post_tags.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import fresh_schema, report
+from core.services.PLC import PostLikeCommentService
+from core.services.recomendation import RecommendationService
+
+READER_ID = 2
+
+# a log line per recommendation
+logging.getLogger("core.services.recomendation").setLevel(logging.WARNING)
+
+
+async def seed(engine, posts: int, tags: int, likes: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, hashed_password,"
+                " is_active, is_verified, is_superuser) VALUES"
+                " (1, 'author@example.com', 'author', 'x', true, true, false),"
+                " (2, 'reader@example.com', 'reader', 'x', true, true, false)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO tags (id, name, post_count)"
+                " SELECT n, 'tag' || n, 0 FROM generate_series(1, :tags) n"
+            ),
+            {"tags": tags},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO posts (user_id, title, content, is_published,"
+                " like_count, comment_count)"
+                " SELECT 1, 'Post ' || n, '', true, 0, 0"
+                " FROM generate_series(1, :posts) n"
+            ),
+            {"posts": posts},
+        )
+        # floor(tags ^ random()) favours the first tags
+        await conn.execute(
+            text(
+                "INSERT INTO post_tags (post_id, tag_id)"
+                " SELECT DISTINCT p.id,"
+                "  floor(power(CAST(:tags AS float8), random()))::int"
+                " FROM posts p, generate_series(1, 3) n"
+            ),
+            {"tags": tags},
+        )
+        await conn.execute(
+            text(
+                "UPDATE tags SET post_count = c.count FROM"
+                " (SELECT tag_id, count(*) FROM post_tags GROUP BY tag_id) c"
+                " WHERE c.tag_id = tags.id"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO likes (user_id, post_id)"
+                " SELECT :reader, id FROM posts ORDER BY random() LIMIT :likes"
+            ),
+            {"reader": READER_ID, "likes": likes},
+        )
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+
+
+async def timed_call(name: str, repeat: int, call) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call()
+    report(name, time.perf_counter() - start, repeat)
+
+
+async def run(posts: int, tags: int, likes: int, repeat: int) -> None:
+    engine = await fresh_schema()
+    try:
+        start = time.perf_counter()
+        await seed(engine, posts, tags, likes)
+        print(f"seeded {posts} posts in {time.perf_counter() - start:.1f} s")
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            service = PostLikeCommentService(session)
+            for tag_names in (["tag1", "tag2"], ["tag50", "tag60"]):
+                for match in ("any", "all"):
+                    await timed_call(
+                        f"{match} of {', '.join(tag_names)}",
+                        repeat,
+                        lambda: service.get_posts_by_tag(
+                            tags=tag_names, match=match
+                        ),
+                    )
+
+            recommendations = RecommendationService(session)
+            await timed_call(
+                f"recommendations ({likes} liked posts)",
+                repeat,
+                lambda: recommendations.get_recommended_posts(user_id=READER_ID),
+            )
+
+            for prefix in ("tag1", "tag99"):
+                await timed_call(
+                    f"autocomplete {prefix!r}",
+                    repeat,
+                    lambda: service.autocomplete_tags(prefix=prefix),
+                )
+            await timed_call(
+                "trending tags (counters)",
+                repeat,
+                lambda: service.get_tranding_tag(),
+            )
+            await timed_call(
+                "trending tags (count post_tags)",
+                repeat,
+                lambda: session.execute(
+                    text(
+                        "SELECT t.name, count(*) FROM post_tags pt"
+                        " JOIN tags t ON t.id = pt.tag_id"
+                        " GROUP BY t.id ORDER BY count(*) DESC, t.id LIMIT 20"
+                    )
+                ),
+            )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--tags", type=int, default=1000)
+    parser.add_argument("--likes", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.tags, args.likes, args.repeat))
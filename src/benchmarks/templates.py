@@ -0,0 +1,62 @@
+"""
+Email and bridge page rendering (no database): a fresh
+default Environment per message (as before), the shared
+precompiled environment, render_many on the render thread
+pool, and a bridge page rendered vs served from render_static.
+"""
+
+import argparse
+import asyncio
+
+from jinja2 import Environment, FileSystemLoader
+
+from benchmarks.common import timed
+from core.jinja.bulk_render import render_many
+from core.jinja.jinja_templates import (
+    TEMPLATES_DIR,
+    environment,
+    precompile_templates,
+    render_static,
+)
+
+EMAIL = "mailing/email-verifying/before_verify.html"
+BRIDGE = "bridge/verification_proccess.html"
+
+
+class User:
+    def __init__(self, username: str):
+        self.username = username
+
+
+def run(renders: int) -> None:
+    contexts = [
+        {"user": User(f"user{n}"), "verification_link": f"https://example.com/{n}"}
+        for n in range(renders)
+    ]
+
+    with timed("new Environment per message", renders):
+        for context in contexts:
+            fresh = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+            fresh.get_template(EMAIL).render(context)
+
+    precompile_templates()
+    with timed("shared precompiled Environment", renders):
+        for context in contexts:
+            environment.get_template(EMAIL).render(context)
+
+    with timed("render_many", renders):
+        asyncio.run(render_many(EMAIL, contexts))
+
+    with timed("bridge page rendered", renders):
+        for _ in range(renders):
+            environment.get_template(BRIDGE).render()
+    with timed("bridge page from render_static", renders):
+        for _ in range(renders):
+            render_static(BRIDGE)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.renders)
@@ -0,0 +1,70 @@
+"""
+Purging --users stale unverified accounts (each with a profile and
+a refresh token going with it through ON DELETE CASCADE) with the
+batched purge job, for several batch sizes: time per account and
+per batch, i.e. how long each DELETE transaction holds its locks.
+Needs TEST_DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+
+from sqlalchemy import text
+
+from benchmarks.common import fresh_schema, report
+from core.workers import UnverifiedUserPurger, unverified_purge
+
+logging.getLogger("core.database.pool").setLevel(logging.WARNING)
+logging.getLogger("core.workers.unverified_purge").setLevel(logging.WARNING)
+
+SEED = (
+    """
+    INSERT INTO users (email, username, hashed_password,
+                       is_active, is_verified, is_superuser, created_at)
+    SELECT 'user' || n || '@example.com', 'user' || n, 'hashed',
+           true, false, false, now() - interval '30 days'
+    FROM generate_series(1, :users) AS n
+    """,
+    "INSERT INTO profiles (user_id, theme) SELECT id, 'light' FROM users",
+    """
+    INSERT INTO refresh_tokens (user_id, token_hash, family_id,
+                                expires_at, is_revoked, created_at)
+    SELECT id, encode(sha256(id::text::bytea), 'hex'), gen_random_uuid(),
+           now() + interval '30 days', false, now()
+    FROM users
+    """,
+)
+
+
+async def run(users: int, batch_sizes: list[int]) -> None:
+    engine = await fresh_schema()
+    try:
+        for batch_size in batch_sizes:
+            async with engine.begin() as conn:
+                for stmt in SEED:
+                    await conn.execute(text(stmt), {"users": users})
+                await conn.execute(text("ANALYZE"))
+
+            purger = UnverifiedUserPurger(batch_size=batch_size, pause=0)
+            assert await purger.purge() == users
+            report(f"purge batch_size={batch_size}", purger.last_duration, users)
+            report(
+                "  per batch",
+                purger.last_duration,
+                math.ceil(users / batch_size),
+            )
+    finally:
+        await unverified_purge.db_helper.dispose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[100, 500, 5000, 50_000]
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.batch_sizes))
@@ -0,0 +1,9 @@
+__all__ = (
+    "CacheBackend",
+    "MemoryCache",
+    "post_cache",
+)
+
+from .base import CacheBackend
+from .memory import MemoryCache
+from .post_cache import post_cache
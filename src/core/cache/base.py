@@ -0,0 +1,32 @@
+from typing import Any
+
+
+class CacheBackend:
+    """
+    Interface for cache backends.
+    The in-process MemoryCache implements it,
+    a shared backend (redis, memcached, ...) only
+    needs to implement the same methods.
+    """
+
+    async def get(self, key: Any) -> Any | None:
+        raise NotImplementedError
+
+    async def version(self, key: Any) -> int:
+        """
+        Token to pass to set() for a value loaded after this call:
+        set() skips it if the key was deleted in between
+        """
+        raise NotImplementedError
+
+    async def set(self, key: Any, value: Any, version: int | None = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: Any) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
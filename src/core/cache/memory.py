@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from core.cache.base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """
+    Bounded per-process LRU cache with TTL.
+    Counts hits, misses and evictions for tuning.
+    Deletes are numbered, the last max_size deleted keys
+    remember theirs: a set() of a value loaded before
+    a delete of its key is skipped.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 30,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        # deletes so far, key -> number of its last delete
+        self._deletes = 0
+        self._deleted: OrderedDict[Any, int] = OrderedDict()
+        # number of the last delete that is not remembered any more
+        self._forgotten = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.stale = 0
+
+    async def get(self, key: Any) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def version(self, key: Any) -> int:
+        return self._deletes
+
+    async def set(self, key: Any, value: Any, version: int | None = None) -> None:
+        if version is not None and (
+            self._deleted.get(key, 0) > version or self._forgotten > version
+        ):
+            self.stale += 1
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+        self._deletes += 1
+        self._deleted[key] = self._deletes
+        self._deleted.move_to_end(key)
+        while len(self._deleted) > self.max_size:
+            _, self._forgotten = self._deleted.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+        self._deletes += 1
+        self._deleted.clear()
+        self._forgotten = self._deletes
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "stale": self.stale,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
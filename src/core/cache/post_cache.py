@@ -0,0 +1,11 @@
+from core.config import settings
+from core.cache.base import CacheBackend
+from core.cache.memory import MemoryCache
+
+# Posts by ID for PostLikeCommentService.get_post_by_id.
+# Values are frozen PostDetail schemas, not ORM objects:
+# requests sharing one never share session state.
+post_cache: CacheBackend = MemoryCache(
+    max_size=settings.cache.post_max_size,
+    ttl=settings.cache.post_ttl,
+)
@@ -11,6 +11,10 @@ class AccessToken(BaseModel):
     secret_key: str
     algorithm: str = "HS256"
     expire_at: int = 3600
+    # PEM keys for asymmetric algorithms (RS256, ES256, ...)
+    private_key: str | None = None
+    public_key: str | None = None
+    verified_cache_size: int = 4096
 
 
 class DatabaseConfig(BaseModel):
@@ -19,7 +23,121 @@ class DatabaseConfig(BaseModel):
     echo: bool = False
     max_overflow: int = 50
     pool_size: int = 10
+    # asyncpg prepared statements cached per connection
+    prepared_statement_cache_size: int = 500
+    # a ping is one more round trip on every checkout, and a request
+    # checks out twice (get_current_user gives its connection back):
+    # off by default, pool_recycle retires connections before
+    # server/proxy idle timeouts drop them
+    pool_pre_ping: bool = False
+    pool_recycle: int = 1800
+    pool_timeout: float = 30
+    # server side limit in ms, 0 - no limit
+    statement_timeout: int = 0
+    server_settings: dict[str, str] = {"application_name": "yo-listen"}
+    # log requests waiting longer for a connection
+    pool_wait_warn_ms: float = 100
+    # read-only traffic goes to replicas (if any)
+    replica_urls: list[PostgresDsn] = []
+    # seconds a user's reads stay on the primary after their write
+    # (tracked per process, not shared between workers)
+    read_your_writes_window: float = 5
+
+
+class RefreshTokenGCConfig(BaseModel):
+    enabled: bool = True
+    # seconds between sweeps
+    interval: int = 3600
+    batch_size: int = 1000
+    # seconds between batches
+    pause: float = 0.5
+    revoked_retention_days: int = 7
+
+
+class UnverifiedPurgeConfig(BaseModel):
+    # periodic purge, the admin endpoint and CLI work regardless
+    enabled: bool = False
+    older_than_days: int = 7
+    interval: int = 86400
+    batch_size: int = 500
+    pause: float = 0.5
+
+
+class AccountDeletionConfig(BaseModel):
+    # rows deleted per transaction
+    batch_size: int = 1000
+    pause: float = 0.1
+    # how often pending jobs are polled
+    interval: float = 5
+    # a job whose heartbeat is older than this is taken over
+    claim_timeout: float = 300
+
+
+class RateLimitRule(BaseModel):
+    # token buckets refilled continuously over a minute
+    ip_per_minute: int = 20
+    login_per_minute: int = 5
+
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = True
+    # behind a reverse proxy the client IP is in X-Forwarded-For
+    trust_forwarded_for: bool = False
+    # paths under api.prefix + api.auth
+    auth_routes: dict[str, RateLimitRule] = {
+        "/login": RateLimitRule(ip_per_minute=20, login_per_minute=5),
+        "/forgot-password": RateLimitRule(ip_per_minute=5, login_per_minute=2),
+        "/resend-verification": RateLimitRule(ip_per_minute=5, login_per_minute=2),
+    }
+
+
+class CacheConfig(BaseModel):
+    post_max_size: int = 1024
+    post_ttl: int = 30
     
+class MailConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 1025
+    username: str | None = None
+    password: str | None = None
+    use_tls: bool = False
+    start_tls: bool | None = None
+    timeout: float = 10
+    sender: str = "admin@site.com"
+    # persistent SMTP connections shared by all senders
+    pool_size: int = 4
+    # outbox worker
+    outbox_enabled: bool = True
+    outbox_interval: float = 2
+    outbox_batch_size: int = 50
+    max_attempts: int = 5
+    # retry delay is backoff_base * 2 ** (attempts - 1), capped by backoff_max
+    backoff_base: float = 30
+    backoff_max: float = 3600
+    # a claimed row is retried after this if the worker died mid-send
+    claim_timeout: float = 300
+
+
+class CampaignConfig(BaseModel):
+    # recipients fetched per server-side cursor round trip and rendered together
+    chunk_size: int = 500
+    rate_per_second: float = 20
+    # a campaign whose heartbeat is older than this is taken over,
+    # must be longer than one chunk takes (chunk_size / rate_per_second)
+    claim_timeout: float = 300
+    resume_on_startup: bool = True
+
+
+class TemplatesConfig(BaseModel):
+    # None -> system temp dir
+    bytecode_cache_dir: str | None = None
+    # compile every template on startup
+    precompile: bool = True
+    # threads for bulk email rendering
+    render_workers: int = 4
+    render_chunk_size: int = 200
+
+
 class GithubOauth(BaseModel):
     client_id: str
     client_secret: str
@@ -27,6 +145,14 @@ class GithubOauth(BaseModel):
     github_url: str = "https://github.com/login/oauth/access_token"
     github_email_url: str = "https://api.github.com/user/emails"
     github_user_url: str = "https://api.github.com/user"
+    # app-lifetime HTTP client (core.oauth.github.client)
+    http_pool_size: int = 20
+    http_keepalive_timeout: float = 30
+    http_dns_cache_ttl: int = 300
+    http_connect_timeout: float = 3
+    http_timeout: float = 10
+    http_retries: int = 2
+    http_retry_backoff: float = 0.2
     
 
 class ApiPrefix(BaseModel):
@@ -53,6 +179,14 @@ class Settings(BaseSettings):
     access: AccessToken
     oauth: GithubOauth
     db: DatabaseConfig
+    cache: CacheConfig = CacheConfig()
+    mail: MailConfig = MailConfig()
+    templates: TemplatesConfig = TemplatesConfig()
+    campaign: CampaignConfig = CampaignConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    refresh_token_gc: RefreshTokenGCConfig = RefreshTokenGCConfig()
+    unverified_purge: UnverifiedPurgeConfig = UnverifiedPurgeConfig()
+    account_deletion: AccountDeletionConfig = AccountDeletionConfig()
     
 
 settings = Settings()
\ No newline at end of file
@@ -1,11 +1,43 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from core.config import settings
 from core.database import db_helper, Base
+from core.mailing import smtp_pool
+from core.oauth.github import github_client
+from core.jinja.jinja_templates import precompile_templates
+from core.jinja.bulk_render import shutdown_render_pool
+from core.workers import (
+    refresh_token_sweeper,
+    outbox_dispatcher,
+    campaign_runner,
+    unverified_user_purger,
+    account_deletion_worker,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
+    github_client.start()
+    if settings.templates.precompile:
+        precompile_templates()
+    if settings.refresh_token_gc.enabled:
+        refresh_token_sweeper.start()
+    if settings.unverified_purge.enabled:
+        unverified_user_purger.start()
+    account_deletion_worker.start()
+    if settings.mail.outbox_enabled:
+        outbox_dispatcher.start()
+    if settings.campaign.resume_on_startup:
+        campaign_runner.resume_unfinished()
     yield
     # shutdown
+    await campaign_runner.stop()
+    await refresh_token_sweeper.stop()
+    await unverified_user_purger.stop()
+    await account_deletion_worker.stop()
+    await outbox_dispatcher.stop()
+    await smtp_pool.close()
+    await github_client.close()
+    shutdown_render_pool()
     await db_helper.dispose()
\ No newline at end of file
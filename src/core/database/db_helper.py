@@ -1,6 +1,14 @@
+import time
+import logging
+from itertools import cycle
 from typing import AsyncGenerator
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from core.config import settings
+from core.database.pool import TimedQueuePool
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseHelper:
@@ -11,14 +19,51 @@ class DatabaseHelper:
             echo_pool: bool = False,
             pool_size: int = 5,
             max_overflow: int = 10,
+            prepared_statement_cache_size: int = 500,
+            pool_pre_ping: bool = False,
+            pool_recycle: int = -1,
+            pool_timeout: float = 30,
+            statement_timeout: int = 0,
+            server_settings: dict[str, str] | None = None,
+            pool_wait_warn_ms: float = 100,
+            replica_urls: list[str] | None = None,
+            read_your_writes_window: float = 5,
     ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
+        server_settings = dict(server_settings or {})
+        if statement_timeout:
+            server_settings["statement_timeout"] = str(statement_timeout)
+
+        self._engine_options = dict(
             echo=echo,
             echo_pool=echo_pool,
+            poolclass=TimedQueuePool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            connect_args={
+                "prepared_statement_cache_size": prepared_statement_cache_size,
+                "server_settings": server_settings,
+            },
+        )
+
+        self.engine: AsyncEngine = create_async_engine(
+            url=url,
+            **self._engine_options,
         )
+        self.replica_engines: list[AsyncEngine] = [
+            create_async_engine(url=replica_url, **self._engine_options)
+            for replica_url in replica_urls or []
+        ]
+        self._replicas = cycle(self.replica_engines)
+
+        self.pool_wait_warn_ms = pool_wait_warn_ms
+        self.read_your_writes_window = read_your_writes_window
+        # user_id -> monotonic time until which reads stay on primary;
+        # per process: with several workers a read served by another
+        # worker may still go to a replica that hasn't caught up
+        self._recent_writers: dict[int, float] = {}
 
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
@@ -29,10 +74,100 @@ class DatabaseHelper:
 
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for engine in self.replica_engines:
+            await engine.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        One session per request: FastAPI caches this dependency, so
+        get_current_user and the services share it. The session checks
+        out a connection on its first statement and returns it on commit.
+        Depend on it with scope="function" to close it before the
+        response and background tasks are sent.
+        """
         async with self.session_factory() as session:
-            yield session
+            try:
+                yield session
+            finally:
+                self._report_acquire_wait(session)
+
+    async def read_session_getter(
+        self,
+        user_id: int | None = None,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Session for read-only work, bound to a replica
+        unless the user has just written to the primary.
+        Replica rows may lag behind: info["replica"] tells
+        process-wide caches not to keep them.
+        """
+        engine = self.read_engine(user_id)
+        async with self.session_factory(bind=engine) as session:
+            session.info["read_only"] = True
+            session.info["replica"] = engine is not self.engine
+            try:
+                yield session
+            finally:
+                self._report_acquire_wait(session)
+
+    def read_engine(
+        self,
+        user_id: int | None = None,
+    ) -> AsyncEngine:
+        """
+        Next replica (round robin) or primary if there are no
+        replicas or the user wrote something recently.
+        """
+        if not self.replica_engines:
+            return self.engine
+
+        if user_id is not None and user_id in self._recent_writers:
+            if self._recent_writers[user_id] > time.monotonic():
+                return self.engine
+            del self._recent_writers[user_id]
+
+        return next(self._replicas)
+
+    def note_write(
+        self,
+        user_id: int,
+    ) -> None:
+        """
+        Keep reads of the user on primary for read_your_writes_window
+        (in this process only)
+        """
+        if not self.replica_engines:
+            return
+
+        now = time.monotonic()
+        if len(self._recent_writers) > 10_000:
+            self._recent_writers = {
+                uid: until
+                for uid, until in self._recent_writers.items()
+                if until > now
+            }
+        self._recent_writers[user_id] = now + self.read_your_writes_window
+
+    def pool_stats(self) -> dict:
+        """
+        Checked-out/overflow/wait statistics of the engine pool
+        """
+        return {
+            **self.engine.pool.stats(),
+            "replicas": [engine.pool.stats() for engine in self.replica_engines],
+        }
+
+    def _report_acquire_wait(self, session: AsyncSession) -> None:
+        """
+        Log requests that waited too long for a pooled connection
+        """
+        wait_ms = session.info.get("acquire_wait", 0.0) * 1000
+        if wait_ms >= self.pool_wait_warn_ms:
+            logger.warning(
+                "Request waited %.1f ms for a DB connection, pool: %s",
+                wait_ms,
+                session.bind.pool.status(),
+            )
 
 
 db_helper = DatabaseHelper(
@@ -41,4 +176,66 @@ db_helper = DatabaseHelper(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    pool_recycle=settings.db.pool_recycle,
+    pool_timeout=settings.db.pool_timeout,
+    statement_timeout=settings.db.statement_timeout,
+    server_settings=settings.db.server_settings,
+    pool_wait_warn_ms=settings.db.pool_wait_warn_ms,
+    replica_urls=[str(url) for url in settings.db.replica_urls],
+    read_your_writes_window=settings.db.read_your_writes_window,
 )
+
+
+@event.listens_for(Session, "after_begin")
+def _collect_acquire_wait(session, transaction, connection) -> None:
+    """
+    Sum pool waits of every connection the session checked out
+    """
+    wait = connection.info.pop("acquire_wait", 0.0)
+    session.info["acquire_wait"] = session.info.get("acquire_wait", 0.0) + wait
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state) -> None:
+    """
+    INSERT/UPDATE/DELETE run through session.execute
+    """
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_write(session, flush_context) -> None:
+    """
+    Objects added, changed or deleted through the unit of work
+    """
+    if (
+        session.new
+        or session.deleted
+        or any(session.is_modified(obj) for obj in session.dirty)
+    ):
+        session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session) -> None:
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session) -> None:
+    """
+    Commits of a known user that wrote something route
+    their next reads to primary; a commit that only ends
+    a read transaction (get_current_user) doesn't
+    """
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+    if wrote and user_id is not None and not session.info.get("read_only"):
+        db_helper.note_write(user_id)
@@ -8,14 +8,24 @@ __all__ = (
     "CommentLike",
     "Subscription",
     "Notification",
+    "EmailOutbox",
+    "EmailCampaign",
+    "AccountDeletion",
+    "Tag",
+    "PostTag",
 )
 
 from .user import User
 from .refresh_token import RefreshToken
 from .profile import Profile
+from .tag import Tag
+from .post_tag import PostTag
 from .comment import Comment
 from .like import Like
 from .like_comment import CommentLike
 from .post import Post
 from .subscription import Subscription
-from .notification import Notification
\ No newline at end of file
+from .notification import Notification
+from .email_outbox import EmailOutbox
+from .email_campaign import EmailCampaign
+from .account_deletion import AccountDeletion
\ No newline at end of file
@@ -0,0 +1,49 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from core.database import Base
+
+
+class AccountDeletion(Base):
+    __tablename__ = "account_deletions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    # no FK: the job outlives the user
+    user_id: Mapped[int] = mapped_column(Integer, index=True)
+
+    requested_by_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "users.id",
+            ondelete="SET NULL",
+        ),
+        nullable=True,
+    )
+
+    # pending -> running -> completed | failed,
+    # cancelled when the user is reactivated before completion
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    # current step, see core/workers/account_deletion.py
+    stage: Mapped[str] = mapped_column(String(30), default="likes")
+    rows_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    # set by the process running the job, refreshed on every chunk
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # one unfinished job per user (concurrent delete requests share it)
+        Index(
+            "uq_account_deletions_user_id_unfinished",
+            "user_id",
+            unique=True,
+            postgresql_where=status.notin_(("completed", "cancelled")),
+        ),
+    )
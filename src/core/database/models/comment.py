@@ -15,14 +15,16 @@ class Comment(Base):
 
     user_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("users.id"),
+        ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     post_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("posts.id"),
+        ForeignKey("posts.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     content: Mapped[str] = mapped_column(Text, nullable=False)
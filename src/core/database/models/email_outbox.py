@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from core.database import Base
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    recipient: Mapped[str] = mapped_column(String(255))
+    subject: Mapped[str] = mapped_column(String(255))
+    plain_content: Mapped[str] = mapped_column(Text)
+    html_content: Mapped[str] = mapped_column(Text, default="")
+
+    # pending -> sent, or failed after mail.max_attempts
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+    )
+    sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # only pending rows are ever polled
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=(status == "pending"),
+        ),
+    )
@@ -11,13 +11,14 @@ class Like(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("users.id"),
+        ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
     )
     post_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("posts.id"),
+        ForeignKey("posts.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     
     user: Mapped["User"] = relationship("User", back_populates="likes")
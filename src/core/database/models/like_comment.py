@@ -12,7 +12,7 @@ class CommentLike(Base):
     
     user_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("users.id"),
+        ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
     )
     
@@ -20,7 +20,7 @@ class CommentLike(Base):
         Integer,
         ForeignKey("comments.id", ondelete="CASCADE"),
         nullable=False,
-        
+        index=True,
     )
     
     user: Mapped["User"] = relationship("User", back_populates="comment_likes")
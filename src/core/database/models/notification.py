@@ -20,6 +20,7 @@ class Notification(Base):
             "users.id",
             ondelete="CASCADE",
         ),
+        index=True,
     )
     action_by_id: Mapped[int] = mapped_column(
         Integer,
@@ -27,6 +28,7 @@ class Notification(Base):
             "users.id",
             ondelete="CASCADE",
         ),
+        index=True,
     )
 
     type: Mapped[str] = mapped_column(String(50))
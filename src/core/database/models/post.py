@@ -1,13 +1,42 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 from core.database import Base
-from sqlalchemy import String, Boolean, DateTime, func, Integer, ForeignKey, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Boolean, DateTime, func, Integer, ForeignKey, Text, Index, select, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR, aggregate_order_by
+from sqlalchemy.orm import Mapped, mapped_column, relationship, column_property
+from core.database.models.tag import Tag
+from core.database.models.post_tag import PostTag
 if TYPE_CHECKING:
     from core.database.models.user import User
     from core.database.models.like import Like
     from core.database.models.comment import Comment
 
+# 'simple': posts are written in several languages, no stemming;
+# search queries must use the same configuration
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.content, '')), 'B')"
+)
+
+# a trigger on title and content, not a generated column: postgres
+# recomputes generated columns on every UPDATE of the row,
+# like and comment counter updates included
+SEARCH_VECTOR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION posts_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER posts_search_vector
+BEFORE INSERT OR UPDATE OF title, content ON posts
+FOR EACH ROW EXECUTE FUNCTION posts_search_vector_update()
+"""
+
+
 class Post(Base):
     __tablename__ = "posts"
 
@@ -15,12 +44,20 @@ class Post(Base):
     
     user_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("users.id")
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
     )
     
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    tag: Mapped[str] = mapped_column(String(100), nullable=False)
+    # tag names (sorted), loaded with the post from post_tags
+    tags: Mapped[list[str]] = column_property(
+        select(func.array_agg(aggregate_order_by(Tag.name, Tag.name)))
+        .join(PostTag, PostTag.tag_id == Tag.id)
+        .where(PostTag.post_id == id)
+        .correlate_except(Tag, PostTag)
+        .scalar_subquery()
+    )
     
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -29,9 +66,34 @@ class Post(Base):
     
     like_count: Mapped[int] = mapped_column(Integer, default=0)
     comment_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # maintained by the posts_search_vector trigger, title ranks
+    # above content; deferred: never loaded with the post
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        nullable=True,
+        deferred=True,
+    )
     
     author: Mapped["User"] = relationship("User", back_populates="posts")
-    likes: Mapped["Like"] = relationship("Like", back_populates="post", cascade="all, delete-orphan")
-    comments: Mapped["Comment"] = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
-    
-    
+    # children are removed by ON DELETE CASCADE, not loaded and deleted one by one
+    likes: Mapped["Like"] = relationship(
+        "Like",
+        back_populates="post",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    comments: Mapped["Comment"] = relationship(
+        "Comment",
+        back_populates="post",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+event.listen(Post.__table__, "after_create", DDL(SEARCH_VECTOR_FUNCTION))
+event.listen(Post.__table__, "after_create", DDL(SEARCH_VECTOR_TRIGGER))
@@ -0,0 +1,23 @@
+from core.database import Base
+from sqlalchemy import Integer, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class PostTag(Base):
+    __tablename__ = "post_tags"
+
+    post_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tag_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("tags.id"),
+        primary_key=True,
+    )
+
+    __table_args__ = (
+        # tag -> posts lookups and any/all intersections read only this index
+        Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
+    )
@@ -1,5 +1,6 @@
+import uuid
 from datetime import datetime
-from sqlalchemy import String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import CHAR, Boolean, ForeignKey, DateTime, Index, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column
 from core.database import Base
 
@@ -15,13 +16,30 @@ class RefreshToken(Base):
             )
         )
     
-    token: Mapped[str] = mapped_column(String(500), unique=True, index=True)
+    # sha256 hex digest, the token itself is never stored
+    token_hash: Mapped[str] = mapped_column(CHAR(64), unique=True)
+    
+    # all tokens rotated from the same login
+    family_id: Mapped[uuid.UUID] = mapped_column(Uuid)
     
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False)
+    # revoked tokens are kept for reuse detection counting from here
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     
     
     expires_at: Mapped[datetime] = mapped_column(DateTime)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, 
         default=func.now()
-        )
\ No newline at end of file
+        )
+    
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_family", "user_id", "family_id"),
+        # refresh token GC: expired tokens and tokens revoked long ago
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index(
+            "ix_refresh_tokens_revoked_at",
+            "revoked_at",
+            postgresql_where=revoked_at.isnot(None),
+        ),
+    )
\ No newline at end of file
@@ -0,0 +1,26 @@
+from core.database import Base
+from sqlalchemy import String, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # normalised: lower case, no leading '#', single spaces
+    name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    # published posts with this tag, maintained by PostLikeCommentService
+    post_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    __table_args__ = (
+        # prefix autocomplete: byte-wise range scan whatever the collation
+        Index(
+            "ix_tags_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        # trending tags: first K entries of the index
+        Index("ix_tags_post_count", post_count.desc(), "id"),
+    )
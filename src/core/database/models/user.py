@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Boolean, DateTime, func, Integer
+from sqlalchemy import String, Boolean, DateTime, func, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.database import Base
 
@@ -19,50 +19,55 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    email: Mapped[str] = mapped_column(
-        String(100), unique=True, index=True, nullable=False
-    )
+    # email and username are unique case-insensitively (see __table_args__)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255))
-    username: Mapped[str] = mapped_column(
-        String(30), unique=True, index=True, nullable=False
-    )
+    username: Mapped[str] = mapped_column(String(30), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
+    # the unique constraint's index serves the OAuth lookups
     github_id: Mapped[int] = mapped_column(Integer, unique=True, nullable=True)
+    # access tokens issued before this moment are rejected (logout)
+    tokens_valid_after: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
     profile: Mapped["Profile"] = relationship(
         "Profile",
         back_populates="user",
         uselist=False,
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     posts: Mapped[list["Post"]] = relationship(
         "Post",
         back_populates="author",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     likes: Mapped[list["Like"]] = relationship(
         "Like",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     comment_likes: Mapped[list["CommentLike"]] = relationship(
         "CommentLike",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     comments: Mapped[list["Comment"]] = relationship(
         "Comment",
         back_populates="author",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     following: Mapped[list["Subscription"]] = relationship(
@@ -70,6 +75,7 @@ class User(Base):
         foreign_keys="[Subscription.follower_id]",
         back_populates="follower",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         lazy="selectin",
     )
 
@@ -78,6 +84,7 @@ class User(Base):
         foreign_keys="[Subscription.following_id]",
         back_populates="following",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         lazy="selectin",
     )
     
@@ -86,4 +93,11 @@ class User(Base):
         foreign_keys="[Notification.user_id]",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # lookups compare lower(column) = lower(:value)
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
     )
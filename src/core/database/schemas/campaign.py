@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from typing import Optional
+
+
+class CampaignCreate(BaseModel):
+    subject: str = Field(max_length=255)
+    message: str
+
+
+class CampaignResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created_by_id: Optional[int]
+    subject: str
+    status: str
+    total_recipients: int
+    sent_count: int
+    failed_count: int
+    last_user_id: int
+    last_error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
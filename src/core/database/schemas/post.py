@@ -1,11 +1,11 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from typing import Optional
 
 class PostBase(BaseModel):
     title: str
     content: str
-    tag: str
+    tags: list[str] = Field(min_length=1, max_length=10)
     is_published: bool = True
 
 class PostCreate(PostBase):
@@ -14,7 +14,7 @@ class PostCreate(PostBase):
 class PostUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
-    tag: Optional[str] = None
+    tags: Optional[list[str]] = Field(None, min_length=1, max_length=10)
     is_published: Optional[bool] = None
 
 
@@ -28,11 +28,26 @@ class PostResponse(PostBase):
     created_at: datetime
     updated_at: datetime
     
+class PostDetail(PostResponse):
+    """
+    Post by ID, shared between requests by the post cache
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    tags: tuple[str, ...] = ()
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def no_tags(cls, tags):
+        # array_agg over no tags is NULL
+        return tags or ()
+
+
 class PostList(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
     title: str
-    tag: str
+    tags: list[str]
     user_id: int
     like_count: int
     comment_count: int
@@ -44,4 +59,15 @@ class UserPostsResponse(BaseModel):
     hidden_posts: list[PostResponse]
     total_public: int
     total_hidden: int
-    all_posts: int
\ No newline at end of file
+    all_posts: int
+
+class PostSearchHit(PostList):
+    rank: float
+    # content fragments with matches wrapped in <mark></mark>
+    headline: str
+
+
+class PostSearchPage(BaseModel):
+    posts: list[PostSearchHit]
+    # pass as cursor to get the next page, None on the last page
+    next_cursor: Optional[str]
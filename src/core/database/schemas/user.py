@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, EmailStr, ConfigDict
 
 class UserBase(BaseModel):
@@ -27,4 +28,18 @@ class UserResponse(UserBase):
     
     
 class UserAdminResponse(UserResponse):
-    pass
\ No newline at end of file
+    pass
+
+class AccountDeletionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    requested_by_id: int | None
+    status: str
+    stage: str
+    rows_deleted: int
+    last_error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -2,6 +2,8 @@ from fastapi import BackgroundTasks, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 from core.database import db_helper
+from core.dependency.session import get_read_session
+from core.oauth.github import github_client
 from core.services import (
     UserService,
     AdminService,
@@ -11,32 +13,74 @@ from core.services import (
     RecommendationService,
     SubscriptionService,
     NotificationService,
+    CampaignService,
+    SearchService,
 )
 
 
 async def get_user_service(
     background_task: BackgroundTasks,
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.session_getter, scope="function"),
+    ],
 ) -> UserService:
     return UserService(session=session, background_task=background_task)
 
 
+async def get_read_user_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(get_read_session, scope="function"),
+    ],
+) -> UserService:
+    return UserService(session=session)
+
+
 async def get_admin_service(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.session_getter, scope="function"),
+    ],
 ) -> AdminService:
     return AdminService(session=session)
 
 
+async def get_read_admin_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(get_read_session, scope="function"),
+    ],
+) -> AdminService:
+    return AdminService(session=session)
+
+
+async def get_stream_admin_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(get_read_session),
+    ],
+) -> AdminService:
+    """
+    Request scoped read session: stays open while
+    a StreamingResponse body is being sent
+    """
+    return AdminService(session=session)
+
+
 async def get_oauth_service(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.session_getter, scope="function"),
+    ],
 ) -> OauthService:
-    return OauthService(session=session)
+    return OauthService(session=session, http=github_client)
 
 
 async def get_profile_service(
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(db_helper.session_getter, scope="function"),
     ],
 ) -> ProfileService:
     return ProfileService(session=session)
@@ -46,7 +90,7 @@ async def get_post_like_comment_service(
     background_task: BackgroundTasks,
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(db_helper.session_getter, scope="function"),
     ],
 ) -> PostLikeCommentService:
     return PostLikeCommentService(
@@ -55,10 +99,19 @@ async def get_post_like_comment_service(
     )
 
 
+async def get_read_post_like_comment_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(get_read_session, scope="function"),
+    ],
+) -> PostLikeCommentService:
+    return PostLikeCommentService(session=session)
+
+
 async def get_recommendation_service(
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(get_read_session, scope="function"),
     ],
 ) -> RecommendationService:
     return RecommendationService(session=session)
@@ -68,7 +121,7 @@ async def get_subscription_service(
     background_task: BackgroundTasks,
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(db_helper.session_getter, scope="function"),
     ],
 ) -> SubscriptionService:
     return SubscriptionService(
@@ -80,7 +133,25 @@ async def get_subscription_service(
 async def get_notification_service(
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(db_helper.session_getter, scope="function"),
     ],
 ) -> NotificationService:
     return NotificationService(session=session)
+
+
+async def get_campaign_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.session_getter, scope="function"),
+    ],
+) -> CampaignService:
+    return CampaignService(session=session)
+
+
+async def get_search_service(
+    session: Annotated[
+        AsyncSession,
+        Depends(get_read_session, scope="function"),
+    ],
+) -> SearchService:
+    return SearchService(session=session)
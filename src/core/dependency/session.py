@@ -0,0 +1,29 @@
+from typing import Annotated, AsyncGenerator
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import db_helper
+from utilities.jwt_token import verify_token
+from .transport import optional_security
+
+
+async def get_read_session(
+    token: Annotated[
+        HTTPAuthorizationCredentials | None,
+        Depends(optional_security),
+    ],
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session (replica if configured).
+    The token is only used to keep the reads of a user
+    who has just written something on the primary.
+    """
+    user_id = None
+    if token:
+        payload = verify_token(token.credentials, expected_type="access_token")
+        if payload and str(payload.get("sub", "")).isdigit():
+            user_id = int(payload["sub"])
+
+    async for session in db_helper.read_session_getter(user_id=user_id):
+        yield session
@@ -1,3 +1,4 @@
 from fastapi.security import HTTPBearer
 
-security = HTTPBearer(auto_error=True)
\ No newline at end of file
+security = HTTPBearer(auto_error=True)
+optional_security = HTTPBearer(auto_error=False)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import Annotated
+from datetime import timezone
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,7 +18,7 @@ async def get_current_user(
     ],
     session: Annotated[
         AsyncSession,
-        Depends(db_helper.session_getter),
+        Depends(db_helper.session_getter, scope="function"),
     ],
 ) -> User:
 
@@ -42,4 +43,18 @@ async def get_current_user(
     if not user.is_active:
         raise error.NotAllowed("Account deactivated")
 
+    # token was issued before logout / password reset
+    if user.tokens_valid_after and payload.get("iat", 0) < (
+        user.tokens_valid_after.replace(tzinfo=timezone.utc).timestamp()
+    ):
+        raise error.Unauthorized("Token revoked")
+
+    # commits of this request are writes of the user (read-your-writes)
+    session.info["user_id"] = user.id
+
+    # end the lookup transaction so the connection goes back to the pool,
+    # the endpoint checks one out again on its first statement
+    # (nothing was written: this commit doesn't pin reads to primary)
+    await session.commit()
+
     return user
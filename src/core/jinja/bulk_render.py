@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+from core.config import settings
+from .jinja_templates import environment
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.templates.render_workers,
+    thread_name_prefix="jinja-render",
+)
+
+
+def _render_chunk(name: str, contexts: list[dict[str, Any]]) -> list[str]:
+    template = environment.get_template(name)
+    return [template.render(context) for context in contexts]
+
+
+async def render_many(
+    name: str,
+    contexts: Iterable[dict[str, Any]],
+    chunk_size: int | None = None,
+) -> list[str]:
+    """
+    Render one template for many contexts (campaign emails)
+    in chunks on the render thread pool, keeping the event loop free.
+    Output is in the order of contexts.
+    """
+    contexts = list(contexts)
+    chunk_size = chunk_size or settings.templates.render_chunk_size
+
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                _executor,
+                _render_chunk,
+                name,
+                contexts[i : i + chunk_size],
+            )
+            for i in range(0, len(contexts), chunk_size)
+        )
+    )
+    return [html for chunk in chunks for html in chunk]
+
+
+def shutdown_render_pool() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,38 @@
+from functools import lru_cache
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from fastapi.templating import Jinja2Templates
-from core.config import BASE_DIR
+from core.config import BASE_DIR, settings
 
-templates = Jinja2Templates(
-    directory=BASE_DIR / "core" / "templates",
-)
\ No newline at end of file
+TEMPLATES_DIR = BASE_DIR / "core" / "templates"
+
+# templates never change at runtime: no mtime checks,
+# compiled code kept in memory and in the bytecode cache between restarts
+environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(settings.templates.bytecode_cache_dir),
+)
+
+templates = Jinja2Templates(env=environment)
+
+
+def precompile_templates() -> int:
+    """
+    Compile all templates once (at startup)
+    Return number of templates
+    """
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    return len(names)
+
+
+@lru_cache
+def render_static(name: str) -> str:
+    """
+    Rendered page of a template without context
+    (bridge pages: the token is read by the page script)
+    """
+    return environment.get_template(name).render()
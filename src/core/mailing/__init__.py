@@ -3,9 +3,17 @@ __all__ = (
     "send_answer_after_verify",
     "send_pasword_reset_email",
     "send_answer_after_reset_password",
+    "build_message",
+    "send_email",
+    "enqueue_email",
+    "SMTPPool",
+    "smtp_pool",
 )
 
 from .send_email_to_verify import send_verification_email
 from .send_email_after_verify import send_answer_after_verify
 from .send_email_to_forgot_password import send_pasword_reset_email
 from .send_email_to_reset_password import send_answer_after_reset_password
+
+from .base_send_email import build_message, send_email, enqueue_email
+from .smtp_pool import SMTPPool, smtp_pool
@@ -1,17 +1,20 @@
-import aiosmtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from sqlalchemy.ext.asyncio import AsyncSession
 
-async def send_email(
+from core.config import settings
+from core.database.models import EmailOutbox
+from .smtp_pool import smtp_pool
+
+
+def build_message(
     recipient: str,
     subject: str,
     plain_content: str,
     html_content: str = ""
-):
-    admin_email = "admin@site.com"
-    
+) -> MIMEMultipart:
     message = MIMEMultipart("alternative")
-    message["From"] = admin_email
+    message["From"] = settings.mail.sender
     message["To"] = recipient
     message["Subject"] = subject
     
@@ -31,9 +34,47 @@ async def send_email(
             
         )
         message.attach(html_message)
-        
-    await aiosmtplib.send(
-        message,
-        hostname="127.0.0.1",
-        port=1025,
-    )
\ No newline at end of file
+
+    return message
+
+
+async def send_email(
+    recipient: str,
+    subject: str,
+    plain_content: str,
+    html_content: str = ""
+):
+    """
+    Send right now over the shared SMTP pool
+    """
+    message = build_message(
+        recipient=recipient,
+        subject=subject,
+        plain_content=plain_content,
+        html_content=html_content,
+    )
+    await smtp_pool.send(message)
+
+
+def enqueue_email(
+    session: AsyncSession,
+    recipient: str,
+    subject: str,
+    plain_content: str,
+    html_content: str = ""
+) -> EmailOutbox:
+    """
+    Add the email to the outbox (without commit),
+    so it is stored in the same transaction as the action
+    that triggered it and sent later by the outbox worker.
+    """
+    email = EmailOutbox(
+        recipient=recipient,
+        subject=subject,
+        plain_content=plain_content,
+        html_content=html_content,
+        status="pending",
+        attempts=0,
+    )
+    session.add(email)
+    return email
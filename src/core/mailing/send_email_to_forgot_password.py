@@ -1,10 +1,12 @@
 from textwrap import dedent
+from sqlalchemy.ext.asyncio import AsyncSession
 from core.database.models import User
-from .base_send_email import send_email
+from .base_send_email import enqueue_email
 from core.jinja.jinja_templates import templates
 
 
 async def send_pasword_reset_email(
+    session: AsyncSession,
     user: User,
     reset_link: str,
 ):
@@ -34,7 +36,8 @@ async def send_pasword_reset_email(
     
     html_content = template.render(context)
     
-    await send_email(
+    enqueue_email(
+        session=session,
         recipient=recipient,
         subject=subject,
         plain_content=plain_content,
@@ -1,9 +1,11 @@
 from textwrap import dedent
+from sqlalchemy.ext.asyncio import AsyncSession
 from core.database.models import User
-from .base_send_email import send_email
+from .base_send_email import enqueue_email
 from core.jinja.jinja_templates import templates
 
 async def send_answer_after_reset_password(
+    session: AsyncSession,
     user: User,
 ):
     recipient = user.email
@@ -31,7 +33,8 @@ async def send_answer_after_reset_password(
     
     html_content = template.render(context)
     
-    await send_email(
+    enqueue_email(
+        session=session,
         recipient=recipient,
         subject=subject,
         plain_content=plain_content,
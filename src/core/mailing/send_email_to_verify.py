@@ -1,9 +1,11 @@
 from textwrap import dedent
+from sqlalchemy.ext.asyncio import AsyncSession
 from core.database.models import User
-from .base_send_email import send_email
+from .base_send_email import enqueue_email
 from core.jinja.jinja_templates import templates
 
 async def send_verification_email(
+    session: AsyncSession,
     user: User,
     verification_link: str,
 ):
@@ -33,7 +35,8 @@ async def send_verification_email(
     
     html_content = template.render(context)
     
-    await send_email(
+    enqueue_email(
+        session=session,
         recipient=recipient,
         subject=subject,
         plain_content=plain_content,
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from email.message import Message
+import aiosmtplib
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """
+    Keeps up to `size` SMTP sessions open and reuses them,
+    so a message costs MAIL/RCPT/DATA instead of
+    TCP connect + EHLO (+ STARTTLS + AUTH) + QUIT.
+    A connection dropped by the server is reopened once.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        start_tls: bool | None = None,
+        timeout: float = 10,
+        size: int = 4,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.size = size
+
+        self._idle: list[aiosmtplib.SMTP] = []
+        self._slots = asyncio.Semaphore(size)
+
+        self.sent = 0
+        self.failed = 0
+        self.connects = 0
+        self.reconnects = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.connects += 1
+        return client
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client = self._idle.pop()
+            if client.is_connected:
+                return client
+        return await self._connect()
+
+    @staticmethod
+    def _discard(client: aiosmtplib.SMTP) -> None:
+        if client.is_connected:
+            client.close()
+
+    async def send(self, message: Message) -> None:
+        async with self._slots:
+            client = await self._acquire()
+            try:
+                try:
+                    await client.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # idle connection closed by the server
+                    self._discard(client)
+                    self.reconnects += 1
+                    client = await self._connect()
+                    await client.send_message(message)
+            except BaseException:
+                self.failed += 1
+                self._discard(client)
+                raise
+
+            self.sent += 1
+            self._idle.append(client)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                self._discard(client)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "sent": self.sent,
+            "failed": self.failed,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+        }
+
+
+smtp_pool = SMTPPool(
+    host=settings.mail.host,
+    port=settings.mail.port,
+    username=settings.mail.username,
+    password=settings.mail.password,
+    use_tls=settings.mail.use_tls,
+    start_tls=settings.mail.start_tls,
+    timeout=settings.mail.timeout,
+    size=settings.mail.pool_size,
+)
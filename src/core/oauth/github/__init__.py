@@ -1,6 +1,9 @@
 __all__ = (
-    "github_auth_url"
+    "github_auth_url",
+    "GithubClient",
+    "github_client",
 )
 
 from .url import github_auth_url
+from .client import GithubClient, github_client
 
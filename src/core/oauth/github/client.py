@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from typing import Any
+import aiohttp
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# worth another try on an idempotent request
+_RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class GithubClient:
+    """
+    One aiohttp session for the app lifetime: keep-alive
+    connections to GitHub are reused across logins (no TCP + TLS
+    handshake per call), DNS answers are cached.
+    Transient failures are retried with exponential backoff;
+    a non-idempotent request only when it never reached the server.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 20,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        connect_timeout: float = 3,
+        timeout: float = 10,
+        retries: int = 2,
+        retry_backoff: float = 0.2,
+    ):
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._session: aiohttp.ClientSession | None = None
+
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self) -> aiohttp.ClientSession:
+        """
+        Create the session (inside the running loop)
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                raise_for_status=False,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @staticmethod
+    async def _read(response: aiohttp.ClientResponse) -> Any:
+        if response.content_type == "application/json":
+            return await response.json()
+        return await response.text()
+
+    async def _backoff(self, attempt: int) -> None:
+        self.retried += 1
+        await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: bool = True,
+        **kwargs,
+    ) -> tuple[int, Any]:
+        """
+        Returns (status, body): parsed JSON or text
+        """
+        session = self.start()
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    retry = (
+                        response.status in _RETRY_STATUSES
+                        and idempotent
+                        and not last_attempt
+                    )
+                    if not retry:
+                        self.requests += 1
+                        return response.status, await self._read(response)
+            except aiohttp.ClientConnectorError:
+                # the request was never sent, safe to send again
+                if last_attempt:
+                    self.failed += 1
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not idempotent or last_attempt:
+                    self.failed += 1
+                    raise
+
+            logger.warning("GitHub %s %s: retry %d", method, url, attempt + 1)
+            await self._backoff(attempt)
+
+    async def get(self, url: str, **kwargs) -> tuple[int, Any]:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> tuple[int, Any]:
+        return await self.request("POST", url, idempotent=False, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "open": self._session is not None and not self._session.closed,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+github_client = GithubClient(
+    pool_size=settings.oauth.http_pool_size,
+    keepalive_timeout=settings.oauth.http_keepalive_timeout,
+    dns_cache_ttl=settings.oauth.http_dns_cache_ttl,
+    connect_timeout=settings.oauth.http_connect_timeout,
+    timeout=settings.oauth.http_timeout,
+    retries=settings.oauth.http_retries,
+    retry_backoff=settings.oauth.http_retry_backoff,
+)
@@ -0,0 +1,8 @@
+__all__ = (
+    "RateLimitBackend",
+    "MemoryRateLimitBackend",
+    "RateLimitMiddleware",
+)
+
+from .backend import RateLimitBackend, MemoryRateLimitBackend
+from .middleware import RateLimitMiddleware
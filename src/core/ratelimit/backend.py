@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+
+
+class RateLimitBackend:
+    """
+    Token bucket storage. The in-process backend is enough for
+    one worker, a shared backend (redis, ...) only needs to
+    implement hit() to share limits between workers.
+    """
+
+    async def hit(
+        self,
+        key: str,
+        capacity: int,
+        refill_rate: float,
+    ) -> float:
+        """
+        Take one token from the bucket
+        Return 0 if allowed or seconds until the next token
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process token buckets, least recently hit first.
+    At max_keys a new key evicts from the old end: buckets that
+    are full again, at most prune_batch of them, or else the
+    least recently hit one. Either way O(1) per hit.
+    """
+
+    def __init__(self, max_keys: int = 100_000, prune_batch: int = 100):
+        self.max_keys = max_keys
+        self.prune_batch = prune_batch
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+
+    async def hit(
+        self,
+        key: str,
+        capacity: int,
+        refill_rate: float,
+    ) -> float:
+        now = time.monotonic()
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            tokens = float(capacity)
+        else:
+            tokens, updated_at, _ = bucket
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_rate
+
+        full_at = now + (capacity - tokens) / refill_rate
+        self._buckets[key] = (tokens, now, full_at)
+        self._buckets.move_to_end(key)
+        return retry_after
+
+    def _prune(self, now: float) -> None:
+        """
+        Forget the oldest buckets that are already full again,
+        or the least recently hit one if there are none
+        """
+        for _ in range(self.prune_batch):
+            if not self._buckets:
+                return
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now:
+                break
+            del self._buckets[key]
+
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.popitem(last=False)
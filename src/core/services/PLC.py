@@ -1,26 +1,61 @@
 import logging
-from typing import Optional
+from typing import Optional, Literal
 from fastapi import BackgroundTasks
-from sqlalchemy import select, update, delete, desc, func
+from sqlalchemy import select, update, delete, desc, func, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import joinedload, selectinload
 from core.services.base import BaseService
 from core.services.notification import _create_notification
+from core.cache import post_cache
+from core.database.schemas.post import PostDetail
 from core.database.models import (
     Post,
     Like,
     Comment,
     CommentLike,
     User,
+    Tag,
+    PostTag,
 )
 
 from utilities.now import get_now_date
+from utilities.tags import normalize_tag
 
 from exceptions import error
 
 logger = logging.getLogger(__name__)
 
+# hot statements are built once, only parameters change per call
+_POST_BY_ID = select(Post).where(Post.id == bindparam("post_id"))
+_COMMENT_BY_ID = select(Comment).where(Comment.id == bindparam("comment_id"))
+
+_MOVE_TAG_COUNTS = (
+    update(Tag)
+    .where(Tag.id.in_(bindparam("tag_ids", expanding=True)))
+    .values(post_count=func.greatest(Tag.post_count + bindparam("delta"), 0))
+    .execution_options(synchronize_session=False)
+)
+# visibility before a change, the post row stays locked until commit
+_POST_STATE = (
+    select(Post.is_published)
+    .where(Post.id == bindparam("post_id"))
+    .with_for_update()
+)
+_POST_TAG_IDS = select(PostTag.tag_id).where(PostTag.post_id == bindparam("post_id"))
+# range instead of LIKE: stays on ix_tags_name_pattern (text_pattern_ops)
+# with a generic prepared plan
+_TAGS_BY_PREFIX = (
+    select(Tag.name, Tag.post_count)
+    .where(
+        Tag.name.op("~>=~")(bindparam("prefix")),
+        Tag.name.op("~<~")(bindparam("upper")),
+    )
+    .order_by(Tag.post_count.desc(), Tag.name)
+    .limit(bindparam("limit"))
+)
+
 
 class PostLikeCommentService(BaseService):
     """
@@ -42,33 +77,125 @@ class PostLikeCommentService(BaseService):
         user_id: int,
         title: str,
         content: str,
-        tag: str,
+        tags: list[str],
     ) -> Post:
         """
         Create post
         """
+        tag_ids = await self._upsert_tags(tags=tags, delta=1)
         post = Post(
             user_id=user_id,
             title=title,
             content=content,
-            tag=tag,
         )
         self.session.add(post)
+        await self.session.flush()
+        self.session.add_all(
+            [PostTag(post_id=post.id, tag_id=tag_id) for tag_id in tag_ids]
+        )
         await self.session.commit()
         await self.session.refresh(post)
         return post
 
+    @staticmethod
+    def _tag_names(
+        tags: list[str],
+    ) -> list[str]:
+        """
+        Normalised, deduplicated and sorted tag names
+        """
+        names = sorted({normalize_tag(tag) for tag in tags})
+        if not names or "" in names:
+            raise error.NotValidData("Tag is empty")
+        if any(len(name) > 100 for name in names):
+            raise error.NotValidData("Tag is too long")
+        return names
+
+    async def _upsert_tags(
+        self,
+        tags: list[str],
+        delta: int,
+    ) -> set[int]:
+        """
+        IDs of the tags (new ones are created), their post
+        counters changed by delta, all in one statement
+        """
+        # sorted names: concurrent posts lock tag rows in the same order
+        stmt = insert(Tag).values(
+            [{"name": name, "post_count": delta} for name in self._tag_names(tags)]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Tag.name],
+            set_={"post_count": Tag.post_count + stmt.excluded.post_count},
+        ).returning(Tag.id)
+
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def _move_tag_counts(
+        self,
+        tag_ids: set[int],
+        delta: int,
+    ) -> None:
+        """
+        Change the published post counters of the tags
+        """
+        if tag_ids:
+            await self.session.execute(
+                _MOVE_TAG_COUNTS, {"tag_ids": sorted(tag_ids), "delta": delta}
+            )
+
+    async def _post_tag_ids(
+        self,
+        post_id: int,
+    ) -> set[int]:
+        result = await self.session.execute(_POST_TAG_IDS, {"post_id": post_id})
+        return set(result.scalars().all())
+
     async def get_post_by_id(
         self,
         post_id: int,
-    ) -> Post | None:
+    ) -> PostDetail | None:
         """
         Get post by ID return post or None
+        Read-through post_cache: the post is a read-only
+        PostDetail, use _load_post to change it.
+        Posts read from a replica are not cached.
         """
-        stmt = select(Post).options(joinedload(Post.author)).where(Post.id == post_id)
-        result = await self.session.execute(stmt)
+        post = await post_cache.get(post_id)
+        if post is not None:
+            return post
+
+        # a post changed while it's loading is not cached
+        version = await post_cache.version(post_id)
+        loaded = await self._load_post(post_id=post_id)
+        if loaded is None:
+            return None
+
+        post = PostDetail.model_validate(loaded)
+        if not self.session.info.get("replica"):
+            await post_cache.set(post_id, post, version=version)
+        return post
+
+    async def _load_post(
+        self,
+        post_id: int,
+    ) -> Post | None:
+        """
+        Get post by ID from DB bypassing the cache
+        """
+        result = await self.session.execute(_POST_BY_ID, {"post_id": post_id})
         return result.scalar_one_or_none()
 
+    async def _invalidate_post(
+        self,
+        post_id: int,
+    ) -> None:
+        """
+        Drop post from cache after it was changed
+        """
+        await post_cache.delete(post_id)
+
     async def get_filter_post(
         self,
         post_id: int,
@@ -190,7 +317,7 @@ class PostLikeCommentService(BaseService):
         user_id: int,
         post_id: int,
         **kwargs,
-    ) -> Post | None:
+    ) -> PostDetail | None:
         """
         Update post
         """
@@ -199,11 +326,57 @@ class PostLikeCommentService(BaseService):
                 "You are not the owner, you cannot edit or delete what does not belong to you."
             )
 
-        stmt = update(Post).where(Post.id == post_id).values(**kwargs)
-        await self.session.execute(stmt)
+        if "tags" in kwargs or "is_published" in kwargs:
+            await self._retag_post(post_id=post_id, values=kwargs)
+
+        if kwargs:
+            stmt = update(Post).where(Post.id == post_id).values(**kwargs)
+            await self.session.execute(stmt)
         await self.session.commit()
+        await self._invalidate_post(post_id=post_id)
         return await self.get_post_by_id(post_id=post_id)
 
+    async def _retag_post(
+        self,
+        post_id: int,
+        values: dict,
+    ) -> None:
+        """
+        Apply a change of tags (taken out of values) and keep
+        tag counters in step with it and with a change of visibility
+        """
+        result = await self.session.execute(_POST_STATE, {"post_id": post_id})
+        was_published = result.scalar_one_or_none()
+        if was_published is None:
+            raise error.NotFound(f"Post with {post_id} ID not found")
+
+        is_published = values.get("is_published")
+        if is_published is None:
+            is_published = was_published
+
+        old_ids = new_ids = await self._post_tag_ids(post_id=post_id)
+        tags = values.pop("tags", None)
+        if tags is not None:
+            new_ids = await self._upsert_tags(tags=tags, delta=0)
+            if removed := old_ids - new_ids:
+                await self.session.execute(
+                    delete(PostTag).where(
+                        PostTag.post_id == post_id,
+                        PostTag.tag_id.in_(removed),
+                    )
+                )
+            self.session.add_all(
+                [
+                    PostTag(post_id=post_id, tag_id=tag_id)
+                    for tag_id in new_ids - old_ids
+                ]
+            )
+
+        counted_before = old_ids if was_published else set()
+        counted_after = new_ids if is_published else set()
+        await self._move_tag_counts(counted_before - counted_after, delta=-1)
+        await self._move_tag_counts(counted_after - counted_before, delta=1)
+
     async def deactivate_post(
         self,
         post_id: int,
@@ -222,8 +395,20 @@ class PostLikeCommentService(BaseService):
                 "You are not the owner, you cannot edit or delete what does not belong to you."
             )
 
-        post.is_published = False
+        # only a published post moves the tag counters
+        stmt = (
+            update(Post)
+            .where(Post.id == post_id, Post.is_published == True)
+            .values(is_published=False)
+            .returning(Post.id)
+        )
+        result = await self.session.execute(stmt)
+        if result.scalar_one_or_none() is not None:
+            await self._move_tag_counts(
+                await self._post_tag_ids(post_id=post_id), delta=-1
+            )
         await self.session.commit()
+        await self._invalidate_post(post_id=post_id)
         return True
 
     async def delete_post(
@@ -245,8 +430,19 @@ class PostLikeCommentService(BaseService):
                 "You are not the owner, you cannot edit or delete what does not belong to you."
             )
 
-        await self.session.delete(post)
+        result = await self.session.execute(_POST_STATE, {"post_id": post_id})
+        was_published = result.scalar_one_or_none()
+        if was_published is None:
+            raise error.NotFound(f"Post with {post_id} ID not found")
+        if was_published:
+            await self._move_tag_counts(
+                await self._post_tag_ids(post_id=post_id), delta=-1
+            )
+
+        # tag links, likes, comments and their likes go by ON DELETE CASCADE
+        await self.session.execute(delete(Post).where(Post.id == post_id))
         await self.session.commit()
+        await self._invalidate_post(post_id=post_id)
 
         logger.info(
             """ 
@@ -284,18 +480,31 @@ class PostLikeCommentService(BaseService):
 
     async def get_posts_by_tag(
         self,
-        tag: str,
+        tags: list[str],
+        match: Literal["any", "all"] = "any",
         skip: int = 0,
         limit: int = 20,
     ) -> list[Post]:
         """
-        Found all posts by tag
+        Found all posts with any (or all) of the tags
         return list of posts
         """
+        names = self._tag_names(tags)
+        # post ids come from ix_post_tags_tag_id_post_id alone
+        post_ids = (
+            select(PostTag.post_id)
+            .join(Tag, PostTag.tag_id == Tag.id)
+            .where(Tag.name.in_(names))
+        )
+        if match == "all":
+            post_ids = post_ids.group_by(PostTag.post_id).having(
+                func.count() == len(names)
+            )
+
         try:
             stmt = (
                 select(Post)
-                .where(Post.is_published == True, Post.tag == tag)
+                .where(Post.is_published == True, Post.id.in_(post_ids))
                 .order_by(desc(Post.created_at))
                 .offset(skip)
                 .limit(limit)
@@ -316,13 +525,14 @@ class PostLikeCommentService(BaseService):
         """
         Get most popular tags by post count
         Returns: list of dicts with tag and post_count
+        Counters are kept in tags, this reads the first
+        entries of ix_tags_post_count.
         """
         try:
             stmt = (
-                select(Post.tag, func.count(Post.id).label("post_count"))
-                .where(Post.is_published == True)
-                .group_by(Post.tag)
-                .order_by(desc("post_count"))
+                select(Tag.name, Tag.post_count)
+                .where(Tag.post_count > 0)
+                .order_by(Tag.post_count.desc(), Tag.id)
                 .limit(limit)
             )
 
@@ -337,6 +547,32 @@ class PostLikeCommentService(BaseService):
             logger.error("Error getting trending tags: %s", e)
             raise error.DataBaseError("Database temporarily unavailable") from e
 
+    async def autocomplete_tags(
+        self,
+        prefix: str,
+        limit: int = 10,
+    ) -> list[dict]:
+        """
+        Tags starting with prefix, most used first
+        Returns: list of dicts with tag and post_count
+        """
+        prefix = normalize_tag(prefix)
+        if not prefix:
+            return []
+
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        try:
+            result = await self.session.execute(
+                _TAGS_BY_PREFIX, {"prefix": prefix, "upper": upper, "limit": limit}
+            )
+            return [
+                {"tag": tag, "post_count": post_count}
+                for tag, post_count in result.all()
+            ]
+        except SQLAlchemyError as e:
+            logger.error("Error autocompleting tags: %s", e)
+            raise error.DataBaseError("Database temporarily unavailable") from e
+
     # ----------------------LIKE -------------------- #
     async def like_post(
         self,
@@ -365,6 +601,7 @@ class PostLikeCommentService(BaseService):
             )
 
             await self.session.commit()
+            await self._invalidate_post(post_id=post_id)
             await self.session.refresh(like)
 
             # create notification
@@ -404,6 +641,7 @@ class PostLikeCommentService(BaseService):
                 increment=False,
             )
             await self.session.commit()
+            await self._invalidate_post(post_id=post_id)
 
             return True
         else:
@@ -430,13 +668,13 @@ class PostLikeCommentService(BaseService):
         """
         Internal method for updating the like counter
         """
+        if increment:
+            like_count = Post.like_count + 1
+        else:
+            like_count = func.greatest(Post.like_count - 1, 0)
 
-        post = await self.get_post_by_id(post_id=post_id)
-        if post:
-            if increment:
-                post.like_count += 1
-            else:
-                post.like_count = max(0, post.like_count - 1)
+        stmt = update(Post).where(Post.id == post_id).values(like_count=like_count)
+        await self.session.execute(stmt)
 
     # --------------- LIKE COMMENT --------------------------------- #
 
@@ -605,6 +843,7 @@ class PostLikeCommentService(BaseService):
             )
 
             await self.session.commit()
+            await self._invalidate_post(post_id=post_id)
             await self.session.refresh(comment)
 
             # TODO: NOTIFICATION
@@ -626,8 +865,9 @@ class PostLikeCommentService(BaseService):
         """
         Found a comment by ID and return comment or None
         """
-        stmt = select(Comment).where(Comment.id == comment_id)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(
+            _COMMENT_BY_ID, {"comment_id": comment_id}
+        )
         return result.scalar_one_or_none()
 
     async def get_post_comments(
@@ -664,7 +904,8 @@ class PostLikeCommentService(BaseService):
                 you cannot edit or delete what does not belong to you."
             )
 
-        await self.session.delete(comment)
+        # comment likes go by ON DELETE CASCADE
+        await self.session.execute(delete(Comment).where(Comment.id == comment_id))
 
         # comment counter
         await self._update_post_comment_count(
@@ -673,6 +914,7 @@ class PostLikeCommentService(BaseService):
         )
 
         await self.session.commit()
+        await self._invalidate_post(post_id=comment.post_id)
 
         logger.info(
             """ 
@@ -710,12 +952,17 @@ class PostLikeCommentService(BaseService):
         """
         Internal method for updating the comment counter
         """
-        post = await self.get_post_by_id(post_id=post_id)
-        if post:
-            if increment:
-                post.comment_count += 1
-            else:
-                post.comment_count = max(0, post.comment_count - 1)
+        if increment:
+            comment_count = Post.comment_count + 1
+        else:
+            comment_count = func.greatest(Post.comment_count - 1, 0)
+
+        stmt = (
+            update(Post)
+            .where(Post.id == post_id)
+            .values(comment_count=comment_count)
+        )
+        await self.session.execute(stmt)
 
     async def get_all_user_comments(
         self,
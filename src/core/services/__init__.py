@@ -6,7 +6,9 @@ __all__ = (
     "PostLikeCommentService",
     "RecommendationService",
     "SubscriptionService",
-    "NotificationService"
+    "NotificationService",
+    "CampaignService",
+    "SearchService",
 )
 
 from .admin import AdminService
@@ -16,4 +18,6 @@ from .profile import ProfileService
 from .PLC import PostLikeCommentService
 from .recomendation import RecommendationService
 from .subscription import SubscriptionService
-from .notification import NotificationService
\ No newline at end of file
+from .notification import NotificationService
+from .campaign import CampaignService
+from .search import SearchService
\ No newline at end of file
@@ -1,14 +1,17 @@
 import logging
-from sqlalchemy import select, func
+from typing import AsyncIterator
+from sqlalchemy import select, update, func, desc, case, bindparam, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.services.user import UserService
 from core.services.base import BaseService
 from core.services.profile import ProfileService
 from core.services.PLC import PostLikeCommentService
-from utilities.now import get_now_date
+from core.workers import account_deletion_worker
+from utilities.now import get_now_date, get_now_timezone_date
 
-from core.database.models import User
+from core.database.models import User, AccountDeletion
 
 from exceptions import error
 
@@ -16,6 +19,61 @@ from exceptions import error
 logger = logging.getLogger(__name__)
 
 
+# admin listings never need the password hash or relationships
+_USER_LISTING = select(
+    User.id,
+    User.email,
+    User.username,
+    User.is_active,
+    User.is_verified,
+    User.is_superuser,
+    User.created_at,
+)
+USER_LISTING_FIELDS = [column.key for column in _USER_LISTING.selected_columns]
+
+_STREAM_YIELD_PER = 1000
+
+_UNFINISHED_JOB = AccountDeletion.status.notin_(("completed", "cancelled"))
+
+# one unfinished job per user (partial unique index): a repeated or
+# concurrent request gets the existing job, a failed one is restarted
+_queue_job = insert(AccountDeletion).values(
+    user_id=bindparam("user_id"),
+    requested_by_id=bindparam("requested_by_id"),
+    status="pending",
+    stage="likes",
+    rows_deleted=0,
+)
+_QUEUE_DELETION = _queue_job.on_conflict_do_update(
+    index_elements=[AccountDeletion.user_id],
+    # literal predicate: the arbiter index is inferred at plan time
+    index_where=text("status NOT IN ('completed', 'cancelled')"),
+    set_={
+        "status": case(
+            (AccountDeletion.status == "failed", "pending"),
+            else_=AccountDeletion.status,
+        ),
+        "last_error": case(
+            (AccountDeletion.status == "failed", None),
+            else_=AccountDeletion.last_error,
+        ),
+    },
+).returning(AccountDeletion)
+
+# the worker stops a cancelled job before its next chunk
+_CANCEL_DELETION = (
+    update(AccountDeletion)
+    .where(AccountDeletion.user_id == bindparam("b_user_id"), _UNFINISHED_JOB)
+    .values(
+        status="cancelled",
+        heartbeat_at=None,
+        finished_at=bindparam("now"),
+    )
+    .returning(AccountDeletion.id)
+    .execution_options(synchronize_session=False)
+)
+
+
 class AdminService(BaseService):
     """
     Service for the admin and all
@@ -43,64 +101,107 @@ class AdminService(BaseService):
         result = await self.session.execute(stmt)
         return result.scalar()
 
-    async def get_all_active_and_verified_users(
+    async def _get_users_page(
         self,
-    ) -> dict[int, User]:
+        *criteria,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> dict:
         """
-        Get all active and verified users
-        Return dict where the key is the id and the value is the user
+        One keyset page of users (id > after_id) matching criteria
         """
+        try:
+            stmt = (
+                _USER_LISTING.where(*criteria, User.id > after_id)
+                .order_by(User.id)
+                .limit(limit)
+            )
+            result = await self.session.execute(stmt)
+            users = [row._asdict() for row in result]
+        except SQLAlchemyError as e:
+            logger.error("Проснись ты обосрался. БД упала: ", e)
+            raise error.DataBaseError("Database temporarily unavailable") from e
 
-        stmt = select(User).where(User.is_verified == True, User.is_active == True)
-        result = await self.session.execute(stmt)
+        return {
+            "users": users,
+            "next_after_id": users[-1]["id"] if len(users) == limit else None,
+        }
+
+    async def _stream_users(
+        self,
+        *criteria,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        All users matching criteria through a server-side cursor,
+        in chunks of _STREAM_YIELD_PER rows
+        """
+        stmt = (
+            _USER_LISTING.where(*criteria)
+            .order_by(User.id)
+            .execution_options(yield_per=_STREAM_YIELD_PER)
+        )
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield [row._asdict() for row in rows]
+
+    def _good_users(self) -> tuple:
+        return (User.is_verified == True, User.is_active == True)
+
+    def _unverified_old_users(self, days: int) -> tuple:
+        return (User.is_verified == False, User.created_at < get_now_date(days=days))
 
-        users = result.scalars().all()
-        return {user.id: user for user in users}
+    def _new_users(self, days: int) -> tuple:
+        return (User.created_at >= get_now_date(days=days),)
+
+    async def get_all_active_and_verified_users(
+        self,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> dict:
+        """
+        Get active and verified users by pages
+        Return users and next_after_id for the next page
+        """
+        return await self._get_users_page(
+            *self._good_users(), after_id=after_id, limit=limit
+        )
+
+    def stream_all_active_and_verified_users(self) -> AsyncIterator[list[dict]]:
+        return self._stream_users(*self._good_users())
 
     async def get_unverified_old_users(
         self,
         days: int = 7,
-    ) -> list[User]:
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> dict:
         """
-        Get unverified users older than N days
+        Get unverified users older than N days by pages
         days_old: some number of days
-        return list of users
         """
-        try:
-            date = get_now_date(days=days)
-            # date = NOW - timedelta(days=days)
+        return await self._get_users_page(
+            *self._unverified_old_users(days), after_id=after_id, limit=limit
+        )
 
-            stmt = (
-                select(User)
-                .where(
-                    User.is_verified == False,
-                    User.created_at < date,
-                )
-                .order_by(User.created_at.desc())
-            )
-
-            result = await self.session.execute(stmt)
-            return result.scalars().all()
-        except SQLAlchemyError as e:
-            logger.error("Проснись ты обосрался. БД упала: ", e)
-            raise error.DataBaseError("Database temporarily unavailable") from e
+    def stream_unverified_old_users(self, days: int = 7) -> AsyncIterator[list[dict]]:
+        return self._stream_users(*self._unverified_old_users(days))
 
     async def get_new_users(
         self,
         days: int = 7,
-    ) -> list[User]:
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> dict:
         """
-        New users for last N days
+        New users for last N days by pages
         days: some number of days
-        return list of users
         """
-
-        date = get_now_date(days=days)
-        stmt = select(User).where(
-            User.created_at >= date,
+        return await self._get_users_page(
+            *self._new_users(days), after_id=after_id, limit=limit
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+
+    def stream_new_users(self, days: int = 7) -> AsyncIterator[list[dict]]:
+        return self._stream_users(*self._new_users(days))
 
     async def deactivate_user(
         self,
@@ -138,14 +239,26 @@ class AdminService(BaseService):
         if not user:
             raise error.NotFound(f"user with id {user_id} not found")
 
-        user.is_active = True
-        await self.session.commit()
+        try:
+            # the user row first: the worker locks it before every chunk
+            user.is_active = True
+            await self.session.flush()
+            result = await self.session.execute(
+                _CANCEL_DELETION,
+                {"b_user_id": user_id, "now": get_now_timezone_date()},
+            )
+            cancelled = result.scalars().all()
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise error.DataBaseError("Беды с датабазе и проч. и проч.") from e
 
         logger.info(
             """ 
-            User %r reactivated by admin
+            User %r reactivated by admin, deletion jobs cancelled: %r
             """,
             user_id,
+            cancelled,
         )
 
         return user
@@ -153,28 +266,74 @@ class AdminService(BaseService):
     async def delete_user(
         self,
         user_id: int,
-    ) -> bool:
+        requested_by_id: int | None = None,
+    ) -> AccountDeletion:
         """
-        Delete user
+        Deactivate the user and log them out right away,
+        the account itself is deleted in chunks by the
+        account deletion worker.
+        Return the deletion job (an existing one for the user is reused)
         """
         try:
-            user = await self.user_service.get_user_by_id(user_id=user_id)
-            if not user:
+            stmt = (
+                update(User)
+                .where(User.id == user_id)
+                .values(is_active=False)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            if result.scalar_one_or_none() is None:
+                await self.session.rollback()
                 raise error.NotFound(f"user with id {user_id} not found")
 
-            await self.session.delete(user)
-            await self.session.commit()
-
-            logger.info(
-                """ 
-                User %r permanently delete by admin
-                """,
-                user_id,
+            result = await self.session.execute(
+                _QUEUE_DELETION,
+                {"user_id": user_id, "requested_by_id": requested_by_id},
             )
-            return True
+            job = result.scalar_one()
+
+            # revoke tokens (commits everything above)
+            await self.user_service.revoke_refresh_token(user_id)
         except SQLAlchemyError as e:
+            await self.session.rollback()
             raise error.DataBaseError("Беды с датабазе и проч. и проч.") from e
 
+        account_deletion_worker.notify()
+
+        logger.info(
+            """ 
+            User %r deactivated and queued for deletion by admin
+            """,
+            user_id,
+        )
+        return job
+
+    async def get_account_deletion(
+        self,
+        job_id: int,
+    ) -> AccountDeletion:
+        """
+        Account deletion job progress
+        """
+        job = await self.session.get(AccountDeletion, job_id)
+        if not job:
+            raise error.NotFound("Deletion job not found")
+        return job
+
+    async def get_account_deletions(
+        self,
+        status: str | None = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> list[AccountDeletion]:
+        stmt = select(AccountDeletion)
+        if status:
+            stmt = stmt.where(AccountDeletion.status == status)
+        stmt = stmt.order_by(desc(AccountDeletion.id)).offset(skip).limit(limit)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
     # ------------ USER STATISTIC -------------------------
 
     async def get_user_stats(self) -> dict:
@@ -0,0 +1,132 @@
+import logging
+from sqlalchemy import select, update, func, desc
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.services.base import BaseService
+from core.database.models import EmailCampaign, User
+from core.database.schemas.campaign import CampaignCreate
+from core.workers import campaign_runner
+from core.workers.campaign import CAMPAIGN_RECIPIENTS
+from exceptions import error
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignService(BaseService):
+    """
+    Email campaigns (announcements) to all
+    active and verified users, sent by the campaign runner.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+
+    async def create_campaign(
+        self,
+        admin_id: int,
+        data: CampaignCreate,
+    ) -> EmailCampaign:
+        """
+        Save the campaign and start sending it
+        """
+        try:
+            total = await self.session.scalar(
+                select(func.count(User.id)).where(CAMPAIGN_RECIPIENTS)
+            )
+            campaign = EmailCampaign(
+                created_by_id=admin_id,
+                subject=data.subject,
+                message=data.message,
+                status="running",
+                total_recipients=total,
+                sent_count=0,
+                failed_count=0,
+                last_user_id=0,
+            )
+            self.session.add(campaign)
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Проснись ты обосрался. БД упала: ", e)
+            raise error.DataBaseError("Database temporarily unavailable") from e
+
+        campaign_runner.start(campaign.id)
+
+        logger.info(
+            """
+            Email campaign %r created by admin %r for %r users
+            """,
+            campaign.id,
+            admin_id,
+            total,
+        )
+        return campaign
+
+    async def get_campaign(
+        self,
+        campaign_id: int,
+    ) -> EmailCampaign:
+        campaign = await self.session.get(EmailCampaign, campaign_id)
+        if not campaign:
+            raise error.NotFound("Campaign not found")
+        return campaign
+
+    async def get_campaigns(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> list[EmailCampaign]:
+        stmt = (
+            select(EmailCampaign)
+            .order_by(desc(EmailCampaign.id))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def _change_status(
+        self,
+        campaign_id: int,
+        from_statuses: tuple[str, ...],
+        to_status: str,
+    ) -> EmailCampaign:
+        stmt = (
+            update(EmailCampaign)
+            .where(
+                EmailCampaign.id == campaign_id,
+                EmailCampaign.status.in_(from_statuses),
+            )
+            .values(status=to_status, last_error=None)
+            .returning(EmailCampaign)
+        )
+        result = await self.session.execute(stmt)
+        campaign = result.scalar_one_or_none()
+        await self.session.commit()
+
+        if campaign is None:
+            await self.get_campaign(campaign_id)
+            raise error.NotAllowed(f"Campaign can't be {to_status} now")
+        return campaign
+
+    async def pause_campaign(
+        self,
+        campaign_id: int,
+    ) -> EmailCampaign:
+        """
+        The runner stops after the current chunk
+        """
+        return await self._change_status(campaign_id, ("running",), "paused")
+
+    async def resume_campaign(
+        self,
+        campaign_id: int,
+    ) -> EmailCampaign:
+        """
+        Continue a paused or failed campaign from the last processed user
+        """
+        campaign = await self._change_status(
+            campaign_id, ("paused", "failed"), "running"
+        )
+        campaign_runner.start(campaign.id)
+        return campaign
@@ -1,6 +1,9 @@
+import asyncio
 import logging
 import aiohttp
-from sqlalchemy import select
+from sqlalchemy import select, update, func, bindparam
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.services.user import UserService
@@ -10,16 +13,39 @@ from utilities.jwt_token import create_jwt_token
 from exceptions import error
 from core.config import settings
 from core.services.base import BaseService
+from core.oauth.github import GithubClient, github_client
 
 logger = logging.getLogger(__name__)
 
+_USER_BY_GITHUB_ID = select(User).where(User.github_id == bindparam("github_id"))
+# an account registered with the same email gets the GitHub ID
+_LINK_USER_BY_EMAIL = (
+    update(User)
+    .where(func.lower(User.email) == func.lower(bindparam("b_email")))
+    .values(github_id=bindparam("github_id"))
+    .returning(User)
+    .execution_options(synchronize_session=False)
+)
+# GitHub logins are up to 39 characters
+_USERNAME_LENGTH = User.__table__.c.username.type.length
+# case-insensitive, like the ix_users_username_lower unique index
+_USERNAME_EXISTS = select(User.id).where(
+    func.lower(User.username) == func.lower(bindparam("username"))
+)
+
 class OauthService(BaseService):
     """ 
     A service for authentication using 
     third-party services (specifically GitHub).
     """
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        http: GithubClient = github_client,
+    ):
         super().__init__(session=session)
+        # shared keep-alive client, created in lifespan
+        self.http = http
         self.user_service = UserService(session)
         self.profile = ProfileService(session)
         
@@ -37,12 +63,9 @@ class OauthService(BaseService):
         # get user data
         user_data = await self.get_user_info(access_token)
         
-        #find or create user
+        #find or create user with profile (one transaction)
         user = await self.find_or_create_user(user_data)
         
-        # finf or create profile 
-        await self.profile.get_or_create_profile(user=user)
-        
         # generate our token jwt 
         token = create_jwt_token(
             data={
@@ -73,35 +96,39 @@ class OauthService(BaseService):
             "Content-Type": "application/json",
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url=url,
-                json=data,
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    err = await response.text()
-                    logger.error(
-                        """ 
-                        GitHub token exchange failed:
-                        %r
-                        """, err
-                    )
-                    raise error.Unauthorized("Failed to get access token")
-                    
-                result = await response.json()
-                logger.info("Parsed GitHub response: %s", result)
-                
-                access_token = (
-                    result.get("access_token") or
-                    result.get("token")
-                )
-                
-                if not access_token:
-                    logger.error("No access token found in GitHub response. Available keys: %s", list(result.keys()))
-                    raise error.Unauthorized("GitHub didn't return access token")
-                
-                return access_token
+        status, result = await self._call(
+            self.http.post(url=url, json=data, headers=headers)
+        )
+        if status != 200 or not isinstance(result, dict):
+            logger.error(
+                """ 
+                GitHub token exchange failed:
+                %r
+                """, result
+            )
+            raise error.Unauthorized("Failed to get access token")
+
+        access_token = (
+            result.get("access_token") or
+            result.get("token")
+        )
+
+        if not access_token:
+            logger.error("No access token found in GitHub response. Available keys: %s", list(result.keys()))
+            raise error.Unauthorized("GitHub didn't return access token")
+
+        return access_token
+
+    @staticmethod
+    async def _call(request):
+        """
+        Await a GitHub request, network failures become 502
+        """
+        try:
+            return await request
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("GitHub request failed: %r", e)
+            raise error.ExternalServiceError("GitHub is unavailable, try again later") from e
         
         
     
@@ -115,52 +142,86 @@ class OauthService(BaseService):
             "Accept": "application/json",
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url=settings.oauth.github_user_url,
-                headers=headers,
-            ) as response:
-                if response.status != 200:
-                    err = await response.text()
-                    logger.error(
-                        """ 
-                        GitHub user info failed: 
-                        %r
-                        """, err
-                    )
-                    raise error.Unauthorized("Failed to get user info")
-                
-                user_data = await response.json()
-            
-            
-            if not user_data.get("email"):
-                async with session.get(
-                    url=settings.oauth.github_email_url,
-                    headers=headers,
-                ) as response:
-                    if response.status == 200:
-                        emails = await response.json()
-                        primary_email = next(
-                            (email for email in emails if email["primary"]),
-                            None
-                        )
-                        if primary_email:
-                            user_data["email"] = primary_email["email"]
-                            
-            return user_data
+        # both at once: the email list is only needed when the
+        # public email is hidden, but waiting for /user first
+        # would add a round trip to GitHub to every such login
+        user_response, emails_response = await asyncio.gather(
+            self._call(
+                self.http.get(url=settings.oauth.github_user_url, headers=headers)
+            ),
+            self._call(
+                self.http.get(url=settings.oauth.github_email_url, headers=headers)
+            ),
+            # a failed email list doesn't matter when /user has the email
+            return_exceptions=True,
+        )
+        if isinstance(user_response, BaseException):
+            raise user_response
+
+        status, user_data = user_response
+        if status != 200:
+            logger.error(
+                """ 
+                GitHub user info failed: 
+                %r
+                """, user_data
+            )
+            raise error.Unauthorized("Failed to get user info")
+
+        if not user_data.get("email"):
+            if isinstance(emails_response, BaseException):
+                raise emails_response
+
+            emails_status, emails = emails_response
+            if emails_status == 200:
+                primary_email = next(
+                    (email for email in emails if email["primary"]),
+                    None
+                )
+                if primary_email:
+                    user_data["email"] = primary_email["email"]
+
+        return user_data
                         
                         
     async def find_or_create_user(self, user_data: dict) -> User:
         """ 
-        Find existing user or create new one from GitHub data
+        Find existing user or create new one from GitHub data.
+        The user (found, linked by email or created) and the
+        profile are written in one transaction, one commit.
+        A new user is inserted with ON CONFLICT (github_id),
+        so two concurrent first logins end up with one account.
+        A concurrent signup taking the email fails the insert:
+        the transaction is retried once (it links the committed
+        user), then it is a 409.
         """
-        
+        try:
+            return await self._find_or_create_user(user_data)
+        except IntegrityError:
+            await self.session.rollback()
+            logger.info(
+                """ 
+                GitHub signup raced with another signup, retrying:
+                %r
+                """, user_data["id"]
+            )
+
+        try:
+            return await self._find_or_create_user(user_data)
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise error.LoginAlreadyExist(
+                "Username or email of this GitHub account is already taken"
+            ) from e
+
+    async def _find_or_create_user(self, user_data: dict) -> User:
         github_id = user_data["id"]
         email = user_data.get("email")
         
         
-        stmt = select(User).where(User.github_id == github_id)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(
+            _USER_BY_GITHUB_ID, {"github_id": github_id}
+        )
         user = result.scalar_one_or_none()
         
         if user:
@@ -170,42 +231,65 @@ class OauthService(BaseService):
                 %r
                 """, github_id
             )
-            return user
         
-        if email:
-            user = await self.user_service.get_user_by_email(email=email)
+        if user is None and email:
+            result = await self.session.execute(
+                _LINK_USER_BY_EMAIL, {"b_email": email, "github_id": github_id}
+            )
+            user = result.scalar_one_or_none()
             if user:
-                user.github_id = github_id
-                await self.session.commit()
                 logger.info(
                     """ 
                     Linked existing user with GitHub ID:
                     %r
                     """, github_id
                 )
-                return user
             
-    
-        username = user_data.get("login")
-        if await self.is_username_exist(username):
-            username = f"{username}_{github_id}"
-        
-        user = User(
-            email=email or f"github_{github_id}@example.com",
-            username=user_data.get("login", f"github_{github_id}"),
-            is_active=True,
-            hashed_password="oauth_user",
-            # already verified 
-            is_verified=True,
-            is_superuser=False,
-            github_id=github_id,
+        if user is None:
+            user = await self._upsert_github_user(
+                github_id=github_id,
+                email=email,
+                login=user_data.get("login"),
+            )
 
-        )
-        
-        self.session.add(user)
+        await self.profile.ensure_profile(user_id=user.id)
         await self.session.commit()
-        await self.session.refresh(user)
-        
+        return user
+
+    async def _upsert_github_user(
+        self,
+        github_id: int,
+        email: str | None,
+        login: str | None,
+    ) -> User:
+        """ 
+        Insert a verified user for the GitHub account
+        or return the one a concurrent login has just inserted.
+        The username is the login cut to fit users.username,
+        with the GitHub ID appended when it is taken (already,
+        or by a concurrent signup during the insert)
+        """
+        username = (login or f"github_{github_id}")[:_USERNAME_LENGTH]
+        suffix = f"_{github_id}"
+        suffixed = username[: _USERNAME_LENGTH - len(suffix)] + suffix
+        if await self.is_username_exist(username):
+            username = suffixed
+
+        try:
+            # savepoint: a failed insert keeps the transaction usable
+            async with self.session.begin_nested():
+                user = await self._insert_github_user(github_id, email, username)
+        except IntegrityError as e:
+            if username == suffixed or "ix_users_username_lower" not in str(e):
+                raise
+            logger.info(
+                """ 
+                GitHub signup: username %r was just taken, using %r
+                """, username, suffixed
+            )
+            async with self.session.begin_nested():
+                user = await self._insert_github_user(github_id, email, suffixed)
+
         logger.info(
             """ 
             Created new user from GitHub:
@@ -215,19 +299,40 @@ class OauthService(BaseService):
         return user
     
     
+    async def _insert_github_user(
+        self,
+        github_id: int,
+        email: str | None,
+        username: str,
+    ) -> User:
+        stmt = insert(User).values(
+            email=email or f"github_{github_id}@example.com",
+            username=username,
+            is_active=True,
+            hashed_password="oauth_user",
+            # already verified 
+            is_verified=True,
+            is_superuser=False,
+            github_id=github_id,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.github_id],
+            # no-op update: RETURNING gives the existing row
+            set_={"github_id": stmt.excluded.github_id},
+        ).returning(User)
+
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
     async def is_username_exist(self, username: str) -> bool:
         """ 
         Check if username already exist 
         """
         
-        stmt = select(User).where(
-            User.username == username
+        result = await self.session.execute(
+            _USERNAME_EXISTS, {"username": username}
         )
-        
-        result = await self.session.execute(stmt)
-        user = result.scalar_one_or_none()
-        
-        return user is not None
+        return result.scalar_one_or_none() is not None
         
         
         
@@ -1,5 +1,6 @@
 import logging
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database.models import User, Profile
 from core.services.base import BaseService
@@ -8,6 +9,9 @@ from exceptions import error
 
 logger = logging.getLogger(__name__)
 
+# columns a user can change
+_PROFILE_FIELDS = ("avatar", "bio", "theme")
+
 
 class ProfileService(BaseService):
     """ 
@@ -28,44 +32,73 @@ class ProfileService(BaseService):
         self,
         user: User,
     ) -> Profile:
-        profile = Profile(user_id=user.id)
-        self.session.add(profile)
+        """
+        Create the profile if the user has none
+        Return profile
+        """
+        await self.ensure_profile(user_id=user.id)
         await self.session.commit()
-        await self.session.refresh(profile)
-        return profile
-    
-    async def get_or_create_profile(
-        self, 
-        user: User
+        return await self.get_user_profile(user_id=user.id)
+
+    async def upsert_profile(
+        self,
+        user_id: int,
+        values: dict,
     ) -> Profile:
         """ 
-        Get an existing profile or create new one if not
-        Return profile
+        INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING:
+        creates the profile with values or sets them on the existing
+        one, in one statement of the caller's transaction (no commit).
+        Repeated or concurrent calls leave one profile.
         """
-        
-        return (await self.get_user_profile(user_id=user.id) 
-                or await self.create_profile(user=user))
-        
+        stmt = insert(Profile).values(user_id=user_id, **values)
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[Profile.user_id],
+                set_=values,
+            )
+            .returning(Profile)
+            # refresh a profile already loaded in the session
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
     
+    async def ensure_profile(
+        self,
+        user_id: int,
+    ) -> None:
+        """ 
+        Create an empty profile if the user has none,
+        in the caller's transaction (no commit)
+        """
+        stmt = (
+            insert(Profile)
+            .values(user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[Profile.user_id])
+        )
+        await self.session.execute(stmt)
+
     async def update_profile(
         self,
         user_id: int,
         update_data: dict,
     ) -> Profile:
         """ 
-        Update only an existing profile
+        Update profile fields (avatar, bio, theme) in one
+        round trip; a missing profile is created with them
         """
         
-        profile = await self.get_user_profile(user_id=user_id)
-        if not profile:
-            raise error.NotFound("Profile not found")
-        
-        for filed, value in update_data.items():
-            if hasattr(profile, filed):
-                setattr(profile, filed, value)
-                
+        values = {
+            field: value
+            for field, value in update_data.items()
+            if field in _PROFILE_FIELDS
+        }
+        if not values:
+            raise error.NotValidData("Nothing to update")
+
+        profile = await self.upsert_profile(user_id=user_id, values=values)
         await self.session.commit()
-        await self.session.refresh(profile)
         return profile
     
     async def update_bio(
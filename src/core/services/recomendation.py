@@ -1,5 +1,5 @@
 import logging
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, desc, func, case, values, column, true, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
@@ -7,6 +7,7 @@ from core.database.models import (
     Post,
     Like,
     Subscription,
+    PostTag,
 )
 from core.services.base import BaseService
 
@@ -15,6 +16,9 @@ from exceptions import error
 
 logger = logging.getLogger(__name__)
 
+# candidates per favorite tag: its most recent published posts
+_CANDIDATES_PER_TAG = 200
+
 
 class RecommendationService(BaseService):
     """
@@ -33,32 +37,73 @@ class RecommendationService(BaseService):
         limit: int = 20,
     ) -> list[Post]:
         try:
-            # Find a popular tag for a user
+            # Find popular tags for a user, weight = liked posts with the tag
             user_tags_stmt = (
-                select(Post.tag, func.count(Post.id).label("tag_count"))
+                select(PostTag.tag_id, func.count(Post.id).label("tag_count"))
+                .join(Post, Post.id == PostTag.post_id)
                 .join(Like, Post.id == Like.post_id)
                 .where(
                     Like.user_id == user_id,
                     Post.is_published == True,
                 )
-                .group_by(Post.tag)
+                .group_by(PostTag.tag_id)
                 .order_by(desc("tag_count"))
                 .limit(10)
             )
 
             user_tags_result = await self.session.execute(user_tags_stmt)
 
-            if user_favorite_tags := user_tags_result.scalars().all():
-                # If there are any, then we find similar tags,
-                # excluding those posts that were written by the user himself.
+            if user_favorite_tags := dict(user_tags_result.all()):
+                # If there are any, candidates are the latest published
+                # posts of each tag (ix_post_tags_tag_id_post_id walked
+                # backwards, LIMIT per tag), excluding those posts
+                # that were written by the user himself.
+                favorite_tags = values(
+                    column("tag_id", Integer), name="favorite_tags"
+                ).data([(tag_id,) for tag_id in user_favorite_tags])
+                per_tag = (
+                    select(PostTag.post_id)
+                    .join(Post, Post.id == PostTag.post_id)
+                    .where(
+                        PostTag.tag_id == favorite_tags.c.tag_id,
+                        Post.is_published == True,
+                        Post.user_id != user_id,
+                    )
+                    .order_by(desc(PostTag.post_id))
+                    .limit(_CANDIDATES_PER_TAG)
+                    .lateral("per_tag")
+                )
+                candidates = select(per_tag.c.post_id).select_from(
+                    favorite_tags.join(per_tag, true())
+                )
+                # then we score them by tag overlap
+                # (sum of the weights of the shared tags)
+                overlap = (
+                    select(
+                        PostTag.post_id,
+                        func.sum(
+                            case(user_favorite_tags, value=PostTag.tag_id)
+                        ).label("score"),
+                    )
+                    .where(
+                        PostTag.post_id.in_(candidates),
+                        PostTag.tag_id.in_(user_favorite_tags),
+                    )
+                    .group_by(PostTag.post_id)
+                    .subquery()
+                )
                 stmt = (
                     select(Post)
+                    .join(overlap, overlap.c.post_id == Post.id)
                     .where(
                         Post.is_published == True,
-                        Post.tag.in_(user_favorite_tags),
                         Post.user_id != user_id,
                     )
-                    .order_by(desc(Post.like_count), desc(Post.created_at))
+                    .order_by(
+                        desc(overlap.c.score),
+                        desc(Post.like_count),
+                        desc(Post.created_at),
+                    )
                     .limit(limit)
                     .options(selectinload(Post.author))
                 )
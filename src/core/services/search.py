@@ -0,0 +1,137 @@
+import html
+import logging
+from sqlalchemy import select, func, tuple_, cast, REAL
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from core.services.base import BaseService
+from core.database.models import Post
+from core.database.models.post import SEARCH_CONFIG
+
+from exceptions import error
+
+
+logger = logging.getLogger(__name__)
+
+# ts_headline returns the post's content as is: it marks matches with
+# control characters, the headline is escaped, then they become <mark>
+_START_SEL = "\x02"
+_STOP_SEL = "\x03"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_START_SEL}, StopSel={_STOP_SEL}, "
+    "MaxFragments=2, MaxWords=25, MinWords=8"
+)
+
+
+def _safe_headline(headline: str | None) -> str | None:
+    """
+    HTML-escaped headline with the matches wrapped in <mark>
+    """
+    if headline is None:
+        return None
+    return (
+        html.escape(headline)
+        .replace(_START_SEL, "<mark>")
+        .replace(_STOP_SEL, "</mark>")
+    )
+
+
+class SearchService(BaseService):
+    """
+    Full-text search over published posts
+    (posts.search_vector, GIN index)
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+    ):
+        super().__init__(session=session)
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> tuple[float, int]:
+        try:
+            rank, post_id = cursor.split(":")
+            return float(rank), int(post_id)
+        except ValueError as e:
+            raise error.NotValidData("Invalid cursor") from e
+
+    async def search_posts(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> dict:
+        """
+        Published posts matching the query (web search syntax:
+        "quoted phrase", or, -exclude), best first.
+        Keyset pagination on (rank, id): the cursor is
+        "rank:id" of the last post of the previous page.
+        Headlines are built only for the posts of the page.
+        """
+        query = query.strip()
+        if not query:
+            raise error.NotValidData("Search query is empty")
+
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank_cd(Post.search_vector, ts_query).label("rank")
+
+        page = (
+            select(
+                Post.id,
+                Post.title,
+                Post.content,
+                Post.tags.label("tags"),
+                Post.user_id,
+                Post.like_count,
+                Post.comment_count,
+                Post.created_at,
+                rank,
+            )
+            .where(
+                Post.search_vector.op("@@")(ts_query),
+                Post.is_published == True,
+            )
+            .order_by(rank.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            after_rank, after_id = self._parse_cursor(cursor)
+            page = page.where(
+                tuple_(func.ts_rank_cd(Post.search_vector, ts_query), Post.id)
+                < tuple_(cast(after_rank, REAL), after_id)
+            )
+        page = page.subquery()
+
+        stmt = select(
+            page.c.id,
+            page.c.title,
+            page.c.tags,
+            page.c.user_id,
+            page.c.like_count,
+            page.c.comment_count,
+            page.c.created_at,
+            page.c.rank,
+            func.ts_headline(
+                SEARCH_CONFIG,
+                page.c.content,
+                ts_query,
+                _HEADLINE_OPTIONS,
+            ).label("headline"),
+        ).order_by(page.c.rank.desc(), page.c.id.desc())
+
+        try:
+            result = await self.session.execute(stmt)
+            posts = [row._asdict() for row in result]
+        except SQLAlchemyError as e:
+            logger.error("Проснись ты обосрался. БД упала: ", e)
+            raise error.DataBaseError("Database temporarily unavailable") from e
+
+        for post in posts:
+            post["headline"] = _safe_headline(post["headline"])
+
+        next_cursor = None
+        if len(posts) == limit:
+            last = posts[-1]
+            next_cursor = f"{last['rank']!r}:{last['id']}"
+
+        return {"posts": posts, "next_cursor": next_cursor}
@@ -1,5 +1,7 @@
 import jwt
 import re
+import uuid
+import asyncio
 import logging
 
 
@@ -12,14 +14,21 @@ from fastapi import (
 )
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, desc, bindparam, or_, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload, aliased
 from core.services.base import BaseService
+from core.services.profile import ProfileService
 from core.database.schemas.user import UserCreate
-from core.database.models import User, RefreshToken, Profile, Post
+from core.database.models import User, RefreshToken, Post
 
 from utilities.now import get_now_timezone_date
-from utilities.security import hash_password, verify_password
+from utilities.security import (
+    hash_password,
+    verify_password,
+    generate_token,
+    hash_token,
+)
 from utilities.jwt_token import create_jwt_token, verify_token
 
 from exceptions import error
@@ -34,6 +43,74 @@ from core.mailing import (
 
 logger = logging.getLogger(__name__)
 
+# hot statements are built once, only parameters change per call
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+# only the first verification updates (and sends the mail)
+_VERIFY_USER = (
+    update(User)
+    .where(User.id == bindparam("user_id"), User.is_verified == False)
+    .values(is_verified=True)
+    .returning(User)
+    .execution_options(synchronize_session=False, populate_existing=True)
+)
+# email and username match case-insensitively (lower() unique indexes)
+_USER_BY_EMAIL = select(User).where(
+    func.lower(User.email) == func.lower(bindparam("email"))
+)
+_USER_BY_USERNAME = select(User).where(
+    func.lower(User.username) == func.lower(bindparam("username"))
+)
+_login = func.lower(bindparam("login"))
+# one round trip for "email or username", an email match wins
+_USER_BY_LOGIN = (
+    select(User)
+    .where(or_(func.lower(User.email) == _login, func.lower(User.username) == _login))
+    .order_by(case((func.lower(User.email) == _login, 0), else_=1))
+    .limit(1)
+)
+_VALID_REFRESH_TOKEN = select(RefreshToken).where(
+    RefreshToken.token_hash == bindparam("token_hash"),
+    RefreshToken.expires_at > bindparam("now"),
+    RefreshToken.is_revoked == False,
+)
+# UPDATE binds are b_ prefixed: a column's own name is reserved for SET
+_ROTATE_REFRESH_TOKEN = (
+    update(RefreshToken)
+    .where(
+        RefreshToken.token_hash == bindparam("b_token_hash"),
+        RefreshToken.expires_at > bindparam("now"),
+        RefreshToken.is_revoked == False,
+    )
+    .values(is_revoked=True, revoked_at=bindparam("now"))
+    .returning(RefreshToken.user_id, RefreshToken.family_id)
+    .execution_options(synchronize_session=False)
+)
+_REVOKE_USER_REFRESH_TOKENS = (
+    update(RefreshToken)
+    .where(
+        RefreshToken.user_id == bindparam("b_user_id"),
+        RefreshToken.is_revoked == False,
+    )
+    .values(is_revoked=True, revoked_at=bindparam("now"))
+    .execution_options(synchronize_session=False)
+)
+_reused_token = aliased(RefreshToken)
+_REVOKE_REUSED_FAMILY = (
+    update(RefreshToken)
+    .where(
+        RefreshToken.family_id
+        == select(_reused_token.family_id)
+        .where(
+            _reused_token.token_hash == bindparam("b_token_hash"),
+            _reused_token.is_revoked == True,
+        )
+        .scalar_subquery(),
+        RefreshToken.is_revoked == False,
+    )
+    .values(is_revoked=True, revoked_at=bindparam("now"))
+    .execution_options(synchronize_session=False)
+)
+
 
 class UserService(BaseService):
     """
@@ -54,45 +131,80 @@ class UserService(BaseService):
         Creates a new user with a unique email and username,
         hashes the password,
         and sends a token to the email for email confirmation.
+        Uniqueness is checked by the insert itself
+        (ON CONFLICT DO NOTHING), so it's one round trip
+        and concurrent registrations cannot race.
+        The verification email is queued in the same transaction.
         """
 
-        # logic for unique email and username:
-        if await self.get_user_by_email(user_data.email):
-            raise error.LoginAlreadyExist("Email already exist!")
-        if await self.get_user_by_username(user_data.username):
-            raise error.LoginAlreadyExist("Username already exist!")
-
         # password validation:
         await self.validate_password(user_data.password)
 
-        # password hashing:
-        hashed_password = hash_password(user_data.password)
+        # password hashing (bcrypt is slow, keep it off the event loop):
+        hashed_password = await asyncio.to_thread(hash_password, user_data.password)
 
         try:
             # create user:
-            user = User(
-                email=user_data.email,
-                username=user_data.username,
-                hashed_password=hashed_password,
-                is_active=True,
-                is_verified=False,
-                is_superuser=False,
+            stmt = (
+                insert(User)
+                .values(
+                    email=user_data.email,
+                    username=user_data.username,
+                    hashed_password=hashed_password,
+                    is_active=True,
+                    is_verified=False,
+                    is_superuser=False,
+                )
+                .on_conflict_do_nothing()
+                .returning(User)
             )
-
-            self.session.add(user)
-            await self.session.commit()
-            await self.session.refresh(user)
+            result = await self.session.execute(stmt)
+            user = result.scalar_one_or_none()
 
             # verify email:
-            await self.request_to_verify(user=user)
+            if user is not None:
+                verification_token = await self.generate_verification_token(
+                    user_id=user.id
+                )
+                await self.after_request_verify(user=user, token=verification_token)
 
-            return user
+            await self.session.commit()
         except Exception as e:
             await self.session.rollback()
             raise error.InternalServerError(
                 "Failed registration. Try again later or contact support"
             ) from e
 
+        # logic for unique email and username:
+        if user is None:
+            await self._raise_login_conflict(
+                email=user_data.email,
+                username=user_data.username,
+            )
+
+        return user
+
+    async def _raise_login_conflict(
+        self,
+        email: str,
+        username: str,
+    ) -> None:
+        """
+        Find out which unique key the registration collided with
+        """
+        stmt = select(func.lower(User.email)).where(
+            or_(
+                func.lower(User.email) == email.lower(),
+                func.lower(User.username) == username.lower(),
+            )
+        )
+        result = await self.session.execute(stmt)
+        taken_emails = result.scalars().all()
+
+        if email.lower() in taken_emails:
+            raise error.LoginAlreadyExist("Email already exist!")
+        raise error.LoginAlreadyExist("Username already exist!")
+
     async def request_to_verify(
         self,
         user: User,
@@ -110,16 +222,18 @@ class UserService(BaseService):
 
             # send verification email:
             await self.after_request_verify(user=user, token=verification_token)
+            await self.session.commit()
 
             logger.info(
                 """
-                📧 Verification email sent to %r:
+                📧 Verification email queued for %r:
                 Token: %r
                 """,
                 user.email,
                 verification_token,
             )
         except Exception as e:
+            await self.session.rollback()
             logger.error("Failed to send verification email: ", e)
             raise error.InternalServerError(
                 "Failed to send verification email. Please contact support."
@@ -132,12 +246,10 @@ class UserService(BaseService):
     ) -> User:
         """
         Authenticates only active and verified users.
-        Allows you to log in using your email or username.
+        Allows you to log in using your email or username
+        (in any letter case).
         """
-        if "@" in login:
-            user = await self.get_user_by_email(login)
-        else:
-            user = await self.get_user_by_username(login)
+        user = await self.get_user_by_login(login)
 
         if not user:
             raise error.NotFound("User not found!")
@@ -148,12 +260,27 @@ class UserService(BaseService):
         if not user.is_verified:
             raise error.NotAllowed("Email not verified!")
 
-        # verifying password
-        if not verify_password(password, user.hashed_password):
+        # verifying password (bcrypt, off the event loop)
+        if not await asyncio.to_thread(verify_password, password, user.hashed_password):
             raise error.NotValidData("Invalid password!")
 
         return user
 
+    async def get_user_by_login(
+        self,
+        login: str,
+    ) -> User | None:
+        """
+        Found user by EMAIL or USERNAME in one query
+        and return User or if not found return None.
+        """
+        try:
+            result = await self.session.execute(_USER_BY_LOGIN, {"login": login})
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            logger.error("Проснись ты обосрался. БД упала: ", e)
+            raise error.DataBaseError("Database temporarily unavailable") from e
+
     async def get_user_by_email(
         self,
         email: str,
@@ -163,8 +290,7 @@ class UserService(BaseService):
         or if not found return None.
         """
         try:
-            stmt = select(User).where(User.email == email)
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(_USER_BY_EMAIL, {"email": email})
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
             logger.error("Проснись ты обосрался. БД упала: ", e)
@@ -181,8 +307,9 @@ class UserService(BaseService):
         or if not found return None.
         """
         try:
-            stmt = select(User).where(User.username == username)
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(
+                _USER_BY_USERNAME, {"username": username}
+            )
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
             logger.error("Проснись ты обосрался. БД упала: ", e)
@@ -199,8 +326,7 @@ class UserService(BaseService):
         or if not found return None.
         """
         try:
-            stmt = select(User).where(User.id == user_id)
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(_USER_BY_ID, {"user_id": user_id})
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
             logger.error("Проснись ты обосрался. БД упала: ", e)
@@ -226,18 +352,20 @@ class UserService(BaseService):
     ):
         """
         Generates a verification link and
-        sends an email to the user as a background task.
+        queues an email to the user (without commit).
         """
 
         verification_link = f"http://localhost:8000/verification-proccess?token={token}"
 
-        self.background_task.add_task(
-            send_verification_email, user=user, verification_link=verification_link
+        await send_verification_email(
+            session=self.session,
+            user=user,
+            verification_link=verification_link,
         )
 
         logger.info(
             """
-            🫴 Email was send with link:
+            🫴 Email was queued with link:
             %r
             to user: %r
             """,
@@ -262,25 +390,28 @@ class UserService(BaseService):
                 raise error.ErrorToken("Invalid token or missing token!")
 
             user_id = int(payload.get("sub"))
-            user = await self.get_user_by_id(user_id)
-
-            if not user:
-                raise error.NotFound("User not found!")
-
-            user.is_verified = True
-
-            # create profile
-            profile = Profile(user_id=user.id)
-            self.session.add(profile)
+            result = await self.session.execute(_VERIFY_USER, {"user_id": user_id})
+            user = result.scalar_one_or_none()
+            newly_verified = user is not None
+
+            if not newly_verified:
+                # already verified (a repeated or concurrent request)
+                user = await self.get_user_by_id(user_id=user_id)
+                if not user:
+                    raise error.NotFound("User not found!")
+
+            # create profile (a repeated verification keeps the existing one)
+            await ProfileService(self.session).ensure_profile(user_id=user.id)
+
+            if newly_verified:
+                # sending confirm email about verification:
+                await send_answer_after_verify(
+                    session=self.session,
+                    user=user,
+                )
 
             await self.session.commit()
 
-            # sending confirm email about verification:
-            self.background_task.add_task(
-                send_answer_after_verify,
-                user=user,
-            )
-
             return user
 
         except jwt.ExpiredSignatureError as e:
@@ -346,11 +477,12 @@ class UserService(BaseService):
         reset_link = f"http://localhost:8000/reset-proccess?token={reset_token}"
 
         # sent email
-        self.background_task.add_task(
-            send_pasword_reset_email,
+        await send_pasword_reset_email(
+            session=self.session,
             user=user,
             reset_link=reset_link,
         )
+        await self.session.commit()
 
         logger.info(
             """
@@ -393,26 +525,27 @@ class UserService(BaseService):
             # password validation:
             await self.validate_password(new_password)
 
-            # check password if new pwd equal current:
-            if verify_password(new_password, user.hashed_password):
+            # check password if new pwd equal current
+            # (bcrypt, off the event loop like the hashing below):
+            if await asyncio.to_thread(
+                verify_password, new_password, user.hashed_password
+            ):
                 raise error.NotValidData(
                     "New password cannot be the same as the current password"
                 )
 
             # change password
-            user.hashed_password = hash_password(new_password)
-
-            # delete refresh token for user
-            await self.revoke_refresh_token(user.id)
-
-            await self.session.commit()
+            user.hashed_password = await asyncio.to_thread(hash_password, new_password)
 
             # sent email
-            self.background_task.add_task(
-                send_answer_after_reset_password,
+            await send_answer_after_reset_password(
+                session=self.session,
                 user=user,
             )
 
+            # delete refresh token for user (commits everything above)
+            await self.revoke_refresh_token(user.id)
+
             logger.info(
                 """
                 Password reset succesfully for user.id: 
@@ -426,47 +559,45 @@ class UserService(BaseService):
         except jwt.InvalidTokenError as e:
             raise error.ErrorToken("Invalid token!") from e
 
-    async def create_refresh_token(
+    def _add_refresh_token(
         self,
         user_id: int,
-    ):
-        try:
-            token_data = {"sub": str(user_id), "type": "refresh_token"}
-
-            NOW = get_now_timezone_date()
-            expires_at = NOW + timedelta(days=30)
-
-            token = create_jwt_token(token_data, expires_delta=timedelta(days=30))
+        family_id: uuid.UUID,
+    ) -> str:
+        """
+        Add a new refresh token of the family to the session
+        (without commit), only its hash is stored.
+        Return token
+        """
+        token = generate_token()
+
+        NOW = get_now_timezone_date()
+        refresh_token = RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(token),
+            family_id=family_id,
+            expires_at=NOW + timedelta(days=30),
+            is_revoked=False,
+        )
 
-            refresh_token = RefreshToken(
-                user_id=user_id,
-                token=token,
-                expires_at=expires_at,
-                is_revoked=False,
-            )
+        self.session.add(refresh_token)
+        return token
 
-            self.session.add(refresh_token)
+    async def create_refresh_token(
+        self,
+        user_id: int,
+    ) -> str:
+        """
+        Create refresh token starting a new family (login)
+        """
+        try:
+            token = self._add_refresh_token(user_id=user_id, family_id=uuid.uuid4())
             await self.session.commit()
             return token
         except SQLAlchemyError as e:
             logger.error("Проснись ты обосрался. БД упала: ", e)
             raise error.DataBaseError("Database temporarily unavailable") from e
 
-    async def verify_refresh_token(
-        self,
-        token: str,
-    ) -> dict | None:
-        """
-        Refresh token verification
-        """
-
-        payload = verify_token(token=token, expected_type="refresh_token")
-
-        if not payload or payload.get("type") != "refresh_token":
-            raise error.ErrorToken("Mising token or invalid token!")
-
-        return payload
-
     async def get_valid_refresh_token(
         self,
         token: str,
@@ -477,35 +608,59 @@ class UserService(BaseService):
         """
         try:
             NOW = get_now_timezone_date()
-            stmt = select(RefreshToken).where(
-                RefreshToken.token == token,
-                RefreshToken.expires_at > NOW,
-                RefreshToken.is_revoked == False,
+            result = await self.session.execute(
+                _VALID_REFRESH_TOKEN, {"token_hash": hash_token(token), "now": NOW}
             )
-
-            result = await self.session.execute(stmt)
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
             logger.error("Проснись ты обосрался. БД упала: ", e)
             raise error.DataBaseError("Database temporarily unavailable") from e
 
-    async def validate_refresh_token(
+    async def rotate_refresh_token(
         self,
         token: str,
-    ) -> RefreshToken:
+    ) -> tuple[int, str]:
+        """
+        Revoke the refresh token and issue the next one of
+        the same family in one transaction.
+        An already revoked token means it was stolen or replayed:
+        the whole family is revoked.
+        Return (user_id, new refresh token)
+        """
+        token_hash = hash_token(token)
         try:
-            # verify refresh token
-            await self.verify_refresh_token(token=token)
+            NOW = get_now_timezone_date()
+            result = await self.session.execute(
+                _ROTATE_REFRESH_TOKEN, {"b_token_hash": token_hash, "now": NOW}
+            )
+            row = result.one_or_none()
 
-            # check in DB if token is revoked
-            return await self.get_valid_refresh_token(token=token)
+            if row is None:
+                reused = await self.session.execute(
+                    _REVOKE_REUSED_FAMILY, {"b_token_hash": token_hash, "now": NOW}
+                )
+                await self.session.commit()
+
+                if reused.rowcount:
+                    logger.warning(
+                        """
+                        Refresh token reuse, revoked %r tokens of the family
+                        """,
+                        reused.rowcount,
+                    )
+                raise error.ErrorToken("Invalid token")
+
+            new_token = self._add_refresh_token(
+                user_id=row.user_id,
+                family_id=row.family_id,
+            )
+            await self.session.commit()
+            return row.user_id, new_token
 
         except SQLAlchemyError as e:
+            await self.session.rollback()
             logger.error("Проснись ты обосрался. БД упала: ", e)
             raise error.DataBaseError("Database temporarily unavailable") from e
-        except Exception as e:
-            logger.error("Error: ", e)
-            raise error.ErrorToken("Invalid token") from e
 
     async def revoke_refresh_token(
         self,
@@ -513,24 +668,29 @@ class UserService(BaseService):
     ):
         """
         Revoked all refresh token for user
+        and all access tokens issued before now
+        (tokens_valid_after watermark)
         """
         try:
-            stmt = select(RefreshToken).where(
-                RefreshToken.user_id == user_id, RefreshToken.is_revoked == False
+            # iat of access tokens has seconds precision
+            NOW = get_now_timezone_date().replace(microsecond=0)
+            result = await self.session.execute(
+                _REVOKE_USER_REFRESH_TOKENS, {"b_user_id": user_id, "now": NOW}
             )
-
-            result = await self.session.execute(stmt)
-            tokens = result.scalars().all()
-
-            for token in tokens:
-                token.is_revoked = True
+            stmt = (
+                update(User)
+                .where(User.id == user_id)
+                .values(tokens_valid_after=NOW)
+            )
+            await self.session.execute(stmt)
 
             await self.session.commit()
 
             logger.info(
                 """ 
-                Revoked all refresh tokens for user_id: %r
+                Revoked %r refresh tokens for user_id: %r
                 """,
+                result.rowcount,
                 user_id,
             )
         except SQLAlchemyError as e:
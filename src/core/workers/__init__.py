@@ -0,0 +1,18 @@
+__all__ = (
+    "RefreshTokenSweeper",
+    "refresh_token_sweeper",
+    "OutboxDispatcher",
+    "outbox_dispatcher",
+    "CampaignRunner",
+    "campaign_runner",
+    "UnverifiedUserPurger",
+    "unverified_user_purger",
+    "AccountDeletionWorker",
+    "account_deletion_worker",
+)
+
+from .refresh_token_gc import RefreshTokenSweeper, refresh_token_sweeper
+from .mail_outbox import OutboxDispatcher, outbox_dispatcher
+from .campaign import CampaignRunner, campaign_runner
+from .unverified_purge import UnverifiedUserPurger, unverified_user_purger
+from .account_deletion import AccountDeletionWorker, account_deletion_worker
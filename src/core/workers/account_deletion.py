@@ -0,0 +1,458 @@
+import asyncio
+import logging
+from collections import Counter
+from contextlib import suppress
+from datetime import timedelta
+from sqlalchemy import delete, select, update, or_, func, bindparam, tuple_
+from sqlalchemy import ARRAY, Integer, any_
+from sqlalchemy.orm import aliased
+
+from core.config import settings
+from core.cache import post_cache
+from core.database import db_helper
+from core.database.models import (
+    AccountDeletion,
+    Post,
+    Like,
+    Comment,
+    CommentLike,
+    Notification,
+    Subscription,
+    User,
+    Tag,
+    PostTag,
+)
+from utilities.now import get_now_timezone_date
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_chunk(model, criteria, *returning):
+    """
+    DELETE of at most :batch_size rows of model matching criteria(table)
+    """
+    rows = aliased(model)
+    stmt = delete(model).where(
+        model.id.in_(
+            select(rows.id)
+            .where(criteria(rows))
+            .limit(bindparam("batch_size"))
+        )
+    )
+    if returning:
+        stmt = stmt.returning(*returning)
+    return stmt.execution_options(synchronize_session=False)
+
+
+def _decrement(table, column: str):
+    """
+    (lock, update) for a chunk: the rows of :ids locked in id order,
+    then one UPDATE table.column -= n for every (id, n) of the
+    :b_ids / :b_ns arrays (not below zero)
+    """
+    lock = (
+        select(table.c.id)
+        .where(table.c.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+        .order_by(table.c.id)
+        .with_for_update()
+    )
+    amounts = (
+        func.unnest(
+            bindparam("b_ids", type_=ARRAY(Integer)),
+            bindparam("b_ns", type_=ARRAY(Integer)),
+        )
+        .table_valued("id", "n")
+        .render_derived()
+    )
+    values = {column: func.greatest(table.c[column] - amounts.c.n, 0)}
+    if "updated_at" in table.c:
+        # counters are not an edit, keep updated_at (onupdate)
+        values["updated_at"] = table.c.updated_at
+    decrement = table.update().where(table.c.id == amounts.c.id).values(values)
+    return lock, decrement
+
+
+_user_id = bindparam("user_id")
+
+_links = aliased(PostTag)
+
+# tag links of the user's published posts, returning tag ids for the
+# counters; links of hidden posts (not counted) go with the posts
+_DELETE_POST_TAGS = (
+    delete(PostTag)
+    .where(
+        tuple_(PostTag.post_id, PostTag.tag_id).in_(
+            select(_links.post_id, _links.tag_id)
+            .join(Post, Post.id == _links.post_id)
+            .where(Post.user_id == _user_id, Post.is_published == True)
+            .limit(bindparam("batch_size"))
+        )
+    )
+    .returning(PostTag.tag_id)
+    .execution_options(synchronize_session=False)
+)
+
+# (stage, chunk statement, counter statements for the returned parent ids)
+# the user's content on other users' posts goes first, with counters,
+# then the user's own posts (their likes and comments by cascade)
+STAGES = (
+    (
+        "likes",
+        _delete_chunk(Like, lambda t: t.user_id == _user_id, Like.post_id),
+        _decrement(Post.__table__, "like_count"),
+    ),
+    (
+        "comment_likes",
+        _delete_chunk(
+            CommentLike, lambda t: t.user_id == _user_id, CommentLike.comment_id
+        ),
+        _decrement(Comment.__table__, "like_count"),
+    ),
+    (
+        "comments",
+        _delete_chunk(Comment, lambda t: t.user_id == _user_id, Comment.post_id),
+        _decrement(Post.__table__, "comment_count"),
+    ),
+    (
+        "post_tags",
+        _DELETE_POST_TAGS,
+        _decrement(Tag.__table__, "post_count"),
+    ),
+    (
+        "posts",
+        _delete_chunk(Post, lambda t: t.user_id == _user_id),
+        None,
+    ),
+    (
+        "notifications",
+        _delete_chunk(
+            Notification,
+            lambda t: or_(t.user_id == _user_id, t.action_by_id == _user_id),
+        ),
+        None,
+    ),
+    (
+        "subscriptions",
+        _delete_chunk(
+            Subscription,
+            lambda t: or_(t.follower_id == _user_id, t.following_id == _user_id),
+        ),
+        None,
+    ),
+)
+
+# profile and refresh tokens are small, they go with the user by cascade
+_DELETE_USER = (
+    delete(User)
+    .where(User.id == _user_id, User.is_active == False)
+    .execution_options(synchronize_session=False)
+)
+
+# taken at the start of every chunk transaction: reactivation
+# (UPDATE of the user) waits for the chunk, the next one sees it
+_LOCK_USER = select(User.is_active).where(User.id == _user_id).with_for_update(
+    read=True
+)
+
+_JOB_STATUS = select(AccountDeletion.status).where(
+    AccountDeletion.id == bindparam("job_id")
+)
+
+_job = aliased(AccountDeletion)
+
+_CLAIM = (
+    update(AccountDeletion)
+    .where(
+        AccountDeletion.id
+        == (
+            select(_job.id)
+            .where(
+                _job.status.in_(("pending", "running")),
+                or_(
+                    _job.heartbeat_at.is_(None),
+                    _job.heartbeat_at < bindparam("stale_before"),
+                ),
+            )
+            .order_by(_job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+    )
+    .values(
+        status="running",
+        heartbeat_at=bindparam("now"),
+        started_at=func.coalesce(AccountDeletion.started_at, bindparam("now")),
+    )
+    .returning(AccountDeletion.id, AccountDeletion.user_id, AccountDeletion.stage)
+    .execution_options(synchronize_session=False)
+)
+
+_PROGRESS = (
+    update(AccountDeletion)
+    .where(AccountDeletion.id == bindparam("job_id"))
+    .values(
+        stage=bindparam("stage"),
+        rows_deleted=AccountDeletion.rows_deleted + bindparam("deleted"),
+        heartbeat_at=bindparam("now"),
+    )
+    .execution_options(synchronize_session=False)
+)
+
+_RELEASE = (
+    update(AccountDeletion)
+    .where(AccountDeletion.id == bindparam("job_id"))
+    .values(heartbeat_at=None)
+    .execution_options(synchronize_session=False)
+)
+
+_FINISH = (
+    update(AccountDeletion)
+    .where(AccountDeletion.id == bindparam("job_id"))
+    .values(
+        status=bindparam("status"),
+        last_error=bindparam("last_error"),
+        finished_at=bindparam("now"),
+        heartbeat_at=None,
+    )
+    .execution_options(synchronize_session=False)
+)
+
+
+class AccountDeletionWorker:
+    """
+    Runs account deletion jobs: removes the user's likes, comments,
+    posts, notifications and subscriptions in chunks of batch_size rows,
+    one short transaction each, decrementing like/comment counters
+    of the affected posts and comments and post counters of the tags
+    in bulk, then the user.
+    Progress (stage, rows_deleted) is stored after every chunk;
+    an interrupted job continues from its stage.
+    Every chunk first checks that the user is still inactive and
+    the job not cancelled (reactivation stops the job).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        pause: float = 0.1,
+        interval: float = 5,
+        claim_timeout: float = 300,
+    ):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.claim_timeout = claim_timeout
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.jobs_cancelled = 0
+        self.rows_deleted_total = 0
+
+    def notify(self) -> None:
+        """
+        A new job was created, don't wait for the next poll
+        """
+        self._wakeup.set()
+
+    async def _claim(self):
+        NOW = get_now_timezone_date()
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                _CLAIM,
+                {
+                    "now": NOW,
+                    "stale_before": NOW - timedelta(seconds=self.claim_timeout),
+                },
+            )
+            job = result.first()
+            await session.commit()
+        return job
+
+    async def _still_deleting(self, session, job_id: int, user_id: int) -> bool:
+        """
+        False when the user was reactivated or the job cancelled:
+        the job is marked cancelled, nothing more is deleted.
+        Locks the user row until the end of the transaction
+        """
+        result = await session.execute(_LOCK_USER, {"user_id": user_id})
+        is_active = result.scalar_one_or_none()
+        result = await session.execute(_JOB_STATUS, {"job_id": job_id})
+        if not is_active and result.scalar_one() != "cancelled":
+            return True
+
+        await session.execute(
+            _FINISH,
+            {
+                "job_id": job_id,
+                "status": "cancelled",
+                "last_error": None,
+                "now": get_now_timezone_date(),
+            },
+        )
+        await session.commit()
+        # counters of cached posts may have changed by now
+        await post_cache.clear()
+
+        logger.info(
+            """
+            Account deletion job %r: user %r reactivated, job cancelled
+            """,
+            job_id,
+            user_id,
+        )
+        return False
+
+    async def _run_stage(self, job_id: int, user_id: int, stage: str, stmt, counter) -> bool:
+        """
+        Delete the stage's rows chunk by chunk,
+        False when the job was cancelled
+        """
+        params = {"user_id": user_id, "batch_size": self.batch_size}
+        while True:
+            async with db_helper.session_factory() as session:
+                if not await self._still_deleting(session, job_id, user_id):
+                    return False
+
+                result = await session.execute(stmt, params)
+
+                if counter is not None:
+                    parent_ids = result.scalars().all()
+                    deleted = len(parent_ids)
+                    if parent_ids:
+                        lock, decrement = counter
+                        ids, ns = zip(*sorted(Counter(parent_ids).items()))
+                        # in id order: the same lock order as any concurrent update
+                        await session.execute(lock, {"ids": list(ids)})
+                        await session.execute(
+                            decrement, {"b_ids": list(ids), "b_ns": list(ns)}
+                        )
+                else:
+                    deleted = result.rowcount
+
+                await session.execute(
+                    _PROGRESS,
+                    {
+                        "job_id": job_id,
+                        "stage": stage,
+                        "deleted": deleted,
+                        "now": get_now_timezone_date(),
+                    },
+                )
+                await session.commit()
+
+            self.rows_deleted_total += deleted
+            if deleted < self.batch_size:
+                return True
+            await asyncio.sleep(self.pause)
+
+    async def run_job(self, job_id: int, user_id: int, stage: str) -> bool:
+        """
+        True when the user was deleted, False when the job was cancelled
+        """
+        stage_names = [name for name, _, _ in STAGES]
+        start = stage_names.index(stage) if stage in stage_names else len(STAGES)
+
+        for name, stmt, counter in STAGES[start:]:
+            if not await self._run_stage(job_id, user_id, name, stmt, counter):
+                return False
+
+        async with db_helper.session_factory() as session:
+            if not await self._still_deleting(session, job_id, user_id):
+                return False
+            await session.execute(_DELETE_USER, {"user_id": user_id})
+            await session.execute(
+                _FINISH,
+                {
+                    "job_id": job_id,
+                    "status": "completed",
+                    "last_error": None,
+                    "now": get_now_timezone_date(),
+                },
+            )
+            await session.commit()
+
+        # counters of cached posts changed, user's posts are gone
+        await post_cache.clear()
+
+        logger.info(
+            """
+            Account deletion job %r: user %r deleted
+            """,
+            job_id,
+            user_id,
+        )
+        return True
+
+    async def _fail(self, job_id: int, e: Exception) -> None:
+        async with db_helper.session_factory() as session:
+            await session.execute(
+                _FINISH,
+                {
+                    "job_id": job_id,
+                    "status": "failed",
+                    "last_error": str(e)[:1000],
+                    "now": get_now_timezone_date(),
+                },
+            )
+            await session.commit()
+
+    async def run_pending(self) -> None:
+        """
+        Run jobs until there is nothing to claim
+        """
+        while job := await self._claim():
+            try:
+                if await self.run_job(job.id, job.user_id, job.stage):
+                    self.jobs_completed += 1
+                else:
+                    self.jobs_cancelled += 1
+            except asyncio.CancelledError:
+                # shutdown: let the next start continue the job right away
+                async with db_helper.session_factory() as session:
+                    await session.execute(_RELEASE, {"job_id": job.id})
+                    await session.commit()
+                raise
+            except Exception as e:
+                self.jobs_failed += 1
+                logger.error("Account deletion job %r failed: %s", job.id, e)
+                await self._fail(job.id, e)
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_pending()
+            except Exception as e:
+                logger.error("Account deletion worker failed: %s", e)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "jobs_completed": self.jobs_completed,
+            "jobs_failed": self.jobs_failed,
+            "jobs_cancelled": self.jobs_cancelled,
+            "rows_deleted_total": self.rows_deleted_total,
+        }
+
+
+account_deletion_worker = AccountDeletionWorker(
+    batch_size=settings.account_deletion.batch_size,
+    pause=settings.account_deletion.pause,
+    interval=settings.account_deletion.interval,
+    claim_timeout=settings.account_deletion.claim_timeout,
+)
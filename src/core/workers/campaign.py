@@ -0,0 +1,359 @@
+import asyncio
+import logging
+from datetime import timedelta
+from textwrap import dedent
+import aiosmtplib
+from sqlalchemy import select, update, or_, func, bindparam
+
+from core.config import settings
+from core.database import db_helper
+from core.database.models import EmailCampaign, User
+from core.jinja.bulk_render import render_many
+from core.mailing import build_message, smtp_pool
+from utilities.now import get_now_timezone_date
+
+logger = logging.getLogger(__name__)
+
+
+CAMPAIGN_RECIPIENTS = (User.is_verified == True) & (User.is_active == True)
+
+# next chunk after the checkpoint (keyset on users.id), one short query each
+_RECIPIENTS_CHUNK = (
+    select(User.id, User.email, User.username)
+    .where(CAMPAIGN_RECIPIENTS, User.id > bindparam("last_user_id"))
+    .order_by(User.id)
+    .limit(bindparam("chunk_size"))
+)
+
+# take the campaign unless another process is running it
+_CLAIM = (
+    update(EmailCampaign)
+    .where(
+        EmailCampaign.id == bindparam("campaign_id"),
+        EmailCampaign.status == "running",
+        or_(
+            EmailCampaign.heartbeat_at.is_(None),
+            EmailCampaign.heartbeat_at < bindparam("stale_before"),
+        ),
+    )
+    .values(
+        heartbeat_at=bindparam("now"),
+        started_at=func.coalesce(EmailCampaign.started_at, bindparam("now")),
+    )
+    .returning(
+        EmailCampaign.subject,
+        EmailCampaign.message,
+        EmailCampaign.last_user_id,
+    )
+)
+
+# progress after every chunk, returns status so a pause is noticed
+_CHECKPOINT = (
+    update(EmailCampaign)
+    .where(EmailCampaign.id == bindparam("campaign_id"))
+    .values(
+        last_user_id=bindparam("last_user_id"),
+        sent_count=EmailCampaign.sent_count + bindparam("sent"),
+        failed_count=EmailCampaign.failed_count + bindparam("failed"),
+        heartbeat_at=bindparam("now"),
+    )
+    .returning(EmailCampaign.status)
+)
+
+_RELEASE = (
+    update(EmailCampaign)
+    .where(EmailCampaign.id == bindparam("campaign_id"))
+    .values(heartbeat_at=None)
+)
+
+_FINISH = (
+    update(EmailCampaign)
+    .where(
+        EmailCampaign.id == bindparam("campaign_id"),
+        EmailCampaign.status == "running",
+    )
+    .values(
+        status=bindparam("status"),
+        last_error=bindparam("last_error"),
+        finished_at=bindparam("now"),
+        heartbeat_at=None,
+    )
+)
+
+# SMTP server unreachable: stop sending until an admin resumes
+_PAUSE = (
+    update(EmailCampaign)
+    .where(
+        EmailCampaign.id == bindparam("campaign_id"),
+        EmailCampaign.status == "running",
+    )
+    .values(status="paused", last_error=bindparam("last_error"), heartbeat_at=None)
+)
+
+_RUNNING = select(EmailCampaign.id).where(EmailCampaign.status == "running")
+
+
+class CampaignRunner:
+    """
+    Sends a campaign to all active and verified users.
+    Recipients are read chunk by chunk in users.id order (keyset, a short
+    query per chunk, no long-lived snapshot), rendered per chunk, paced
+    to rate_per_second over the SMTP pool, and the last processed id
+    is stored after every chunk, so a paused, failed or interrupted
+    campaign resumes where it stopped. Memory use depends on chunk_size only.
+    Rejected recipients count as failed; a lost SMTP connection
+    pauses the campaign before the first unsent recipient.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        rate_per_second: float = 20,
+        claim_timeout: float = 300,
+    ):
+        self.chunk_size = chunk_size
+        self.rate_per_second = rate_per_second
+        self.claim_timeout = claim_timeout
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    def start(self, campaign_id: int) -> None:
+        if campaign_id in self._tasks or self._stopping:
+            return
+        task = asyncio.create_task(self._run(campaign_id))
+        self._tasks[campaign_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(campaign_id, None))
+
+    def resume_unfinished(self) -> None:
+        """
+        Pick up campaigns left running by a restart (in the background)
+        """
+        asyncio.create_task(self._resume_unfinished())
+
+    async def _resume_unfinished(self) -> None:
+        try:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(_RUNNING)
+                campaign_ids = result.scalars().all()
+        except Exception as e:
+            logger.error("Failed to resume email campaigns: %s", e)
+            return
+
+        for campaign_id in campaign_ids:
+            self.start(campaign_id)
+
+    async def stop(self) -> None:
+        """
+        Let every campaign finish the sends in flight and store
+        its progress; it stays running and resumes on next startup
+        """
+        self._stopping = True
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def _plain_content(self, username: str, message: str) -> str:
+        return dedent(
+            """\
+            Dear {username},
+
+            {message}
+
+            Your site admin,
+            ©️ 2025.
+            """
+        ).format(username=username, message=message)
+
+    async def _send_chunk(
+        self,
+        rows,
+        subject: str,
+        message: str,
+    ) -> tuple[int, int, int, Exception | None]:
+        """
+        Send one chunk paced to rate_per_second
+        Return (processed, sent, failed, connection error); processed
+        rows are the prefix of the chunk before the first unsent one,
+        the rest is left for resume
+        """
+        html_contents = await render_many(
+            "mailing/campaign.html",
+            (
+                {"user": row, "subject": subject, "message": message}
+                for row in rows
+            ),
+        )
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        interval = 1 / self.rate_per_second
+        outage: list[Exception] = []
+
+        async def send(i: int, row, html_content: str) -> bool | None:
+            await asyncio.sleep(max(0.0, start + i * interval - loop.time()))
+            if self._stopping or outage:
+                return None
+            try:
+                await smtp_pool.send(
+                    build_message(
+                        recipient=row.email,
+                        subject=subject,
+                        plain_content=self._plain_content(row.username, message),
+                        html_content=html_content,
+                    )
+                )
+            except OSError as e:
+                # connect error, disconnect, timeout: not the recipient's fault
+                logger.error("Campaign SMTP connection failed: %s", e)
+                outage.append(e)
+                return None
+            except aiosmtplib.SMTPException as e:
+                logger.error("Campaign email to %r failed: %s", row.email, e)
+                return False
+            return True
+
+        results = await asyncio.gather(
+            *(send(i, row, html) for i, (row, html) in enumerate(zip(rows, html_contents)))
+        )
+        if None in results:
+            # rows after the first unsent one go again on resume
+            results = results[: results.index(None)]
+        return (
+            len(results),
+            results.count(True),
+            results.count(False),
+            outage[0] if outage else None,
+        )
+
+    async def _run(self, campaign_id: int) -> None:
+        NOW = get_now_timezone_date()
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                _CLAIM,
+                {
+                    "campaign_id": campaign_id,
+                    "now": NOW,
+                    "stale_before": NOW - timedelta(seconds=self.claim_timeout),
+                },
+            )
+            campaign = result.first()
+            await session.commit()
+
+        if campaign is None:
+            # finished, paused or owned by another process
+            return
+
+        logger.info(
+            """
+            Email campaign %r started after user_id %r
+            """,
+            campaign_id,
+            campaign.last_user_id,
+        )
+
+        try:
+            status = "running"
+            last_user_id = campaign.last_user_id
+            while True:
+                async with db_helper.session_factory(
+                    bind=db_helper.read_engine()
+                ) as read_session:
+                    result = await read_session.execute(
+                        _RECIPIENTS_CHUNK,
+                        {"last_user_id": last_user_id, "chunk_size": self.chunk_size},
+                    )
+                    rows = result.all()
+                if not rows:
+                    break
+
+                processed, sent, failed, outage = await self._send_chunk(
+                    rows, campaign.subject, campaign.message
+                )
+                if processed:
+                    last_user_id = rows[processed - 1].id
+                    async with db_helper.session_factory() as session:
+                        checkpoint = await session.execute(
+                            _CHECKPOINT,
+                            {
+                                "campaign_id": campaign_id,
+                                "last_user_id": last_user_id,
+                                "sent": sent,
+                                "failed": failed,
+                                "now": get_now_timezone_date(),
+                            },
+                        )
+                        status = checkpoint.scalar_one()
+                        await session.commit()
+
+                if outage is not None:
+                    await self._pause(campaign_id, f"SMTP unavailable: {outage}"[:1000])
+                    logger.warning(
+                        """
+                        Email campaign %r paused after user_id %r: %s
+                        """,
+                        campaign_id,
+                        last_user_id,
+                        outage,
+                    )
+                    return
+
+                if self._stopping or status != "running" or len(rows) < self.chunk_size:
+                    break
+
+            if self._stopping or status != "running":
+                await self._release(campaign_id)
+            else:
+                await self._finish(campaign_id, "completed")
+                logger.info(
+                    """
+                    Email campaign %r completed
+                    """,
+                    campaign_id,
+                )
+        except Exception as e:
+            logger.error("Email campaign %r failed: %s", campaign_id, e)
+            await self._finish(campaign_id, "failed", last_error=str(e)[:1000])
+
+    async def _pause(self, campaign_id: int, last_error: str) -> None:
+        async with db_helper.session_factory() as session:
+            await session.execute(
+                _PAUSE, {"campaign_id": campaign_id, "last_error": last_error}
+            )
+            await session.commit()
+
+    async def _release(self, campaign_id: int) -> None:
+        async with db_helper.session_factory() as session:
+            await session.execute(_RELEASE, {"campaign_id": campaign_id})
+            await session.commit()
+
+    async def _finish(
+        self,
+        campaign_id: int,
+        status: str,
+        last_error: str | None = None,
+    ) -> None:
+        async with db_helper.session_factory() as session:
+            await session.execute(
+                _FINISH,
+                {
+                    "campaign_id": campaign_id,
+                    "status": status,
+                    "last_error": last_error,
+                    "now": get_now_timezone_date(),
+                },
+            )
+            await session.commit()
+
+    def stats(self) -> dict:
+        return {
+            "running": sorted(self._tasks),
+            "chunk_size": self.chunk_size,
+            "rate_per_second": self.rate_per_second,
+            "smtp_pool": smtp_pool.stats(),
+        }
+
+
+campaign_runner = CampaignRunner(
+    chunk_size=settings.campaign.chunk_size,
+    rate_per_second=settings.campaign.rate_per_second,
+    claim_timeout=settings.campaign.claim_timeout,
+)
@@ -0,0 +1,252 @@
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+import aiosmtplib
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import aliased
+
+from core.config import settings
+from core.database import db_helper
+from core.database.models import EmailOutbox
+from core.mailing import build_message, smtp_pool
+from utilities.now import get_now_timezone_date
+
+logger = logging.getLogger(__name__)
+
+
+_due = aliased(EmailOutbox)
+
+# claim a batch of due emails: bump attempts and push next_attempt_at
+# to the claim deadline, so other workers skip them and a crashed
+# worker's batch is picked up again later
+_CLAIM_BATCH = (
+    update(EmailOutbox)
+    .where(
+        EmailOutbox.id.in_(
+            select(_due.id)
+            .where(
+                _due.status == "pending",
+                _due.next_attempt_at <= bindparam("now"),
+            )
+            .order_by(_due.next_attempt_at)
+            .limit(bindparam("batch_size"))
+            .with_for_update(skip_locked=True)
+        )
+    )
+    .values(
+        attempts=EmailOutbox.attempts + 1,
+        next_attempt_at=bindparam("claim_until"),
+    )
+    .returning(
+        EmailOutbox.id,
+        EmailOutbox.recipient,
+        EmailOutbox.subject,
+        EmailOutbox.plain_content,
+        EmailOutbox.html_content,
+        EmailOutbox.attempts,
+    )
+    .execution_options(synchronize_session=False)
+)
+
+_outbox = EmailOutbox.__table__
+
+_MARK_SENT = (
+    _outbox.update()
+    .where(_outbox.c.id.in_(bindparam("ids", expanding=True)))
+    .values(status="sent", sent_at=bindparam("now"), last_error=None)
+)
+
+# executemany, one set of params per failed email
+_MARK_FAILED = (
+    _outbox.update()
+    .where(_outbox.c.id == bindparam("b_id"))
+    .values(
+        status=bindparam("b_status"),
+        next_attempt_at=bindparam("b_next_attempt_at"),
+        last_error=bindparam("b_last_error"),
+    )
+)
+
+
+class OutboxDispatcher:
+    """
+    Drains the email outbox in batches over the shared SMTP pool.
+    Failed emails are retried with exponential backoff,
+    permanent (5xx) errors and emails out of attempts are marked failed.
+    Safe to run in several processes (FOR UPDATE SKIP LOCKED).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        interval: float = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 30,
+        backoff_max: float = 3600,
+        claim_timeout: float = 300,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.claim_timeout = claim_timeout
+        self._task: asyncio.Task | None = None
+
+        self.batches = 0
+        self.sent_total = 0
+        self.retried_total = 0
+        self.failed_total = 0
+        self.last_duration = 0.0
+        self.last_run_at: datetime | None = None
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = self.backoff_base * 2 ** (attempts - 1)
+        return timedelta(seconds=min(delay, self.backoff_max))
+
+    @staticmethod
+    def _is_permanent(e: Exception) -> bool:
+        if isinstance(e, aiosmtplib.SMTPRecipientsRefused):
+            return all(500 <= r.code < 600 for r in e.recipients)
+        if isinstance(e, aiosmtplib.SMTPResponseException):
+            return 500 <= e.code < 600
+        return False
+
+    async def _send(self, row) -> Exception | None:
+        message = build_message(
+            recipient=row.recipient,
+            subject=row.subject,
+            plain_content=row.plain_content,
+            html_content=row.html_content,
+        )
+        try:
+            await smtp_pool.send(message)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            return e
+        return None
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim, send and record one batch
+        Return number of claimed emails
+        """
+        start = time.perf_counter()
+        NOW = get_now_timezone_date()
+
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                _CLAIM_BATCH,
+                {
+                    "now": NOW,
+                    "batch_size": self.batch_size,
+                    "claim_until": NOW + timedelta(seconds=self.claim_timeout),
+                },
+            )
+            rows = result.all()
+            await session.commit()
+
+        if not rows:
+            return 0
+
+        # the pool bounds how many are in flight
+        errors = await asyncio.gather(*(self._send(row) for row in rows))
+
+        sent_ids = []
+        failed = []
+        NOW = get_now_timezone_date()
+        for row, e in zip(rows, errors):
+            if e is None:
+                sent_ids.append(row.id)
+                continue
+
+            give_up = self._is_permanent(e) or row.attempts >= self.max_attempts
+            failed.append(
+                {
+                    "b_id": row.id,
+                    "b_status": "failed" if give_up else "pending",
+                    "b_next_attempt_at": NOW + self._backoff(row.attempts),
+                    "b_last_error": str(e)[:1000],
+                }
+            )
+            if give_up:
+                self.failed_total += 1
+                logger.error(
+                    "Email %r to %r failed after %r attempts: %s",
+                    row.id,
+                    row.recipient,
+                    row.attempts,
+                    e,
+                )
+            else:
+                self.retried_total += 1
+
+        async with db_helper.session_factory() as session:
+            if sent_ids:
+                await session.execute(_MARK_SENT, {"ids": sent_ids, "now": NOW})
+            if failed:
+                await session.execute(_MARK_FAILED, failed)
+            await session.commit()
+
+        self.batches += 1
+        self.sent_total += len(sent_ids)
+        self.last_duration = time.perf_counter() - start
+        self.last_run_at = NOW
+
+        logger.info(
+            """
+            Email outbox: sent %r, failed %r in %.2f s
+            """,
+            len(sent_ids),
+            len(failed),
+            self.last_duration,
+        )
+        return len(rows)
+
+    async def drain(self) -> None:
+        """
+        Send batches until no due emails are left
+        """
+        while await self.dispatch_batch() >= self.batch_size:
+            pass
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error("Email outbox dispatch failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "sent_total": self.sent_total,
+            "retried_total": self.retried_total,
+            "failed_total": self.failed_total,
+            "last_duration": round(self.last_duration, 3),
+            "last_run_at": self.last_run_at,
+            "smtp_pool": smtp_pool.stats(),
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.mail.outbox_batch_size,
+    interval=settings.mail.outbox_interval,
+    max_attempts=settings.mail.max_attempts,
+    backoff_base=settings.mail.backoff_base,
+    backoff_max=settings.mail.backoff_max,
+    claim_timeout=settings.mail.claim_timeout,
+)
@@ -0,0 +1,147 @@
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from sqlalchemy import Delete, delete, select, literal_column, bindparam
+
+from core.config import settings
+from core.database import db_helper
+from core.database.models import RefreshToken
+from utilities.now import get_now_timezone_date
+
+logger = logging.getLogger(__name__)
+
+
+_ctid = literal_column("ctid")
+
+
+def _sweep_batch(condition) -> Delete:
+    """
+    One bounded batch of tokens matching condition,
+    rows locked by a running refresh are skipped
+    """
+    return delete(RefreshToken).where(
+        _ctid.in_(
+            select(_ctid)
+            .select_from(RefreshToken)
+            .where(condition)
+            .limit(bindparam("batch_size"))
+            .with_for_update(skip_locked=True)
+        )
+    ).execution_options(synchronize_session=False)
+
+
+# two sweeps, each driven by its own index
+# (an OR of both conditions could only scan the table)
+_SWEEP_EXPIRED = _sweep_batch(RefreshToken.expires_at < bindparam("now"))
+_SWEEP_REVOKED = _sweep_batch(
+    RefreshToken.revoked_at < bindparam("revoked_before")
+)
+
+
+class RefreshTokenSweeper:
+    """
+    Deletes expired and revoked refresh tokens in small batches
+    with a pause between them, so it never holds long locks.
+    Revoked tokens are kept for revoked_retention_days
+    for refresh token reuse detection.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        pause: float = 0.5,
+        interval: float = 3600,
+        revoked_retention_days: int = 7,
+    ):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.revoked_retention_days = revoked_retention_days
+        self._task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.deleted_total = 0
+        self.last_deleted = 0
+        self.last_duration = 0.0
+        self.last_run_at: datetime | None = None
+
+    async def sweep(self) -> int:
+        """
+        Delete batches until there is nothing left
+        Return number of deleted tokens
+        """
+        start = time.perf_counter()
+        NOW = get_now_timezone_date()
+        params = {
+            "now": NOW,
+            "revoked_before": NOW - timedelta(days=self.revoked_retention_days),
+            "batch_size": self.batch_size,
+        }
+
+        deleted = 0
+        for stmt in (_SWEEP_EXPIRED, _SWEEP_REVOKED):
+            while True:
+                async with db_helper.session_factory() as session:
+                    result = await session.execute(stmt, params)
+                    await session.commit()
+
+                deleted += result.rowcount
+                if result.rowcount < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause)
+
+        self.runs += 1
+        self.deleted_total += deleted
+        self.last_deleted = deleted
+        self.last_duration = time.perf_counter() - start
+        self.last_run_at = NOW
+
+        logger.info(
+            """
+            Refresh token sweep: deleted %r tokens in %.2f s
+            """,
+            deleted,
+            self.last_duration,
+        )
+        return deleted
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error("Refresh token sweep failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "deleted_total": self.deleted_total,
+            "last_deleted": self.last_deleted,
+            "last_duration": round(self.last_duration, 3),
+            "rows_per_second": round(self.last_deleted / self.last_duration, 1)
+            if self.last_duration
+            else 0.0,
+            "last_run_at": self.last_run_at,
+        }
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    batch_size=settings.refresh_token_gc.batch_size,
+    pause=settings.refresh_token_gc.pause,
+    interval=settings.refresh_token_gc.interval,
+    revoked_retention_days=settings.refresh_token_gc.revoked_retention_days,
+)
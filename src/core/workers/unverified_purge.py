@@ -0,0 +1,173 @@
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+from sqlalchemy import delete, select, func, bindparam
+from sqlalchemy.orm import aliased
+
+from core.config import settings
+from core.database import db_helper
+from core.database.models import User
+from utilities.now import get_now_date, get_now_timezone_date
+
+logger = logging.getLogger(__name__)
+
+
+_stale = aliased(User)
+
+# unverified accounts can't log in, so they own no posts/likes/comments;
+# refresh tokens, profiles, subscriptions and notifications
+# go with them through ON DELETE CASCADE
+_PURGE_BATCH = delete(User).where(
+    User.id.in_(
+        select(_stale.id)
+        .where(
+            _stale.is_verified == False,
+            _stale.created_at < bindparam("created_before"),
+        )
+        .order_by(_stale.id)
+        .limit(bindparam("batch_size"))
+        .with_for_update(skip_locked=True)
+    )
+).execution_options(synchronize_session=False)
+
+_COUNT_STALE = select(func.count(User.id)).where(
+    User.is_verified == False,
+    User.created_at < bindparam("created_before"),
+)
+
+
+class UnverifiedUserPurger:
+    """
+    Deletes accounts that were never verified and are older
+    than N days, in bounded batches with a pause between them.
+    Dry run only counts them.
+    """
+
+    def __init__(
+        self,
+        older_than_days: int = 7,
+        batch_size: int = 500,
+        pause: float = 0.5,
+        interval: float = 86400,
+    ):
+        self.older_than_days = older_than_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self._purge_task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.deleted_total = 0
+        self.last_deleted = 0
+        self.last_duration = 0.0
+        self.last_run_at: datetime | None = None
+
+    @property
+    def is_purging(self) -> bool:
+        return self._purge_task is not None and not self._purge_task.done()
+
+    async def count(self, older_than_days: int | None = None) -> int:
+        """
+        Number of accounts the purge would delete
+        """
+        days = older_than_days or self.older_than_days
+        async with db_helper.session_factory() as session:
+            return await session.scalar(
+                _COUNT_STALE,
+                {"created_before": get_now_date(days=days)},
+            )
+
+    async def purge(self, older_than_days: int | None = None) -> int:
+        """
+        Delete batches until there is nothing left
+        Return number of deleted users
+        """
+        start = time.perf_counter()
+        NOW = get_now_timezone_date()
+        days = older_than_days or self.older_than_days
+        params = {
+            # same clock as users.created_at and the admin listing
+            "created_before": get_now_date(days=days),
+            "batch_size": self.batch_size,
+        }
+
+        deleted = 0
+        while True:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(_PURGE_BATCH, params)
+                await session.commit()
+
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        self.runs += 1
+        self.deleted_total += deleted
+        self.last_deleted = deleted
+        self.last_duration = time.perf_counter() - start
+        self.last_run_at = NOW
+
+        logger.info(
+            """
+            Unverified users purge: deleted %r users older than %r days in %.2f s
+            """,
+            deleted,
+            days,
+            self.last_duration,
+        )
+        return deleted
+
+    def purge_in_background(self, older_than_days: int | None = None) -> bool:
+        """
+        Start one purge unless one is already running
+        """
+        if self.is_purging:
+            return False
+        self._purge_task = asyncio.create_task(self.purge(older_than_days))
+        return True
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception as e:
+                logger.error("Unverified users purge failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._purge_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._task = None
+        self._purge_task = None
+
+    def stats(self) -> dict:
+        return {
+            "is_purging": self.is_purging,
+            "runs": self.runs,
+            "deleted_total": self.deleted_total,
+            "last_deleted": self.last_deleted,
+            "last_duration": round(self.last_duration, 3),
+            "rows_per_second": round(self.last_deleted / self.last_duration, 1)
+            if self.last_duration
+            else 0.0,
+            "last_run_at": self.last_run_at,
+        }
+
+
+unverified_user_purger = UnverifiedUserPurger(
+    older_than_days=settings.unverified_purge.older_than_days,
+    batch_size=settings.unverified_purge.batch_size,
+    pause=settings.unverified_purge.pause,
+    interval=settings.unverified_purge.interval,
+)
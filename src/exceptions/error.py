@@ -37,4 +37,9 @@ class DataBaseError(AppExecption):
         
 class InternalServerError(AppExecption):
     def __init__(self, detail):
-        super().__init__(500, detail)
\ No newline at end of file
+        super().__init__(500, detail)
+
+
+class ExternalServiceError(AppExecption):
+    def __init__(self, detail):
+        super().__init__(502, detail)
\ No newline at end of file
@@ -2,6 +2,8 @@ import uvicorn
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from core.config import settings
+from core.ratelimit import RateLimitMiddleware
 from core.database import lifespan
 from api import router as api_router
 from api.views import router as views_router
@@ -11,6 +13,19 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(lifespan=lifespan)
 
+# the last added middleware is the outermost:
+# CORS wraps the rate limiter, so 429 responses carry CORS headers
+if settings.rate_limit.enabled:
+    auth_prefix = settings.api.prefix + settings.api.auth
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules={
+            auth_prefix + path: rule
+            for path, rule in settings.rate_limit.auth_routes.items()
+        },
+        trust_forwarded_for=settings.rate_limit.trust_forwarded_for,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -0,0 +1,83 @@
+"""Hash refresh tokens and group them into families
+
+Revision ID: 5f1c2a9e7b34
+Revises: d6d98bc1f201
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f1c2a9e7b34"
+down_revision: Union[str, Sequence[str], None] = "d6d98bc1f201"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.CHAR(length=64), nullable=True),
+    )
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("family_id", sa.Uuid(), nullable=True),
+    )
+
+    # existing tokens stay valid: they are looked up by their digest
+    op.execute(
+        """
+        UPDATE refresh_tokens
+        SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex'),
+            family_id = gen_random_uuid()
+        """
+    )
+
+    op.alter_column("refresh_tokens", "token_hash", nullable=False)
+    op.alter_column("refresh_tokens", "family_id", nullable=False)
+
+    op.drop_index(op.f("ix_refresh_tokens_token"), table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "token")
+
+    op.create_unique_constraint(
+        op.f("refresh_tokens_token_hash_key"),
+        "refresh_tokens",
+        ["token_hash"],
+    )
+    op.create_index(
+        "ix_refresh_tokens_user_family",
+        "refresh_tokens",
+        ["user_id", "family_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # plain tokens cannot be restored from digests
+    op.execute("DELETE FROM refresh_tokens")
+
+    op.drop_index("ix_refresh_tokens_user_family", table_name="refresh_tokens")
+    op.drop_constraint(
+        op.f("refresh_tokens_token_hash_key"),
+        "refresh_tokens",
+        type_="unique",
+    )
+    op.drop_column("refresh_tokens", "family_id")
+    op.drop_column("refresh_tokens", "token_hash")
+
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("token", sa.String(length=500), nullable=False),
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_token"),
+        "refresh_tokens",
+        ["token"],
+        unique=True,
+    )
@@ -0,0 +1,32 @@
+"""Add tokens_valid_after to User
+
+Revision ID: 8d3e6b0f4a21
+Revises: 5f1c2a9e7b34
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3e6b0f4a21"
+down_revision: Union[str, Sequence[str], None] = "5f1c2a9e7b34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("tokens_valid_after", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "tokens_valid_after")
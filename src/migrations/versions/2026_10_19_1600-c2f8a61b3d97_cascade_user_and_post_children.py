@@ -0,0 +1,89 @@
+"""Cascade deletes of user and post children in the database
+
+Revision ID: c2f8a61b3d97
+Revises: 9a4c1e7d2b60
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f8a61b3d97"
+down_revision: Union[str, Sequence[str], None] = "9a4c1e7d2b60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, referred table)
+FOREIGN_KEYS = (
+    ("posts", "user_id", "users"),
+    ("likes", "user_id", "users"),
+    ("likes", "post_id", "posts"),
+    ("comments", "user_id", "users"),
+    ("comments", "post_id", "posts"),
+    ("comment_likes", "user_id", "users"),
+)
+
+# referencing columns not covered by another index,
+# without them every cascaded delete scans the child table
+INDEXES = (
+    ("posts", "user_id"),
+    ("likes", "post_id"),
+    ("comments", "user_id"),
+    ("comments", "post_id"),
+    ("comment_likes", "comment_id"),
+    ("notifications", "user_id"),
+    ("notifications", "action_by_id"),
+    ("subscriptions", "following_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(
+            op.f(f"{table}_{column}_fkey"),
+            table,
+            type_="foreignkey",
+        )
+        op.create_foreign_key(
+            op.f(f"{table}_{column}_fkey"),
+            table,
+            referred,
+            [column],
+            ["id"],
+            ondelete="CASCADE",
+        )
+
+    for table, column in INDEXES:
+        op.create_index(
+            op.f(f"ix_{table}_{column}"),
+            table,
+            [column],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in INDEXES:
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
+
+    for table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(
+            op.f(f"{table}_{column}_fkey"),
+            table,
+            type_="foreignkey",
+        )
+        op.create_foreign_key(
+            op.f(f"{table}_{column}_fkey"),
+            table,
+            referred,
+            [column],
+            ["id"],
+        )
@@ -0,0 +1,105 @@
+"""Move post tags to the tags table
+
+Revision ID: 4e8a2c6f1d35
+Revises: 7d1e4f2a9b53
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8a2c6f1d35"
+down_revision: Union[str, Sequence[str], None] = "7d1e4f2a9b53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# utilities.tags.normalize_tag in SQL
+NORMALIZED_TAG = (
+    "lower(btrim(regexp_replace(ltrim(btrim(posts.tag), '#'), '\\s+', ' ', 'g')))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column(
+            "post_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    # names that differ only in case, '#' or spaces become one tag;
+    # a name that is empty once normalised ('#', spaces) is no tag,
+    # its posts are left without one (tag_id NULL)
+    op.execute(
+        f"""
+        INSERT INTO tags (name, post_count)
+        SELECT {NORMALIZED_TAG}, count(*) FILTER (WHERE posts.is_published)
+        FROM posts
+        WHERE {NORMALIZED_TAG} <> ''
+        GROUP BY 1
+        """
+    )
+    op.create_index(
+        "ix_tags_name_pattern",
+        "tags",
+        ["name"],
+        unique=False,
+        postgresql_ops={"name": "text_pattern_ops"},
+    )
+    op.create_index(
+        "ix_tags_post_count",
+        "tags",
+        [sa.text("post_count DESC"), "id"],
+        unique=False,
+    )
+
+    op.add_column("posts", sa.Column("tag_id", sa.Integer(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE posts SET tag_id = tags.id
+        FROM tags
+        WHERE tags.name = {NORMALIZED_TAG}
+        """
+    )
+    op.create_foreign_key(
+        "posts_tag_id_fkey", "posts", "tags", ["tag_id"], ["id"]
+    )
+    op.create_index(
+        "ix_posts_tag_id_created_at",
+        "posts",
+        ["tag_id", "created_at"],
+        unique=False,
+    )
+    op.drop_column("posts", "tag")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "posts", sa.Column("tag", sa.String(length=100), nullable=True)
+    )
+    op.execute(
+        """
+        UPDATE posts SET tag = tags.name
+        FROM tags
+        WHERE tags.id = posts.tag_id
+        """
+    )
+    op.execute("UPDATE posts SET tag = '' WHERE tag IS NULL")
+    op.alter_column("posts", "tag", nullable=False)
+    op.drop_index("ix_posts_tag_id_created_at", table_name="posts")
+    op.drop_constraint("posts_tag_id_fkey", "posts", type_="foreignkey")
+    op.drop_column("posts", "tag_id")
+    op.drop_index("ix_tags_post_count", table_name="tags")
+    op.drop_index("ix_tags_name_pattern", table_name="tags")
+    op.drop_table("tags")
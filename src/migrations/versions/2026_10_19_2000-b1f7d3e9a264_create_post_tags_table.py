@@ -0,0 +1,85 @@
+"""Create post_tags table, posts get several tags
+
+Revision ID: b1f7d3e9a264
+Revises: 4e8a2c6f1d35
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b1f7d3e9a264"
+down_revision: Union[str, Sequence[str], None] = "4e8a2c6f1d35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "post_tags",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"]),
+        sa.PrimaryKeyConstraint("post_id", "tag_id"),
+    )
+    # one tag per post so far (or none), tag counters stay as they are
+    op.execute(
+        """
+        INSERT INTO post_tags (post_id, tag_id)
+        SELECT id, tag_id FROM posts
+        WHERE tag_id IS NOT NULL
+        """
+    )
+    op.create_index(
+        "ix_post_tags_tag_id_post_id",
+        "post_tags",
+        ["tag_id", "post_id"],
+        unique=False,
+    )
+
+    op.drop_index("ix_posts_tag_id_created_at", table_name="posts")
+    op.drop_constraint("posts_tag_id_fkey", "posts", type_="foreignkey")
+    op.drop_column("posts", "tag_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # posts keep only their first tag, untagged posts none
+    op.add_column("posts", sa.Column("tag_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE posts SET tag_id = first_tag.tag_id
+        FROM (
+            SELECT post_id, min(tag_id) AS tag_id
+            FROM post_tags
+            GROUP BY post_id
+        ) AS first_tag
+        WHERE first_tag.post_id = posts.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE tags SET post_count = (
+            SELECT count(*) FROM posts
+            WHERE posts.tag_id = tags.id AND posts.is_published
+        )
+        """
+    )
+    op.create_foreign_key(
+        "posts_tag_id_fkey", "posts", "tags", ["tag_id"], ["id"]
+    )
+    op.create_index(
+        "ix_posts_tag_id_created_at",
+        "posts",
+        ["tag_id", "created_at"],
+        unique=False,
+    )
+    op.drop_index("ix_post_tags_tag_id_post_id", table_name="post_tags")
+    op.drop_table("post_tags")
@@ -0,0 +1,62 @@
+"""Make user email and username unique case-insensitively
+
+Revision ID: 6c2d8f4b1a97
+Revises: b1f7d3e9a264
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6c2d8f4b1a97"
+down_revision: Union[str, Sequence[str], None] = "b1f7d3e9a264"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # accounts differing only in letter case can't be merged automatically
+    for column in ("email", "username"):
+        duplicates = op.get_bind().execute(
+            sa.text(
+                f"SELECT count(*) FROM ("
+                f"SELECT lower({column}) FROM users "
+                f"GROUP BY 1 HAVING count(*) > 1) AS duplicates"
+            )
+        ).scalar()
+        if duplicates:
+            raise RuntimeError(
+                f"{duplicates} users.{column} values differ only in letter case, "
+                "resolve them before upgrading"
+            )
+
+    op.create_index(
+        "ix_users_email_lower",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+    op.create_index(
+        "ix_users_username_lower",
+        "users",
+        [sa.text("lower(username)")],
+        unique=True,
+    )
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_users_username"), "users", ["username"], unique=True
+    )
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.drop_index("ix_users_username_lower", table_name="users")
+    op.drop_index("ix_users_email_lower", table_name="users")
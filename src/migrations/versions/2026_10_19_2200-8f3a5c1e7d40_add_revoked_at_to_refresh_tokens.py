@@ -0,0 +1,39 @@
+"""Add revoked_at to refresh tokens
+
+Revision ID: 8f3a5c1e7d40
+Revises: 6c2d8f4b1a97
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3a5c1e7d40"
+down_revision: Union[str, Sequence[str], None] = "6c2d8f4b1a97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens", sa.Column("revoked_at", sa.DateTime(), nullable=True)
+    )
+    # revocation time of existing tokens is unknown:
+    # keep them for the full retention period from now
+    op.execute(
+        """
+        UPDATE refresh_tokens SET revoked_at = now() AT TIME ZONE 'utc'
+        WHERE is_revoked
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("refresh_tokens", "revoked_at")
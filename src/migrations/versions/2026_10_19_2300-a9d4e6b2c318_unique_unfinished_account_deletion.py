@@ -0,0 +1,50 @@
+"""Unique unfinished account deletion per user
+
+Revision ID: a9d4e6b2c318
+Revises: 8f3a5c1e7d40
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d4e6b2c318"
+down_revision: Union[str, Sequence[str], None] = "8f3a5c1e7d40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # duplicates left by concurrent delete requests: keep the oldest job
+    op.execute(
+        """
+        UPDATE account_deletions d SET status = 'cancelled'
+        WHERE d.status NOT IN ('completed', 'cancelled')
+          AND EXISTS (
+            SELECT 1 FROM account_deletions o
+            WHERE o.user_id = d.user_id
+              AND o.status NOT IN ('completed', 'cancelled')
+              AND o.id < d.id
+          )
+        """
+    )
+    op.create_index(
+        "uq_account_deletions_user_id_unfinished",
+        "account_deletions",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("status NOT IN ('completed', 'cancelled')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "uq_account_deletions_user_id_unfinished", table_name="account_deletions"
+    )
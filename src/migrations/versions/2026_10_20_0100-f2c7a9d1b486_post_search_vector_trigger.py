@@ -0,0 +1,73 @@
+"""Maintain post search vector by trigger
+
+Revision ID: f2c7a9d1b486
+Revises: d5b8e1f3c742
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c7a9d1b486"
+down_revision: Union[str, Sequence[str], None] = "d5b8e1f3c742"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keeps the stored values and the GIN index, no table rewrite
+    op.execute("ALTER TABLE posts ALTER COLUMN search_vector DROP EXPRESSION")
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION posts_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER posts_search_vector
+        BEFORE INSERT OR UPDATE OF title, content ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_search_vector_update()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER posts_search_vector ON posts")
+    op.execute("DROP FUNCTION posts_search_vector_update()")
+    op.drop_index("ix_posts_search_vector", table_name="posts")
+    op.drop_column("posts", "search_vector")
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR.format(row=""), persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_posts_search_vector",
+        "posts",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
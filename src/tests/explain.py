@@ -0,0 +1,17 @@
+from sqlalchemy import text
+
+
+async def explain(engine, stmt, params: dict) -> str:
+    """
+    Plan of a statement built with bindparams
+    """
+    async with engine.connect() as conn:
+        # an empty table is cheaper to scan: show that the index can be used
+        await conn.execute(text("SET enable_seqscan = off"))
+        compiled = stmt.compile(dialect=conn.dialect)
+        values = compiled.construct_params(params)
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN {compiled}",
+            tuple(values[name] for name in compiled.positiontup),
+        )
+        return "\n".join(result.scalars())
@@ -0,0 +1,85 @@
+import asyncio
+
+from aiohttp import web
+
+# access token (the code it was exchanged for) -> GitHub /user
+GITHUB_USERS = {
+    "octocat": {"id": 1, "login": "octocat", "email": None},
+    "Octocat": {"id": 2, "login": "Octocat", "email": "second@example.com"},
+    "broken-emails": {"id": 3, "login": "hubot", "email": "hubot@example.com"},
+    "long-login": {
+        "id": 123456789,
+        "login": "a-very-long-github-login-of-39-chars-xx",
+        "email": "long@example.com",
+    },
+}
+
+
+class FakeGithub:
+    """
+    Local GitHub OAuth and API endpoints: the token endpoint returns
+    the code as the access token, /user answers from GITHUB_USERS.
+    Records the client connections it has seen.
+    """
+
+    def __init__(self, delay: float = 0):
+        # per API call (/user, /user/emails), like a remote server
+        self.delay = delay
+        self.connections = set()
+        # /user answers 503 this many times first
+        self.user_failures = 0
+        self.users = dict(GITHUB_USERS)
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    async def _token(self, request):
+        self.connections.add(request.transport)
+        data = await request.json()
+        return web.json_response({"access_token": data["code"]})
+
+    @staticmethod
+    def _access_token(request) -> str:
+        return request.headers["Authorization"].removeprefix("Bearer ")
+
+    async def _user(self, request):
+        self.connections.add(request.transport)
+        await asyncio.sleep(self.delay)
+        if self.user_failures:
+            self.user_failures -= 1
+            return web.json_response({"message": "unavailable"}, status=503)
+        return web.json_response(self.users[self._access_token(request)])
+
+    async def _emails(self, request):
+        self.connections.add(request.transport)
+        await asyncio.sleep(self.delay)
+        access_token = self._access_token(request)
+        if access_token == "broken-emails":
+            # the connection drops before any response
+            request.transport.close()
+            return web.Response()
+        login = self.users[access_token]["login"]
+        return web.json_response(
+            [
+                {"email": f"{login}@users.example.com", "primary": False},
+                {"email": f"{login}@example.com", "primary": True},
+            ]
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/login/oauth/access_token", self._token),
+                web.get("/user", self._user),
+                web.get("/user/emails", self._emails),
+            ]
+        )
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
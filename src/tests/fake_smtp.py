@@ -0,0 +1,88 @@
+import asyncio
+
+
+class FakeSMTP:
+    """
+    Local SMTP server: accepts every message unless its recipient
+    is in `rejects` (recipient -> reply to RCPT TO).
+    Records the delivered messages and the connections it has seen.
+    """
+
+    def __init__(self, delay: float = 0, record: bool = True):
+        # before every reply, like a remote server
+        self.delay = delay
+        # keep the messages, or only count them
+        self.record = record
+        self.rejects: dict[str, str] = {}
+        self.messages: list[tuple[str, list[str], bytes]] = []
+        self.delivered = 0
+        self.connections = 0
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.Server | None = None
+        self.port = 0
+
+    async def _reply(self, writer: asyncio.StreamWriter, reply: str) -> None:
+        await asyncio.sleep(self.delay)
+        writer.write(reply.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        mail_from, rcpts = "", []
+        try:
+            await self._reply(writer, "220 fake ESMTP")
+            while line := await reader.readline():
+                command = line.decode().strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    await self._reply(writer, "250 fake")
+                elif verb == "MAIL":
+                    mail_from, rcpts = command[10:].strip("<>"), []
+                    await self._reply(writer, "250 OK")
+                elif verb == "RCPT":
+                    recipient = command[8:].strip("<>")
+                    if recipient in self.rejects:
+                        await self._reply(writer, self.rejects[recipient])
+                        continue
+                    rcpts.append(recipient)
+                    await self._reply(writer, "250 OK")
+                elif verb == "DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    data = b""
+                    while (line := await reader.readline()) != b".\r\n":
+                        data += line
+                    self.delivered += 1
+                    if self.record:
+                        self.messages.append((mail_from, rcpts, data))
+                    await self._reply(writer, "250 OK")
+                elif verb == "QUIT":
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "250 OK")
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def drop_connections(self) -> None:
+        """
+        Close every open connection, like a server timing out idle clients
+        """
+        for writer in list(self._writers):
+            writer.close()
+
+    @property
+    def recipients(self) -> list[str]:
+        return [rcpt for _, rcpts, _ in self.messages for rcpt in rcpts]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.drop_connections()
+        self._server.close()
+        await self._server.wait_closed()
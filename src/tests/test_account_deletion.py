@@ -0,0 +1,133 @@
+import asyncio
+
+from fastapi import BackgroundTasks
+from sqlalchemy import func, select
+
+from core.database.models import (
+    AccountDeletion,
+    Comment,
+    CommentLike,
+    Like,
+    Post,
+    Tag,
+    User,
+)
+from core.services.admin import AdminService
+from core.services.PLC import PostLikeCommentService
+from core.workers import AccountDeletionWorker
+
+
+async def seed(sessions, make_user) -> tuple[User, User, int]:
+    """
+    The reader likes and comments the author's post and likes the
+    author's comment; the author likes the reader's post, both tag
+    their posts with "shared". Return author, reader, author's post id
+    """
+    author = await make_user(email="author@example.com", username="author")
+    reader = await make_user(email="reader@example.com", username="reader")
+    async with sessions() as session:
+        service = PostLikeCommentService(session, background_task=BackgroundTasks())
+        post = await service.create_post(
+            user_id=author.id, title="Title", content="Content", tags=["shared"]
+        )
+        comment = await service.create_comment(
+            user_id=author.id, post_id=post.id, content="Comment"
+        )
+        for n in range(3):
+            await service.create_comment(
+                user_id=reader.id, post_id=post.id, content=f"Reply {n}"
+            )
+        await service.like_post(user_id=reader.id, post_id=post.id)
+        await service.like_comment(user_id=reader.id, comment_id=comment.id)
+
+        own = await service.create_post(
+            user_id=reader.id, title="Own", content="Own", tags=["shared", "own"]
+        )
+        await service.like_post(user_id=author.id, post_id=own.id)
+    return author, reader, post.id
+
+
+async def delete_user(sessions, user_id: int) -> AccountDeletion:
+    async with sessions() as session:
+        return await AdminService(session).delete_user(user_id)
+
+
+async def get_job(sessions, job_id: int) -> AccountDeletion:
+    async with sessions() as session:
+        return await session.get(AccountDeletion, job_id)
+
+
+async def test_deletion_removes_content_and_fixes_counters(
+    sessions, app_db, make_user
+):
+    author, reader, post_id = await seed(sessions, make_user)
+    async with sessions() as session:
+        updated_at = (await session.get(Post, post_id)).updated_at
+
+    job = await delete_user(sessions, reader.id)
+    # chunks of one row: every stage runs several transactions
+    worker = AccountDeletionWorker(batch_size=1, pause=0)
+    await worker.run_pending()
+
+    job = await get_job(sessions, job.id)
+    assert job.status == "completed"
+    # 1 like, 1 comment like, 3 comments, 2 tag links, 1 post
+    assert job.rows_deleted == 8
+    assert worker.stats()["jobs_completed"] == 1
+
+    async with sessions() as session:
+        assert await session.get(User, reader.id) is None
+        post = await session.get(Post, post_id)
+        assert (post.like_count, post.comment_count) == (0, 1)
+        assert post.updated_at == updated_at
+        comment = await session.scalar(select(Comment))
+        assert comment.like_count == 0
+        tags = dict((await session.execute(select(Tag.name, Tag.post_count))).all())
+        assert tags == {"shared": 1, "own": 0}
+        for model in (Like, CommentLike):
+            assert await session.scalar(select(func.count()).select_from(model)) == 0
+        assert await session.scalar(select(func.count()).select_from(Post)) == 1
+
+
+async def test_repeated_delete_reuses_job(sessions, app_db, make_user):
+    user = await make_user()
+
+    jobs = await asyncio.gather(*(delete_user(sessions, user.id) for _ in range(5)))
+
+    assert len({job.id for job in jobs}) == 1
+    async with sessions() as session:
+        assert await session.scalar(select(func.count(AccountDeletion.id))) == 1
+
+
+async def test_reactivation_cancels_deletion(sessions, app_db, make_user):
+    _, reader, _ = await seed(sessions, make_user)
+    job = await delete_user(sessions, reader.id)
+
+    async with sessions() as session:
+        await AdminService(session).reactivate_user(reader.id)
+    await AccountDeletionWorker(pause=0).run_pending()
+
+    assert (await get_job(sessions, job.id)).status == "cancelled"
+    async with sessions() as session:
+        assert (await session.get(User, reader.id)).is_active
+        assert await session.scalar(select(func.count()).select_from(Like)) == 2
+
+
+async def test_reactivation_stops_running_job(sessions, app_db, make_user):
+    _, reader, _ = await seed(sessions, make_user)
+    job = await delete_user(sessions, reader.id)
+
+    worker = AccountDeletionWorker(batch_size=1, pause=0.05)
+    running = asyncio.create_task(worker.run_pending())
+    while not (await get_job(sessions, job.id)).rows_deleted:
+        await asyncio.sleep(0.01)
+    async with sessions() as session:
+        await AdminService(session).reactivate_user(reader.id)
+    await running
+
+    job = await get_job(sessions, job.id)
+    assert job.status == "cancelled"
+    assert 0 < job.rows_deleted < 8
+    assert worker.stats()["jobs_cancelled"] == 1
+    async with sessions() as session:
+        assert (await session.get(User, reader.id)).is_active
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from core.database.models import User
+from core.services.admin import USER_LISTING_FIELDS, AdminService
+from utilities.streaming import csv_chunks, ndjson_chunks
+
+USERS = 23
+
+
+async def make_users(sessions) -> list[int]:
+    """
+    USERS active and verified users and one unverified,
+    return ids of the verified ones
+    """
+    async with sessions() as session:
+        result = await session.execute(
+            insert(User).returning(User.id, User.is_verified),
+            [
+                {
+                    "email": f"user{n}@example.com",
+                    "username": f"user{n}",
+                    "hashed_password": "hashed",
+                    "is_active": True,
+                    "is_verified": n < USERS,
+                    "is_superuser": False,
+                }
+                for n in range(USERS + 1)
+            ],
+        )
+        ids = [row.id for row in result if row.is_verified]
+        await session.commit()
+    return ids
+
+
+async def collect(chunks) -> list:
+    return [chunk async for chunk in chunks]
+
+
+async def test_keyset_pages_list_every_user_once(sessions):
+    ids = await make_users(sessions)
+
+    listed, pages, after_id = [], 0, 0
+    async with sessions() as session:
+        service = AdminService(session)
+        while after_id is not None:
+            page = await service.get_all_active_and_verified_users(
+                after_id=after_id, limit=10
+            )
+            listed += page["users"]
+            after_id = page["next_after_id"]
+            pages += 1
+
+    assert [user["id"] for user in listed] == ids
+    assert pages == 3
+    assert all(list(user) == USER_LISTING_FIELDS for user in listed)
+    assert "hashed_password" not in USER_LISTING_FIELDS
+
+
+async def test_stream_yields_chunks(sessions, monkeypatch):
+    ids = await make_users(sessions)
+    monkeypatch.setattr("core.services.admin._STREAM_YIELD_PER", 10)
+
+    async with sessions() as session:
+        chunks = await collect(
+            AdminService(session).stream_all_active_and_verified_users()
+        )
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert [user["id"] for chunk in chunks for user in chunk] == ids
+
+
+async def test_ndjson_and_csv_bodies():
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+    rows = [
+        {"id": n, "username": f"user{n}", "created_at": created_at} for n in range(3)
+    ]
+
+    async def chunks(*parts):
+        for part in parts:
+            yield part
+
+    ndjson = await collect(ndjson_chunks(chunks(rows[:2], rows[2:])))
+    assert len(ndjson) == 2
+    lines = "".join(ndjson).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [0, 1, 2]
+    assert json.loads(lines[0])["created_at"] == "2026-01-02T03:04:05"
+
+    fields = ["id", "username", "created_at"]
+    body = "".join(await collect(csv_chunks(chunks(rows[:2], rows[2:]), fields)))
+    parsed = list(csv.DictReader(io.StringIO(body)))
+    assert [row["username"] for row in parsed] == ["user0", "user1", "user2"]
+
+    empty = await collect(csv_chunks(chunks(), fields))
+    assert empty == ["id,username,created_at\r\n"]
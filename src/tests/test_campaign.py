@@ -0,0 +1,173 @@
+import asyncio
+import email
+from collections import Counter
+
+from sqlalchemy import insert
+
+from core.database.models import EmailCampaign, User
+from core.services.campaign import CampaignService
+from core.workers import CampaignRunner
+
+RECIPIENTS = 25
+
+
+async def make_recipients(sessions) -> list[str]:
+    """
+    RECIPIENTS active and verified users, plus two who get nothing
+    """
+    users = [
+        {
+            "email": f"user{n}@example.com",
+            "username": f"user{n}",
+            "is_verified": True,
+            "is_active": True,
+        }
+        for n in range(RECIPIENTS)
+    ]
+    users.append(
+        {
+            "email": "unverified@example.com",
+            "username": "unverified",
+            "is_verified": False,
+            "is_active": True,
+        }
+    )
+    users.append(
+        {
+            "email": "inactive@example.com",
+            "username": "inactive",
+            "is_verified": True,
+            "is_active": False,
+        }
+    )
+    async with sessions() as session:
+        await session.execute(
+            insert(User),
+            [
+                {"hashed_password": "hashed", "is_superuser": False, **user}
+                for user in users
+            ],
+        )
+        await session.commit()
+    return [user["email"] for user in users[:RECIPIENTS]]
+
+
+async def make_campaign(sessions) -> int:
+    async with sessions() as session:
+        campaign = EmailCampaign(
+            subject="News",
+            message="<b>Hello</b>",
+            status="running",
+            total_recipients=RECIPIENTS,
+            sent_count=0,
+            failed_count=0,
+            last_user_id=0,
+        )
+        session.add(campaign)
+        await session.commit()
+        return campaign.id
+
+
+async def get_campaign(sessions, campaign_id: int) -> EmailCampaign:
+    async with sessions() as session:
+        return await session.get(EmailCampaign, campaign_id)
+
+
+async def wait_for_messages(fake_smtp, count: int) -> None:
+    while len(fake_smtp.messages) < count:
+        await asyncio.sleep(0.005)
+
+
+async def test_campaign_is_sent_to_recipients(sessions, app_db, smtp_pool, fake_smtp):
+    recipients = await make_recipients(sessions)
+    campaign_id = await make_campaign(sessions)
+    fake_smtp.rejects["user3@example.com"] = "550 No such user"
+
+    await CampaignRunner(chunk_size=10, rate_per_second=1000)._run(campaign_id)
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "completed"
+    assert campaign.sent_count == RECIPIENTS - 1
+    assert campaign.failed_count == 1
+    assert campaign.heartbeat_at is None
+    assert campaign.finished_at is not None
+    assert sorted(fake_smtp.recipients) == sorted(
+        r for r in recipients if r != "user3@example.com"
+    )
+    # the message is escaped in the html part
+    plain, html = email.message_from_bytes(fake_smtp.messages[0][2]).get_payload()
+    assert "<b>Hello</b>" in plain.get_payload(decode=True).decode()
+    assert "&lt;b&gt;Hello&lt;/b&gt;" in html.get_payload(decode=True).decode()
+
+
+async def test_stopped_campaign_resumes_without_duplicates(
+    sessions, app_db, smtp_pool, fake_smtp
+):
+    recipients = await make_recipients(sessions)
+    campaign_id = await make_campaign(sessions)
+
+    runner = CampaignRunner(chunk_size=10, rate_per_second=200)
+    runner.start(campaign_id)
+    await wait_for_messages(fake_smtp, 5)
+    # shutdown: sends in flight finish, progress is stored
+    await runner.stop()
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "running"
+    assert campaign.heartbeat_at is None
+    assert 0 < campaign.sent_count < RECIPIENTS
+    assert campaign.sent_count == len(fake_smtp.messages)
+
+    await CampaignRunner(chunk_size=10, rate_per_second=1000)._run(campaign_id)
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "completed"
+    assert campaign.sent_count == RECIPIENTS
+    assert Counter(fake_smtp.recipients) == Counter(recipients)
+
+
+async def test_paused_campaign_stops_after_chunk(
+    sessions, app_db, smtp_pool, fake_smtp
+):
+    await make_recipients(sessions)
+    campaign_id = await make_campaign(sessions)
+
+    runner = CampaignRunner(chunk_size=10, rate_per_second=200)
+    runner.start(campaign_id)
+    await wait_for_messages(fake_smtp, 1)
+    async with sessions() as session:
+        await CampaignService(session).pause_campaign(campaign_id)
+    await asyncio.gather(*runner._tasks.values())
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "paused"
+    assert campaign.heartbeat_at is None
+    # the chunk in progress is finished, the next one is not started
+    assert campaign.sent_count == len(fake_smtp.messages) == 10
+    assert campaign.last_user_id == 10
+
+
+async def test_smtp_outage_pauses_campaign(sessions, app_db, smtp_pool, fake_smtp):
+    await make_recipients(sessions)
+    campaign_id = await make_campaign(sessions)
+    await fake_smtp.stop()
+
+    await CampaignRunner(chunk_size=10, rate_per_second=1000)._run(campaign_id)
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "paused"
+    assert campaign.last_error.startswith("SMTP unavailable")
+    assert campaign.last_user_id == 0
+    assert campaign.sent_count == campaign.failed_count == 0
+
+
+async def test_campaign_runs_in_one_process(sessions, app_db, smtp_pool, fake_smtp):
+    recipients = await make_recipients(sessions)
+    campaign_id = await make_campaign(sessions)
+
+    runners = [CampaignRunner(chunk_size=10, rate_per_second=500) for _ in range(3)]
+    await asyncio.gather(*(runner._run(campaign_id) for runner in runners))
+
+    campaign = await get_campaign(sessions, campaign_id)
+    assert campaign.status == "completed"
+    assert Counter(fake_smtp.recipients) == Counter(recipients)
@@ -0,0 +1,104 @@
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, event, func, select
+
+from core.database.models import (
+    Comment,
+    CommentLike,
+    Like,
+    Post,
+    PostTag,
+    Tag,
+    User,
+)
+from core.services.PLC import PostLikeCommentService
+
+
+async def count(sessions, model) -> int:
+    async with sessions() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+async def seed(sessions, make_user) -> tuple[User, User, Post]:
+    """
+    A post of the author with a like, a comment and a comment like by the reader
+    """
+    author = await make_user(email="author@example.com", username="author")
+    reader = await make_user(email="reader@example.com", username="reader")
+    async with sessions() as session:
+        service = PostLikeCommentService(session, background_task=BackgroundTasks())
+        post = await service.create_post(
+            user_id=author.id, title="Title", content="Content", tags=["tag"]
+        )
+        await service.like_post(user_id=reader.id, post_id=post.id)
+        comment = await service.create_comment(
+            user_id=reader.id, post_id=post.id, content="Comment"
+        )
+        await service.like_comment(user_id=reader.id, comment_id=comment.id)
+    return author, reader, post
+
+
+def deletes(engine) -> list[str]:
+    """
+    DELETE statements the engine runs from now on
+    """
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE"):
+            statements.append(statement)
+
+    return statements
+
+
+async def test_delete_post_is_one_statement(engine, sessions, make_user):
+    author, _, post = await seed(sessions, make_user)
+    statements = deletes(engine)
+
+    async with sessions() as session:
+        await PostLikeCommentService(session).delete_post(
+            user_id=author.id, post_id=post.id
+        )
+
+    assert len(statements) == 1
+    for model in (Post, Like, Comment, CommentLike, PostTag):
+        assert await count(sessions, model) == 0
+    async with sessions() as session:
+        assert await session.scalar(select(Tag.post_count)) == 0
+
+
+async def test_delete_comment_is_one_statement(engine, sessions, make_user):
+    _, reader, post = await seed(sessions, make_user)
+    async with sessions() as session:
+        comment_id = await session.scalar(select(Comment.id))
+    statements = deletes(engine)
+
+    async with sessions() as session:
+        await PostLikeCommentService(session).delete_comment(
+            comment_id=comment_id, user_id=reader.id
+        )
+
+    assert len(statements) == 1
+    assert await count(sessions, Comment) == 0
+    assert await count(sessions, CommentLike) == 0
+    assert await count(sessions, Like) == 1
+    async with sessions() as session:
+        assert await session.scalar(select(Post.comment_count)) == 0
+
+
+async def test_user_rows_cascade(sessions, make_user):
+    author, reader, _ = await seed(sessions, make_user)
+
+    async with sessions() as session:
+        await session.execute(delete(User).where(User.id == reader.id))
+        await session.commit()
+    # the reader's like, comment and comment like are gone
+    for model in (Like, Comment, CommentLike):
+        assert await count(sessions, model) == 0
+    assert await count(sessions, Post) == 1
+
+    async with sessions() as session:
+        await session.execute(delete(User).where(User.id == author.id))
+        await session.commit()
+    assert await count(sessions, Post) == 0
+    assert await count(sessions, PostTag) == 0
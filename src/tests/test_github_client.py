@@ -0,0 +1,46 @@
+from core.oauth.github import GithubClient
+from core.services.oauth import OauthService
+
+LOGINS = 20
+
+
+async def _login(client: GithubClient, code: str) -> dict:
+    service = OauthService(session=None, http=client)
+    access_token = await service.get_access_token(code)
+    return await service.get_user_info(access_token)
+
+
+async def test_logins_reuse_connections(fake_github):
+    client = GithubClient(retry_backoff=0)
+    try:
+        for _ in range(LOGINS):
+            user_data = await _login(client, "octocat")
+    finally:
+        await client.close()
+    shared_connections = len(fake_github.connections)
+
+    fake_github.connections.clear()
+    for _ in range(LOGINS):
+        client = GithubClient(retry_backoff=0)
+        try:
+            await _login(client, "octocat")
+        finally:
+            await client.close()
+
+    # the hidden public email is taken from the email list
+    assert user_data["email"] == "octocat@example.com"
+    # /user and /user/emails are requested in parallel: two connections
+    assert shared_connections <= 2
+    assert len(fake_github.connections) >= 2 * LOGINS
+
+
+async def test_transient_errors_are_retried(fake_github):
+    fake_github.user_failures = 1
+    client = GithubClient(retry_backoff=0)
+    try:
+        user_data = await _login(client, "octocat")
+    finally:
+        await client.close()
+
+    assert user_data["id"] == 1
+    assert client.stats()["retried"] == 1
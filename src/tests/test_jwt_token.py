@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from utilities.jwt_token import TokenCodec, create_jwt_token, verify_token
+
+
+@pytest.fixture
+def codec() -> TokenCodec:
+    return TokenCodec(
+        algorithm="HS256", secret_key="secret", expire_minutes=15, cache_size=2
+    )
+
+
+@pytest.fixture
+def signature_checks(codec, monkeypatch) -> list:
+    checks = []
+    decode = codec._jwt.decode
+
+    def counted(*args, **kwargs):
+        checks.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(codec._jwt, "decode", counted)
+    return checks
+
+
+def test_round_trip(codec):
+    payload = codec.decode(codec.encode({"sub": 1, "type": "access_token"}))
+    assert payload["sub"] == "1"
+    assert payload["type"] == "access_token"
+    assert payload["exp"] - payload["iat"] == 15 * 60
+
+
+def test_repeated_token_is_verified_once(codec, signature_checks):
+    token = codec.encode({"sub": 1})
+    assert codec.decode(token) == codec.decode(token)
+    assert signature_checks == [token]
+
+
+def test_tampered_token_is_rejected(codec):
+    token = codec.encode({"sub": 1})
+    codec.decode(token)
+    header, payload, signature = token.split(".")
+    assert codec.decode(f"{header}.{payload}.{signature[::-1]}") is None
+    unsigned = jwt.encode(
+        {"sub": "1", "exp": time.time() + 60}, None, algorithm="none"
+    )
+    assert codec.decode(unsigned) is None
+
+
+def test_expired_token_is_rejected(codec):
+    assert codec.decode(codec.encode({"sub": 1}, timedelta(seconds=-1))) is None
+
+    token = codec.encode({"sub": 1}, timedelta(seconds=1))
+    payload = codec.decode(token)
+    assert payload is not None
+    # cached, but not past its expiry
+    time.sleep(payload["exp"] - time.time() + 0.01)
+    assert codec.decode(token) is None
+
+
+def test_cache_is_bounded(codec, signature_checks):
+    tokens = [codec.encode({"sub": n}) for n in range(3)]
+    for token in tokens:
+        codec.decode(token)
+    assert len(codec._verified) == 2
+
+    # the least recently used one was dropped
+    codec.decode(tokens[0])
+    assert signature_checks == [*tokens, tokens[0]]
+
+
+def test_other_key_is_rejected(codec):
+    other = TokenCodec(algorithm="HS256", secret_key="other", expire_minutes=15)
+    assert codec.decode(other.encode({"sub": 1})) is None
+
+
+def test_verify_token_checks_type():
+    token = create_jwt_token({"sub": 1, "type": "refresh_token"})
+    assert verify_token(token, expected_type="refresh_token")["sub"] == "1"
+    assert verify_token(token, expected_type="access_token") is None
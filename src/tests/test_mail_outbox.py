@@ -0,0 +1,114 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from core.database.models import EmailOutbox
+from core.mailing import enqueue_email
+from core.workers import OutboxDispatcher
+from utilities.now import get_now_timezone_date
+
+
+async def enqueue(sessions, *recipients: str) -> None:
+    async with sessions() as session:
+        for recipient in recipients:
+            enqueue_email(
+                session=session,
+                recipient=recipient,
+                subject="Subject",
+                plain_content="plain",
+            )
+        await session.commit()
+
+
+async def outbox(sessions) -> dict[str, EmailOutbox]:
+    async with sessions() as session:
+        emails = await session.scalars(select(EmailOutbox))
+        return {email.recipient: email for email in emails}
+
+
+async def test_committed_emails_are_sent(sessions, app_db, smtp_pool, fake_smtp):
+    await enqueue(sessions, "a@example.com", "b@example.com")
+    async with sessions() as session:
+        enqueue_email(
+            session=session,
+            recipient="rolled-back@example.com",
+            subject="Subject",
+            plain_content="plain",
+        )
+        await session.rollback()
+
+    await OutboxDispatcher().drain()
+
+    assert sorted(fake_smtp.recipients) == ["a@example.com", "b@example.com"]
+    emails = await outbox(sessions)
+    assert sorted(emails) == ["a@example.com", "b@example.com"]
+    for email in emails.values():
+        assert email.status == "sent"
+        assert email.attempts == 1
+        assert email.sent_at is not None
+
+
+async def test_temporary_failure_is_retried(sessions, app_db, smtp_pool, fake_smtp):
+    fake_smtp.rejects["busy@example.com"] = "450 Mailbox busy"
+    await enqueue(sessions, "busy@example.com")
+
+    dispatcher = OutboxDispatcher(backoff_base=30)
+    before = get_now_timezone_date()
+    await dispatcher.drain()
+
+    email = (await outbox(sessions))["busy@example.com"]
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert "Mailbox busy" in email.last_error
+    assert email.next_attempt_at >= before + timedelta(seconds=30)
+    # not due yet
+    assert await dispatcher.dispatch_batch() == 0
+
+    del fake_smtp.rejects["busy@example.com"]
+    async with sessions() as session:
+        await session.execute(
+            EmailOutbox.__table__.update().values(next_attempt_at=before)
+        )
+        await session.commit()
+    await dispatcher.drain()
+
+    email = (await outbox(sessions))["busy@example.com"]
+    assert email.status == "sent"
+    assert email.attempts == 2
+    assert email.last_error is None
+    assert fake_smtp.recipients == ["busy@example.com"]
+
+
+async def test_permanent_failure_and_attempts_limit(
+    sessions, app_db, smtp_pool, fake_smtp
+):
+    fake_smtp.rejects["gone@example.com"] = "550 No such user"
+    fake_smtp.rejects["busy@example.com"] = "450 Mailbox busy"
+    await enqueue(sessions, "gone@example.com", "busy@example.com")
+
+    dispatcher = OutboxDispatcher(max_attempts=3, backoff_base=0)
+    for _ in range(5):
+        await dispatcher.drain()
+
+    emails = await outbox(sessions)
+    assert emails["gone@example.com"].status == "failed"
+    assert emails["gone@example.com"].attempts == 1
+    assert emails["busy@example.com"].status == "failed"
+    assert emails["busy@example.com"].attempts == 3
+    assert dispatcher.failed_total == 2
+    assert dispatcher.retried_total == 2
+
+
+async def test_concurrent_dispatchers_send_each_email_once(
+    sessions, app_db, smtp_pool, fake_smtp
+):
+    recipients = [f"user{n}@example.com" for n in range(200)]
+    await enqueue(sessions, *recipients)
+
+    dispatchers = [OutboxDispatcher(batch_size=10) for _ in range(8)]
+    await asyncio.gather(*(dispatcher.drain() for dispatcher in dispatchers))
+
+    assert sorted(fake_smtp.recipients) == sorted(recipients)
+    assert sum(dispatcher.sent_total for dispatcher in dispatchers) == 200
+    assert all(email.status == "sent" for email in (await outbox(sessions)).values())
@@ -0,0 +1,86 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from core.database.models import Profile, User
+from core.oauth.github import GithubClient
+from core.services.oauth import OauthService
+
+
+async def test_email_list_failure_is_ignored_when_user_has_email(fake_github):
+    client = GithubClient(retry_backoff=0)
+    service = OauthService(session=None, http=client)
+    try:
+        user_data = await service.get_user_info(
+            await service.get_access_token("broken-emails")
+        )
+    finally:
+        await client.close()
+
+    assert user_data["email"] == "hubot@example.com"
+
+
+async def _authenticate(sessions, client: GithubClient, code: str) -> dict:
+    async with sessions() as session:
+        return await OauthService(session=session, http=client).authenticate(code)
+
+
+async def _users(sessions) -> list:
+    async with sessions() as session:
+        result = await session.execute(
+            select(User.github_id, User.username).order_by(User.github_id)
+        )
+        return result.all()
+
+
+async def test_concurrent_first_logins_create_one_user(sessions, fake_github):
+    client = GithubClient(retry_backoff=0)
+    try:
+        # repeated first logins of one account and, at the same
+        # time, another account with the same username up to case
+        codes = ["octocat", "Octocat"] * 5
+        await asyncio.gather(*(_authenticate(sessions, client, code) for code in codes))
+    finally:
+        await client.close()
+
+    async with sessions() as session:
+        profiles = await session.scalar(select(func.count(Profile.id)))
+
+    # whichever signs up second gets the username with its GitHub ID
+    assert await _users(sessions) in (
+        [(1, "octocat"), (2, "Octocat_2")],
+        [(1, "octocat_1"), (2, "Octocat")],
+    )
+    assert profiles == 2
+
+
+async def test_username_taken_during_signup(sessions, make_user, fake_github, monkeypatch):
+    await make_user(email="cat@example.com", username="OCTOCAT")
+
+    # the username is taken between the check and the insert
+    async def is_username_exist(self, username: str) -> bool:
+        return False
+
+    monkeypatch.setattr(OauthService, "is_username_exist", is_username_exist)
+    client = GithubClient(retry_backoff=0)
+    try:
+        await _authenticate(sessions, client, "octocat")
+    finally:
+        await client.close()
+
+    assert (1, "octocat_1") in await _users(sessions)
+
+
+async def test_long_login_fits_username(sessions, make_user, fake_github):
+    login = fake_github.users["long-login"]["login"]
+    await make_user(email="other@example.com", username=login[:30])
+
+    client = GithubClient(retry_backoff=0)
+    try:
+        await _authenticate(sessions, client, "long-login")
+    finally:
+        await client.close()
+
+    username = dict(await _users(sessions))[123456789]
+    assert username == login[:20] + "_123456789"
+    assert len(username) == 30
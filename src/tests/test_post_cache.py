@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from core.cache import MemoryCache, post_cache
+from core.database.schemas.post import PostDetail
+from core.services.PLC import PostLikeCommentService
+
+
+@pytest.fixture(autouse=True)
+async def empty_post_cache():
+    await post_cache.clear()
+    yield
+    await post_cache.clear()
+
+
+@pytest.fixture
+async def post(sessions, make_user):
+    user = await make_user()
+    async with sessions() as session:
+        return await PostLikeCommentService(session).create_post(
+            user_id=user.id, title="Title", content="Content", tags=["b", "a"]
+        )
+
+
+async def test_stale_set_is_skipped():
+    cache = MemoryCache(max_size=2)
+    version = await cache.version(1)
+    await cache.delete(1)
+    await cache.set(1, "stale", version=version)
+    assert await cache.get(1) is None
+
+    # other keys are not affected
+    await cache.set(2, "fresh", version=version)
+    assert await cache.get(2) == "fresh"
+
+    version = await cache.version(1)
+    await cache.set(1, "fresh", version=version)
+    assert await cache.get(1) == "fresh"
+    assert cache.stats()["stale"] == 1
+
+
+async def test_stale_set_is_skipped_after_deletes_are_forgotten():
+    cache = MemoryCache(max_size=2)
+    version = await cache.version(1)
+    for key in (1, 2, 3):
+        await cache.delete(key)
+    await cache.set(1, "stale", version=version)
+    assert await cache.get(1) is None
+
+
+async def test_cached_post_is_read_only(sessions, post):
+    async with sessions() as session:
+        cached = await PostLikeCommentService(session).get_post_by_id(post.id)
+    async with sessions() as session:
+        again = await PostLikeCommentService(session).get_post_by_id(post.id)
+
+    assert isinstance(cached, PostDetail)
+    assert again is cached
+    assert cached.tags == ("a", "b")
+    with pytest.raises(ValidationError):
+        cached.title = "changed"
+
+
+async def test_update_is_not_overwritten_by_a_slower_read(sessions, post):
+    loaded = asyncio.Event()
+    updated = asyncio.Event()
+
+    async with sessions() as session:
+        reader = PostLikeCommentService(session)
+        load_post = reader._load_post
+
+        async def slow_load_post(post_id):
+            found = await load_post(post_id=post_id)
+            loaded.set()
+            await updated.wait()
+            return found
+
+        reader._load_post = slow_load_post
+        read = asyncio.create_task(reader.get_post_by_id(post.id))
+
+        await loaded.wait()
+        async with sessions() as other:
+            await PostLikeCommentService(other).update_post(
+                user_id=post.user_id, post_id=post.id, title="New title"
+            )
+        updated.set()
+        assert (await read).title == "Title"
+
+    async with sessions() as session:
+        current = await PostLikeCommentService(session).get_post_by_id(post.id)
+    assert current.title == "New title"
@@ -0,0 +1,44 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from core.database.models import Profile
+from core.services.profile import ProfileService
+
+CONCURRENT_CALLS = 10
+
+
+async def test_concurrent_update_profile_creates_one_profile(sessions, make_user):
+    user = await make_user()
+
+    async def update(n: int):
+        async with sessions() as session:
+            return await ProfileService(session).update_profile(
+                user_id=user.id, update_data={"bio": f"bio {n}"}
+            )
+
+    await asyncio.gather(*(update(n) for n in range(CONCURRENT_CALLS)))
+
+    async with sessions() as session:
+        result = await session.execute(
+            select(func.count(), func.max(Profile.bio)).where(
+                Profile.user_id == user.id
+            )
+        )
+        profiles, bio = result.one()
+
+    assert profiles == 1
+    assert bio.startswith("bio ")
+
+
+async def test_create_profile_keeps_existing(sessions, make_user):
+    user = await make_user()
+    async with sessions() as session:
+        await ProfileService(session).update_profile(
+            user_id=user.id, update_data={"bio": "bio"}
+        )
+
+    async with sessions() as session:
+        profile = await ProfileService(session).create_profile(user=user)
+
+    assert profile.bio == "bio"
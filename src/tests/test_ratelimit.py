@@ -0,0 +1,105 @@
+import json
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from core.config import RateLimitRule
+from core.ratelimit import MemoryRateLimitBackend, RateLimitMiddleware
+
+LOGIN_PATH = "/login"
+
+
+async def echo(scope, receive, send):
+    request = Request(scope, receive)
+    body = await request.body()
+    response = JSONResponse({"size": len(body)})
+    await response(scope, receive, send)
+
+
+def middleware() -> RateLimitMiddleware:
+    return RateLimitMiddleware(
+        echo,
+        rules={LOGIN_PATH: RateLimitRule(ip_per_minute=100, login_per_minute=2)},
+    )
+
+
+async def post(app, *chunks: bytes) -> tuple[int, bytes]:
+    """
+    POST the body in chunks, return status and response body
+    """
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in chunks
+    ]
+    messages[-1]["more_body"] = False
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": LOGIN_PATH,
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], body
+
+
+async def test_body_is_passed_on():
+    body = json.dumps({"login": "User", "password": "x" * 1000}).encode()
+    status, response = await post(middleware(), body[:100], body[100:])
+
+    assert status == 200
+    assert json.loads(response) == {"size": len(body)}
+
+
+async def test_too_large_body_is_rejected():
+    chunk = b" " * 1024
+    # more than max_body_size, in chunks
+    chunks = [chunk] * (RateLimitMiddleware.max_body_size // len(chunk) + 1)
+    status, _ = await post(middleware(), *chunks)
+
+    assert status == 413
+
+
+async def test_login_limit_ignores_case():
+    app = middleware()
+    statuses = [
+        (await post(app, json.dumps({"login": login}).encode()))[0]
+        for login in ("user", "USER", "User")
+    ]
+
+    assert statuses == [200, 200, 429]
+
+
+async def test_backend_keeps_max_keys():
+    backend = MemoryRateLimitBackend(max_keys=100, prune_batch=10)
+    for n in range(1000):
+        await backend.hit(f"key{n}", capacity=5, refill_rate=5 / 60)
+
+    assert len(backend._buckets) == 100
+    # the least recently hit go first
+    assert next(iter(backend._buckets)) == "key900"
+
+
+async def test_backend_evicts_full_buckets_first():
+    backend = MemoryRateLimitBackend(max_keys=3)
+    # refilled right away
+    await backend.hit("full", capacity=1, refill_rate=1e9)
+    await backend.hit("limited-1", capacity=1, refill_rate=1 / 60)
+    await backend.hit("limited-2", capacity=1, refill_rate=1 / 60)
+    await backend.hit("new", capacity=1, refill_rate=1 / 60)
+
+    assert list(backend._buckets) == ["limited-1", "limited-2", "new"]
+    # still limited
+    assert await backend.hit("limited-1", capacity=1, refill_rate=1 / 60) > 0
@@ -0,0 +1,96 @@
+import sys
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.cache import post_cache
+from core.database import Base
+from core.database.db_helper import DatabaseHelper
+from core.database.models import Post
+from core.services.PLC import PostLikeCommentService
+
+db_helper_module = sys.modules["core.database.db_helper"]
+
+
+@pytest.fixture(autouse=True)
+async def empty_post_cache():
+    await post_cache.clear()
+    yield
+    await post_cache.clear()
+
+
+@pytest.fixture
+async def routed(engine, database_url, replica_database_url, monkeypatch):
+    """
+    db_helper with the test database as primary and a replica
+    """
+    replica = create_async_engine(replica_database_url)
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await replica.dispose()
+
+    helper = DatabaseHelper(url=database_url, replica_urls=[replica_database_url])
+    # commits report their writers to it
+    monkeypatch.setattr(db_helper_module, "db_helper", helper)
+    yield helper
+    await helper.dispose()
+
+
+async def seed(engine, title: str) -> None:
+    """
+    The same user and post, the replica lags behind with an old title
+    """
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, hashed_password,"
+                " is_active, is_verified, is_superuser)"
+                " VALUES (1, 'user@example.com', 'user', 'x', true, true, false)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO posts (id, user_id, title, content, is_published,"
+                " like_count, comment_count) VALUES (1, 1, :title, '', true, 0, 0)"
+            ),
+            {"title": title},
+        )
+
+
+async def title_in(engine) -> str:
+    async with engine.connect() as conn:
+        return await conn.scalar(select(Post.title).where(Post.id == 1))
+
+
+async def test_reads_and_writes_are_routed(routed):
+    primary, replica = routed.engine, routed.replica_engines[0]
+    await seed(primary, "Title")
+    await seed(replica, "Lagged title")
+
+    # an anonymous read goes to the replica, its row is not cached
+    async for session in routed.read_session_getter():
+        assert session.bind is replica
+        post = await PostLikeCommentService(session).get_post_by_id(1)
+        assert post.title == "Lagged title"
+    assert await post_cache.get(1) is None
+
+    # a write goes to the primary
+    async for session in routed.session_getter():
+        session.info["user_id"] = 1
+        await PostLikeCommentService(session).update_post(
+            user_id=1, post_id=1, title="New title"
+        )
+    assert await title_in(primary) == "New title"
+    assert await title_in(replica) == "Lagged title"
+
+    # the writer reads their write from the primary
+    async for session in routed.read_session_getter(user_id=1):
+        assert session.bind is primary
+        post = await PostLikeCommentService(session).get_post_by_id(1)
+        assert post.title == "New title"
+
+    # others still read from the replica
+    assert routed.read_engine() is replica
+    assert routed.read_engine(user_id=2) is replica
@@ -0,0 +1,69 @@
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from core.database.models import RefreshToken
+from core.workers.refresh_token_gc import (
+    RefreshTokenSweeper,
+    _SWEEP_EXPIRED,
+    _SWEEP_REVOKED,
+)
+from tests.explain import explain
+from utilities.now import get_now_timezone_date
+
+
+async def test_sweep_keeps_live_and_recently_revoked(app_db, sessions, make_user):
+    user = await make_user()
+    now = get_now_timezone_date()
+    tokens = {
+        "live": dict(expires_at=now + timedelta(days=1)),
+        "expired": dict(expires_at=now - timedelta(seconds=1)),
+        "revoked": dict(
+            expires_at=now + timedelta(days=1),
+            revoked_at=now - timedelta(days=1),
+        ),
+        "revoked long ago": dict(
+            expires_at=now + timedelta(days=1),
+            revoked_at=now - timedelta(days=8),
+        ),
+    }
+    # more than a batch of each
+    for n in range(5):
+        tokens[f"expired {n}"] = dict(expires_at=now - timedelta(days=n + 1))
+        tokens[f"revoked long ago {n}"] = dict(
+            expires_at=now + timedelta(days=1),
+            revoked_at=now - timedelta(days=8 + n),
+        )
+    async with sessions() as session:
+        session.add_all(
+            RefreshToken(
+                user_id=user.id,
+                token_hash=f"{name:<64}",
+                family_id=uuid.uuid4(),
+                is_revoked=values.get("revoked_at") is not None,
+                **values,
+            )
+            for name, values in tokens.items()
+        )
+        await session.commit()
+
+    sweeper = RefreshTokenSweeper(batch_size=2, pause=0, revoked_retention_days=7)
+    deleted = await sweeper.sweep()
+
+    async with sessions() as session:
+        left = set(
+            (await session.scalars(select(RefreshToken.token_hash))).all()
+        )
+    assert {name.strip() for name in left} == {"live", "revoked"}
+    assert deleted == len(tokens) - 2
+
+
+async def test_sweeps_use_indexes(engine):
+    now = get_now_timezone_date()
+    params = {"now": now, "revoked_before": now, "batch_size": 1000}
+
+    plan = await explain(engine, _SWEEP_EXPIRED, params)
+    assert "ix_refresh_tokens_expires_at" in plan
+    plan = await explain(engine, _SWEEP_REVOKED, params)
+    assert "ix_refresh_tokens_revoked_at" in plan
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import func, select
+
+from core.database.models import RefreshToken
+from core.dependency.user import get_current_user
+from core.services.user import UserService
+from exceptions import error
+from utilities.jwt_token import create_jwt_token
+from utilities.now import get_now_timezone_date
+
+CONCURRENT_CALLS = 10
+
+
+async def login(sessions, user_id: int) -> str:
+    async with sessions() as session:
+        return await UserService(session).create_refresh_token(user_id)
+
+
+async def rotate(sessions, token: str) -> tuple[int, str]:
+    async with sessions() as session:
+        return await UserService(session).rotate_refresh_token(token)
+
+
+async def is_valid(sessions, token: str) -> bool:
+    async with sessions() as session:
+        return await UserService(session).get_valid_refresh_token(token) is not None
+
+
+async def access(sessions, token: str):
+    async with sessions() as session:
+        return await get_current_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), session
+        )
+
+
+async def test_rotation_replaces_token(sessions, make_user):
+    user = await make_user()
+    token = await login(sessions, user.id)
+
+    user_id, new_token = await rotate(sessions, token)
+
+    assert user_id == user.id
+    assert not await is_valid(sessions, token)
+    assert await is_valid(sessions, new_token)
+    async with sessions() as session:
+        families = await session.scalar(
+            select(func.count(func.distinct(RefreshToken.family_id)))
+        )
+        stored = await session.scalars(select(RefreshToken.token_hash))
+    assert families == 1
+    # only digests are stored
+    assert {token, new_token}.isdisjoint(stored)
+
+
+async def test_reused_token_revokes_its_family(sessions, make_user):
+    user = await make_user()
+    other_login = await login(sessions, user.id)
+    token = await login(sessions, user.id)
+    _, new_token = await rotate(sessions, token)
+
+    with pytest.raises(error.ErrorToken):
+        await rotate(sessions, token)
+
+    assert not await is_valid(sessions, new_token)
+    assert await is_valid(sessions, other_login)
+
+
+async def test_unknown_token_is_rejected(sessions, make_user):
+    user = await make_user()
+    token = await login(sessions, user.id)
+
+    with pytest.raises(error.ErrorToken):
+        await rotate(sessions, "unknown")
+
+    assert await is_valid(sessions, token)
+
+
+async def test_concurrent_rotation_issues_one_token(sessions, make_user):
+    user = await make_user()
+    token = await login(sessions, user.id)
+
+    results = await asyncio.gather(
+        *(rotate(sessions, token) for _ in range(CONCURRENT_CALLS)),
+        return_exceptions=True,
+    )
+
+    rotated = [r for r in results if not isinstance(r, Exception)]
+    assert len(rotated) == 1
+    assert all(
+        isinstance(r, error.ErrorToken) for r in results if isinstance(r, Exception)
+    )
+
+
+async def test_revoke_all_tokens_of_user(sessions, make_user):
+    user = await make_user()
+    other = await make_user(email="other@example.com", username="other")
+    tokens = [await login(sessions, user.id) for _ in range(3)]
+    other_token = await login(sessions, other.id)
+
+    async with sessions() as session:
+        await UserService(session).revoke_refresh_token(user.id)
+
+    for token in tokens:
+        assert not await is_valid(sessions, token)
+    assert await is_valid(sessions, other_token)
+
+
+async def test_revoke_rejects_earlier_access_tokens(sessions, make_user, monkeypatch):
+    user = await make_user()
+    access_token = create_jwt_token({"sub": user.id, "type": "access_token"})
+    assert (await access(sessions, access_token)).id == user.id
+
+    # logout a few seconds after the token was issued
+    later = get_now_timezone_date() + timedelta(seconds=2)
+    monkeypatch.setattr("core.services.user.get_now_timezone_date", lambda: later)
+    async with sessions() as session:
+        await UserService(session).revoke_refresh_token(user.id)
+
+    with pytest.raises(error.Unauthorized):
+        await access(sessions, access_token)
+
+
+async def test_login_right_after_revoke_is_accepted(sessions, make_user):
+    user = await make_user()
+    async with sessions() as session:
+        await UserService(session).revoke_refresh_token(user.id)
+
+    access_token = create_jwt_token({"sub": user.id, "type": "access_token"})
+    assert (await access(sessions, access_token)).id == user.id
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import bcrypt
+import pytest
+from sqlalchemy import func, select
+
+from core.database.models import User
+from core.database.schemas.user import UserCreate
+from core.services.user import UserService
+from exceptions import error
+from utilities.security import hash_password
+
+REGISTRATIONS = 2000
+PASSWORD = "Passw0rd!"
+
+
+@pytest.fixture
+def cheap_bcrypt(monkeypatch):
+    """
+    The lowest bcrypt cost: thousands of hashes in a test run
+    """
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr(bcrypt, "gensalt", lambda: gensalt(rounds=4))
+
+
+async def register(sessions, email: str, username: str) -> User:
+    async with sessions() as session:
+        return await UserService(session).create_user(
+            UserCreate(email=email, username=username, password=PASSWORD)
+        )
+
+
+async def test_parallel_registrations(sessions, cheap_bcrypt):
+    users = await asyncio.gather(
+        *(
+            register(sessions, f"user{n}@example.com", f"user{n}")
+            for n in range(REGISTRATIONS)
+        )
+    )
+
+    async with sessions() as session:
+        count = await session.scalar(select(func.count()).select_from(User))
+
+    assert count == REGISTRATIONS
+    assert len({user.id for user in users}) == REGISTRATIONS
+
+
+async def test_parallel_duplicate_registrations(sessions, cheap_bcrypt):
+    results = await asyncio.gather(
+        *(register(sessions, "same@example.com", f"name{n}") for n in range(50)),
+        *(register(sessions, f"other{n}@example.com", "Same") for n in range(50)),
+        return_exceptions=True,
+    )
+
+    users = [result for result in results if isinstance(result, User)]
+    conflicts = [
+        result for result in results if isinstance(result, error.LoginAlreadyExist)
+    ]
+    async with sessions() as session:
+        count = await session.scalar(select(func.count()).select_from(User))
+
+    # one per email and one per username
+    assert len(users) == count == 2
+    assert len(conflicts) == 98
+
+
+async def test_logins_do_not_block_event_loop(sessions, make_user):
+    # the default bcrypt cost: a few hundred ms per check
+    user = await make_user(
+        hashed_password=hash_password(PASSWORD), is_verified=True
+    )
+
+    async def login():
+        async with sessions() as session:
+            return await UserService(session).authenticate(
+                login=user.email, password=PASSWORD
+            )
+
+    started = time.perf_counter()
+    await login()
+    one_login = time.perf_counter() - started
+
+    max_lag = 0.0
+
+    async def ticker(done: asyncio.Event):
+        nonlocal max_lag
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - before - 0.005)
+
+    done = asyncio.Event()
+    tick = asyncio.create_task(ticker(done))
+    await asyncio.gather(*(login() for _ in range(4)))
+    done.set()
+    await tick
+
+    # on the event loop a single check would stall it for a whole login
+    assert max_lag < one_login / 2
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import update
+
+from core.database.models import Post
+from core.services.search import SearchService
+from exceptions import error
+
+
+@pytest.fixture
+def make_posts(sessions, make_user):
+    async def make_posts(*posts: dict) -> list[Post]:
+        user = await make_user()
+        async with sessions() as session:
+            rows = [Post(user_id=user.id, **values) for values in posts]
+            session.add_all(rows)
+            await session.commit()
+            return rows
+
+    return make_posts
+
+
+async def search(sessions, query: str, **kwargs) -> dict:
+    async with sessions() as session:
+        return await SearchService(session).search_posts(query=query, **kwargs)
+
+
+async def test_title_match_ranks_first(sessions, make_posts):
+    in_content, in_title, hidden, other = await make_posts(
+        dict(title="Notes", content="about python and more"),
+        dict(title="Python", content="about python and more"),
+        dict(title="Python", content="python", is_published=False),
+        dict(title="Rust", content="about rust"),
+    )
+
+    page = await search(sessions, "python")
+
+    assert [post["id"] for post in page["posts"]] == [in_title.id, in_content.id]
+    assert page["next_cursor"] is None
+
+
+async def test_headline_is_escaped(sessions, make_posts):
+    await make_posts(
+        dict(
+            title="Markup",
+            content="learn python <img src=x onerror=alert(1)> with python & friends",
+        )
+    )
+
+    (post,) = (await search(sessions, "python"))["posts"]
+
+    assert post["headline"] == (
+        "learn <mark>python</mark> &lt;img src=x onerror=alert(1)&gt; "
+        "with <mark>python</mark> &amp; friends"
+    )
+
+
+async def test_pages_cover_equal_ranks(sessions, make_posts):
+    posts = await make_posts(
+        *(dict(title=f"Post {n}", content="same words") for n in range(5))
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        page = await search(sessions, "words", limit=2, cursor=cursor)
+        seen += [post["id"] for post in page["posts"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted((post.id for post in posts), reverse=True)
+
+
+async def test_vector_follows_edits_not_counters(sessions, make_posts):
+    (post,) = await make_posts(dict(title="Notes", content="python"))
+    by_id = update(Post).where(Post.id == post.id)
+
+    async with sessions() as session:
+        # cleared: a counter update must leave it alone
+        await session.execute(by_id.values(search_vector=None))
+        await session.execute(by_id.values(like_count=Post.like_count + 1))
+        await session.commit()
+    assert (await search(sessions, "python"))["posts"] == []
+
+    async with sessions() as session:
+        edited = await session.get(Post, post.id)
+        edited.content = "rust"
+        await session.commit()
+    page = await search(sessions, "rust")
+    assert [found["id"] for found in page["posts"]] == [post.id]
+
+
+async def test_bad_queries(sessions):
+    with pytest.raises(error.NotValidData):
+        await search(sessions, "   ")
+    with pytest.raises(error.NotValidData):
+        await search(sessions, "python", cursor="not-a-cursor")
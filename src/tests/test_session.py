@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from core.database.db_helper import DatabaseHelper
+from core.dependency.user import get_current_user
+from core.services.user import UserService
+from utilities.jwt_token import create_jwt_token
+
+
+def credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    token = create_jwt_token({"sub": user_id, "type": "access_token"})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+async def request(helper: DatabaseHelper, user_id: int, work: float) -> None:
+    """
+    An authenticated endpoint: the user, other work, a query
+    """
+    async for session in helper.session_getter():
+        user = await get_current_user(credentials(user_id), session)
+        await asyncio.sleep(work)
+        await UserService(session).get_user_by_id(user_id=user.id)
+
+
+async def test_current_user_gives_the_connection_back(app_db, make_user):
+    user = await make_user()
+    pool = app_db.engine.pool
+
+    async for session in app_db.session_getter():
+        current = await get_current_user(credentials(user.id), session)
+        assert current.id == user.id
+        assert pool.checkedout() == 0
+
+        # the endpoint goes on with the same session
+        await UserService(session).get_user_by_id(user_id=user.id)
+        assert pool.checkedout() == 1
+    assert pool.checkedout() == 0
+
+
+async def test_one_connection_serves_concurrent_requests(database_url, make_user):
+    user = await make_user()
+    helper = DatabaseHelper(
+        url=database_url, pool_size=1, max_overflow=0, pool_timeout=0.2
+    )
+    try:
+        # connections are not held while the requests do other work
+        await asyncio.gather(*(request(helper, user.id, work=0.5) for _ in range(10)))
+        assert helper.engine.pool.timeouts == 0
+    finally:
+        await helper.dispose()
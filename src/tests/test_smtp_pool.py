@@ -0,0 +1,56 @@
+import asyncio
+
+import aiosmtplib
+import pytest
+
+from core.mailing import SMTPPool, build_message
+
+
+def message(recipient: str = "user@example.com"):
+    return build_message(
+        recipient=recipient,
+        subject="Subject",
+        plain_content="plain",
+        html_content="<p>html</p>",
+    )
+
+
+async def test_connections_are_reused(fake_smtp):
+    pool = SMTPPool(host="127.0.0.1", port=fake_smtp.port, size=3)
+    recipients = [f"user{n}@example.com" for n in range(20)]
+
+    await asyncio.gather(*(pool.send(message(r)) for r in recipients))
+    await pool.send(message())
+    await pool.close()
+
+    assert sorted(fake_smtp.recipients) == sorted(recipients + ["user@example.com"])
+    assert fake_smtp.connections == pool.connects <= 3
+    assert pool.stats()["sent"] == 21
+
+
+async def test_dropped_connection_is_reopened(fake_smtp):
+    pool = SMTPPool(host="127.0.0.1", port=fake_smtp.port, size=1)
+    await pool.send(message())
+
+    fake_smtp.drop_connections()
+    await asyncio.sleep(0.05)
+    await pool.send(message())
+    await pool.close()
+
+    assert len(fake_smtp.messages) == 2
+    assert pool.connects == 2
+    assert pool.failed == 0
+
+
+async def test_failed_send_discards_connection(fake_smtp):
+    fake_smtp.rejects["gone@example.com"] = "550 No such user"
+    pool = SMTPPool(host="127.0.0.1", port=fake_smtp.port, size=1)
+
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        await pool.send(message("gone@example.com"))
+    await pool.send(message())
+    await pool.close()
+
+    assert fake_smtp.recipients == ["user@example.com"]
+    assert pool.failed == 1
+    assert pool.connects == 2
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from core.services.PLC import _COMMENT_BY_ID, _POST_BY_ID
+from core.services.user import (
+    _USER_BY_EMAIL,
+    _USER_BY_ID,
+    _USER_BY_LOGIN,
+    _USER_BY_USERNAME,
+    _VALID_REFRESH_TOKEN,
+)
+from utilities.now import get_now_timezone_date
+
+HOT_STATEMENTS = [
+    (_USER_BY_ID, lambda n: {"user_id": n}),
+    (_USER_BY_EMAIL, lambda n: {"email": f"user{n}@example.com"}),
+    (_USER_BY_USERNAME, lambda n: {"username": f"user{n}"}),
+    (_USER_BY_LOGIN, lambda n: {"login": f"user{n}"}),
+    (
+        _VALID_REFRESH_TOKEN,
+        lambda n: {"token_hash": f"{n:064}", "now": get_now_timezone_date()},
+    ),
+    (_POST_BY_ID, lambda n: {"post_id": n}),
+    (_COMMENT_BY_ID, lambda n: {"comment_id": n}),
+]
+
+
+@pytest.mark.parametrize(
+    "stmt, params",
+    HOT_STATEMENTS,
+    ids=[
+        "user_by_id",
+        "user_by_email",
+        "user_by_username",
+        "user_by_login",
+        "valid_refresh_token",
+        "post_by_id",
+        "comment_by_id",
+    ],
+)
+async def test_hot_statement_is_compiled_once(engine, sessions, stmt, params):
+    cache_hits = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        cache_hits.append(context.cache_hit)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", record)
+    try:
+        for n in range(3):
+            async with sessions() as session:
+                await session.execute(stmt, params(n))
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", record)
+
+    # other values, the same compiled statement
+    assert cache_hits[1:] == [CACHE_HIT, CACHE_HIT]
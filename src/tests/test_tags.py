@@ -0,0 +1,148 @@
+import pytest
+from sqlalchemy import select
+
+from core.database.models import Like, Tag
+from core.services.PLC import _TAGS_BY_PREFIX, PostLikeCommentService
+from core.services.recomendation import RecommendationService
+from exceptions import error
+from tests.explain import explain
+
+
+@pytest.fixture
+def make_post(sessions, make_user):
+    users = {}
+
+    async def make_post(*tags: str, author: str = "author"):
+        if author not in users:
+            users[author] = await make_user(
+                email=f"{author}@example.com", username=author
+            )
+        async with sessions() as session:
+            return await PostLikeCommentService(session).create_post(
+                user_id=users[author].id, title="Title", content="", tags=list(tags)
+            )
+
+    make_post.users = users
+    return make_post
+
+
+async def by_tag(sessions, tags: list[str], match: str = "any") -> list[int]:
+    async with sessions() as session:
+        posts = await PostLikeCommentService(session).get_posts_by_tag(
+            tags=tags, match=match
+        )
+        return sorted(post.id for post in posts)
+
+
+async def tag_counts(sessions) -> dict[str, int]:
+    async with sessions() as session:
+        return dict((await session.execute(select(Tag.name, Tag.post_count))).all())
+
+
+async def test_any_and_all_tags(sessions, make_post):
+    python = await make_post("Python")
+    both = await make_post("#python", "  SQL ")
+    sql = await make_post("sql")
+
+    assert await by_tag(sessions, ["PYTHON"]) == [python.id, both.id]
+    assert await by_tag(sessions, ["python", "sql"]) == [python.id, both.id, sql.id]
+    assert await by_tag(sessions, ["python", "sql"], match="all") == [both.id]
+    assert await by_tag(sessions, ["python", "go"], match="all") == []
+    with pytest.raises(error.NotValidData):
+        await by_tag(sessions, ["  #  "])
+
+
+async def test_tag_counters_follow_posts(sessions, make_post):
+    post = await make_post("python", "sql")
+    await make_post("python")
+    assert await tag_counts(sessions) == {"python": 2, "sql": 1}
+
+    async with sessions() as session:
+        service = PostLikeCommentService(session)
+        await service.update_post(
+            user_id=post.user_id, post_id=post.id, tags=["sql", "go"]
+        )
+    assert await tag_counts(sessions) == {"python": 1, "sql": 1, "go": 1}
+
+    async with sessions() as session:
+        await PostLikeCommentService(session).deactivate_post(
+            post_id=post.id, user_id=post.user_id
+        )
+    assert await tag_counts(sessions) == {"python": 1, "sql": 0, "go": 0}
+    # hidden posts are not found by tag
+    assert await by_tag(sessions, ["sql"]) == []
+
+
+async def test_autocomplete_and_trending_tags(sessions, make_post):
+    await make_post("python", "pytest")
+    await make_post("python", "pyramid")
+    await make_post("Python Tips", "pz")
+    hidden = await make_post("pyside")
+    async with sessions() as session:
+        await PostLikeCommentService(session).deactivate_post(
+            user_id=hidden.user_id, post_id=hidden.id
+        )
+
+    async with sessions() as session:
+        service = PostLikeCommentService(session)
+        autocomplete = await service.autocomplete_tags(prefix="  #PY")
+        trending = await service.get_tranding_tag(limit=3)
+        assert await service.autocomplete_tags(prefix=" # ") == []
+        assert await service.autocomplete_tags(prefix="py", limit=1) == [
+            {"tag": "python", "post_count": 2}
+        ]
+
+    # most used first, then by name; "pz" is past the prefix range and
+    # the hidden post's tag is still offered, with no posts
+    assert autocomplete == [
+        {"tag": "python", "post_count": 2},
+        {"tag": "pyramid", "post_count": 1},
+        {"tag": "pytest", "post_count": 1},
+        {"tag": "python tips", "post_count": 1},
+        {"tag": "pyside", "post_count": 0},
+    ]
+    assert trending == [
+        {"tag": "python", "post_count": 2},
+        {"tag": "pytest", "post_count": 1},
+        {"tag": "pyramid", "post_count": 1},
+    ]
+
+
+async def test_autocomplete_uses_pattern_index(engine):
+    plan = await explain(
+        engine, _TAGS_BY_PREFIX, {"prefix": "py", "upper": "pz", "limit": 10}
+    )
+    assert "ix_tags_name_pattern" in plan
+    assert "Seq Scan" not in plan
+
+
+async def test_recommendations_rank_by_tag_overlap(sessions, make_post):
+    liked = [
+        await make_post("python", "sql"),
+        await make_post("python"),
+    ]
+    python_only = await make_post("python")
+    sql_only = await make_post("sql")
+    python_and_sql = await make_post("python", "sql")
+    await make_post("go")
+    await make_post("python", "sql", author="reader")
+
+    reader = make_post.users["reader"]
+    async with sessions() as session:
+        session.add_all(Like(user_id=reader.id, post_id=post.id) for post in liked)
+        await session.commit()
+
+    async with sessions() as session:
+        posts = await RecommendationService(session).get_recommended_posts(
+            user_id=reader.id
+        )
+
+    # python weighs 2 (two liked posts), sql 1, newer posts first on a tie;
+    # the reader's own post and the go post are left out
+    assert [post.id for post in posts] == [
+        python_and_sql.id,
+        liked[0].id,
+        python_only.id,
+        liked[1].id,
+        sql_only.id,
+    ]
@@ -0,0 +1,39 @@
+from core.jinja.bulk_render import render_many
+from core.jinja.jinja_templates import (
+    TEMPLATES_DIR,
+    environment,
+    precompile_templates,
+    render_static,
+)
+
+
+class User:
+    def __init__(self, username: str):
+        self.username = username
+
+
+def test_all_templates_are_compiled_once():
+    assert precompile_templates() == len(list(TEMPLATES_DIR.rglob("*.html")))
+
+    template = environment.get_template("mailing/campaign.html")
+    assert environment.get_template("mailing/campaign.html") is template
+
+
+def test_static_page_is_rendered_once():
+    page = render_static("bridge/verification_proccess.html")
+    assert render_static("bridge/verification_proccess.html") is page
+    assert "{{" not in page and "{%" not in page
+
+
+async def test_render_many_keeps_order_and_escapes():
+    contexts = [
+        {"user": User(f"<b>user{n}</b>"), "subject": "News", "message": "Hello"}
+        for n in range(5)
+    ]
+
+    pages = await render_many("mailing/campaign.html", contexts, chunk_size=2)
+
+    assert len(pages) == 5
+    for n, page in enumerate(pages):
+        assert f"&lt;b&gt;user{n}&lt;/b&gt;" in page
+        assert "<b>" not in page
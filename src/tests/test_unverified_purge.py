@@ -0,0 +1,81 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from core.database.models import Profile, RefreshToken, User
+from core.services.profile import ProfileService
+from core.services.user import UserService
+from core.workers import UnverifiedUserPurger
+from utilities.now import get_now_date
+
+STALE = 7
+
+
+async def make_accounts(make_user) -> list[int]:
+    """
+    STALE unverified accounts older than 7 days, plus a recent
+    unverified one and an old verified one that must stay
+    """
+    old = get_now_date(days=30)
+    stale = [
+        await make_user(
+            email=f"stale{n}@example.com", username=f"stale{n}", created_at=old
+        )
+        for n in range(STALE)
+    ]
+    await make_user(email="new@example.com", username="new")
+    await make_user(
+        email="verified@example.com",
+        username="verified",
+        is_verified=True,
+        created_at=old,
+    )
+    return [user.id for user in stale]
+
+
+async def usernames(sessions) -> list[str]:
+    async with sessions() as session:
+        return sorted(await session.scalars(select(User.username)))
+
+
+async def test_purge_deletes_stale_accounts_in_batches(sessions, app_db, make_user):
+    stale_ids = await make_accounts(make_user)
+    async with sessions() as session:
+        await UserService(session).create_refresh_token(stale_ids[0])
+        user = await session.get(User, stale_ids[0])
+        await ProfileService(session).create_profile(user=user)
+
+    purger = UnverifiedUserPurger(older_than_days=7, batch_size=3, pause=0)
+    assert await purger.count() == STALE
+    assert await purger.purge() == STALE
+
+    assert await usernames(sessions) == ["new", "verified"]
+    assert await purger.count() == 0
+    async with sessions() as session:
+        for model in (RefreshToken, Profile):
+            assert await session.scalar(select(func.count()).select_from(model)) == 0
+    stats = purger.stats()
+    assert stats["last_deleted"] == stats["deleted_total"] == STALE
+
+
+async def test_concurrent_purges_delete_each_account_once(sessions, app_db, make_user):
+    await make_accounts(make_user)
+
+    purgers = [UnverifiedUserPurger(batch_size=1, pause=0) for _ in range(3)]
+    deleted = await asyncio.gather(*(purger.purge() for purger in purgers))
+
+    assert sum(deleted) == STALE
+    assert await usernames(sessions) == ["new", "verified"]
+
+
+async def test_background_purge_runs_once(sessions, app_db, make_user):
+    await make_accounts(make_user)
+    purger = UnverifiedUserPurger(batch_size=2, pause=0.01)
+
+    assert purger.purge_in_background()
+    assert not purger.purge_in_background()
+    assert purger.stats()["is_purging"]
+    await purger._purge_task
+
+    assert not purger.is_purging
+    assert purger.deleted_total == STALE
@@ -0,0 +1,37 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from core.database.models import EmailOutbox, Profile, User
+from core.services.user import UserService
+
+CONCURRENT_CALLS = 10
+
+
+async def test_concurrent_verify_email_token(sessions, make_user):
+    user = await make_user()
+    async with sessions() as session:
+        token = await UserService(session).generate_verification_token(user_id=user.id)
+
+    async def verify():
+        async with sessions() as session:
+            return await UserService(session).verify_email_token(token=token)
+
+    verified = await asyncio.gather(*(verify() for _ in range(CONCURRENT_CALLS)))
+
+    async with sessions() as session:
+        profiles = await session.scalar(
+            select(func.count()).where(Profile.user_id == user.id)
+        )
+        emails = await session.scalar(
+            select(func.count()).where(EmailOutbox.recipient == user.email)
+        )
+        is_verified = await session.scalar(
+            select(User.is_verified).where(User.id == user.id)
+        )
+
+    assert all(user.is_verified for user in verified)
+    assert is_verified
+    assert profiles == 1
+    # the confirmation mail goes out for the first verification only
+    assert emails == 1
@@ -0,0 +1,24 @@
+from core.services.oauth import _USER_BY_GITHUB_ID
+from core.services.user import _USER_BY_LOGIN
+from tests.explain import explain
+
+
+async def test_user_by_github_id_uses_index(engine):
+    plan = await explain(engine, _USER_BY_GITHUB_ID, {"github_id": 1})
+    assert "users_github_id_key" in plan
+    assert "Seq Scan" not in plan
+
+
+async def test_user_by_login_uses_lower_indexes(engine):
+    plan = await explain(engine, _USER_BY_LOGIN, {"login": "User@Example.com"})
+    assert "ix_users_email_lower" in plan
+    assert "ix_users_username_lower" in plan
+    assert "Seq Scan" not in plan
+
+
+async def test_user_by_login_is_case_insensitive(sessions, make_user):
+    user = await make_user(email="Mixed@Example.com", username="MixedCase")
+    async with sessions() as session:
+        for login in ("mixed@example.com", "MIXED@EXAMPLE.COM", "mixedcase"):
+            result = await session.execute(_USER_BY_LOGIN, {"login": login})
+            assert result.scalar_one().id == user.id
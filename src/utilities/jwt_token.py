@@ -1,46 +1,126 @@
 import jwt
-from datetime import timedelta, datetime, timezone
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import timedelta
 
 from core.config import settings
 
+
+class TokenCodec:
+    """
+    JWT encoder/decoder created once at startup:
+    keys are prepared and the algorithm list is fixed.
+    Verified tokens are kept in a small LRU (by token digest)
+    until they expire, so repeated requests skip signature checks.
+
+    HS* algorithms use secret_key. Asymmetric algorithms (RS256, ES256...)
+    need `pyjwt[crypto]`, sign with private_key and verify with public_key,
+    so other services can verify tokens with the public key only.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        expire_minutes: int,
+        private_key: str | None = None,
+        public_key: str | None = None,
+        cache_size: int = 4096,
+    ):
+        self.algorithm = algorithm
+        self.expire_minutes = expire_minutes
+        self.cache_size = cache_size
+        self._algorithms = [algorithm]
+        self._jwt = jwt.PyJWT()
+
+        alg = jwt.get_algorithm_by_name(algorithm)
+        if algorithm.startswith("HS"):
+            self._signing_key = self._verifying_key = alg.prepare_key(secret_key)
+        else:
+            self._signing_key = alg.prepare_key(private_key) if private_key else None
+            self._verifying_key = alg.prepare_key(public_key)
+
+        self._verified: OrderedDict[bytes, dict] = OrderedDict()
+
+    def encode(
+        self,
+        data: dict,
+        expires_delta: timedelta | None = None,
+    ) -> str:
+        if self._signing_key is None:
+            raise RuntimeError("Private key is not configured, cannot sign tokens")
+
+        now = int(time.time())
+        if expires_delta:
+            expire = now + int(expires_delta.total_seconds())
+        else:
+            expire = now + self.expire_minutes * 60
+
+        payload = {**data, "exp": expire, "iat": now}
+        if "sub" in payload:
+            payload["sub"] = str(payload["sub"])
+
+        return self._jwt.encode(
+            payload,
+            self._signing_key,
+            algorithm=self.algorithm,
+        )
+
+    def decode(self, token: str) -> dict | None:
+        """
+        Verified payload or None if token is invalid or expired
+        """
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+        payload = self._verified.get(digest)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                self._verified.move_to_end(digest)
+                return payload
+            del self._verified[digest]
+
+        try:
+            payload = self._jwt.decode(
+                token,
+                self._verifying_key,
+                algorithms=self._algorithms,
+            )
+        except jwt.PyJWTError:
+            return None
+
+        if "exp" in payload:
+            self._verified[digest] = payload
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+
+        return payload
+
+
+token_codec = TokenCodec(
+    algorithm=settings.access.algorithm,
+    secret_key=settings.access.secret_key,
+    expire_minutes=settings.access.expire_at,
+    private_key=settings.access.private_key,
+    public_key=settings.access.public_key,
+    cache_size=settings.access.verified_cache_size,
+)
+
+
 def create_jwt_token(
     data: dict,
     expires_delta: timedelta | None = None,
 ):
     """Encode JWT token"""
-    to_encode = data.copy()
-    
-    if 'sub' in to_encode:
-        to_encode['sub'] = str(to_encode['sub'])
-        
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.access.expire_at
-        )
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.access.secret_key, 
-        algorithm=settings.access.algorithm
-    )
-    
-    return encoded_jwt
+    return token_codec.encode(data, expires_delta=expires_delta)
 
 def verify_token(token: str, expected_type: str = None) -> dict | None:
     """Verifies the JWT token and returns the payload"""
-    try: 
-        payload = jwt.decode(
-            token,
-            settings.access.secret_key,
-            algorithms=[settings.access.algorithm],
-        )
-        
-        if expected_type and payload.get("type") != expected_type:
-            return None 
-        
-        return payload
-    
-    except jwt.PyJWTError:
-        return None
\ No newline at end of file
+    payload = token_codec.decode(token)
+    if payload is None:
+        return None
+
+    if expected_type and payload.get("type") != expected_type:
+        return None
+
+    return payload
\ No newline at end of file
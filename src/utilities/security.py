@@ -1,4 +1,6 @@
 import bcrypt
+import hashlib
+import secrets
 
 def hash_password(pwd: str) -> str:
     """Password hashing with salt"""
@@ -17,4 +19,12 @@ def verify_password(
     return bcrypt.checkpw(
         password=pwd.encode("utf-8"),
         hashed_password=hashed_pwd.encode("utf-8")
-    )
\ No newline at end of file
+    )
+
+def generate_token() -> str:
+    """Random opaque token (refresh tokens)"""
+    return secrets.token_urlsafe(32)
+
+def hash_token(token: str) -> str:
+    """SHA-256 hex digest of a token for storing and lookup"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
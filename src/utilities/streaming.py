@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_chunks(
+    chunks: AsyncIterator[list[dict]],
+) -> AsyncIterator[str]:
+    """
+    One JSON object per line, one body part per chunk of rows
+    """
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(row, default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+async def csv_chunks(
+    chunks: AsyncIterator[list[dict]],
+    fieldnames: list[str],
+) -> AsyncIterator[str]:
+    """
+    CSV with a header line, one body part per chunk of rows
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # header only, if there were no rows
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,5 @@
+def normalize_tag(tag: str) -> str:
+    """
+    "  #Python   Tips " -> "python tips"
+    """
+    return " ".join(tag.strip().lstrip("#").split()).lower()